@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Clinic Management System - Test Data Generator Benchmarks
+Measures the hot paths of generate_test_data.py and compares them with stored baselines.
+
+To run the benchmarks against benchmark_baseline.json (exits with 1 on a regression):
+source test_data_env/bin/activate && python3 benchmark_test_data.py
+
+To record new baselines after an intended change (or on a new machine):
+source test_data_env/bin/activate && python3 benchmark_test_data.py --save-baseline
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import time
+
+import generate_test_data
+from generate_test_data import CONFIG, EDGE_CASES, TestDataGenerator, np
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Benchmark settings
+BENCHMARK_CONFIG = {
+    'seed': 1,                          # Fixed seed and reference time: every run generates the same rows
+    'reference_now': datetime.datetime(2025, 1, 1),
+    'scale_factors': [0.2, 0.5, 1.0],   # End-to-end runs into an in-memory SQLite database
+    'min_seconds': 0.5,                 # Each micro benchmark repeats its operation for at least this long
+    'min_run_seconds': 1.0,             # Each end-to-end measurement repeats the run for at least this long
+    'repeats': 3,                       # Best of this many measurements is reported
+    'tolerance': 0.2                    # Fail when a rate drops more than 20% below its baseline
+}
+
+def measure(operation, min_seconds, repeats):
+    """Best rate of operation() in calls per second over `repeats` runs of at least min_seconds each"""
+    best = 0.0
+    for _ in range(repeats):
+        calls = 0
+        started = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_seconds:
+            for _ in range(100):
+                operation()
+            calls += 100
+            elapsed = time.perf_counter() - started
+        best = max(best, calls / elapsed)
+    return best
+
+def micro_benchmarks():
+    """Calls per second of the per-row helpers and of building one client's meeting schedule"""
+    generator = TestDataGenerator()
+    rng = random.Random(BENCHMARK_CONFIG['seed'])
+    now = BENCHMARK_CONFIG['reference_now']
+    start_date = now - datetime.timedelta(days=CONFIG['date_range_days'])
+    end_date = now + datetime.timedelta(days=30)
+    
+    operations = {
+        'random_date': lambda: generator.random_date(start_date, now, rng=rng),
+        'random_string': lambda: generator.random_string(10, rng=rng),
+        'get_edge_case_or_random': lambda: generator.get_edge_case_or_random(EDGE_CASES['names'], lambda: "name", rng=rng),
+        'meeting_schedule': lambda: generator._meeting_schedule(start_date, end_date, rng=rng),
+    }
+    if np is not None:
+        # One therapist's full set of clients, drawn as arrays
+        clients = list(range(1, CONFIG['num_clients_per_user'] + 1))
+        operations['meeting_columns_vectorized'] = lambda: generator._meeting_columns(1, clients, start_date, end_date)
+    
+    results = {}
+    for name, operation in operations.items():
+        results[name] = measure(operation, BENCHMARK_CONFIG['min_seconds'], BENCHMARK_CONFIG['repeats'])
+        print(f"  {name:<32}{results[name]:>14,.0f} calls/s")
+    return results
+
+def end_to_end_benchmarks():
+    """Rows per second of complete runs into an in-memory SQLite database at each scale factor.
+    
+    Small scale factors finish in a fraction of a second, so each measurement repeats the run
+    until it has taken min_run_seconds, like the micro benchmarks do.
+    """
+    results = {}
+    for scale_factor in BENCHMARK_CONFIG['scale_factors']:
+        CONFIG.update({'sink': 'sqlite', 'sqlite_path': ':memory:', 'scale_factor': scale_factor, 'workers': 1})
+        name = f"end_to_end_sf{scale_factor:g}"
+        for _ in range(BENCHMARK_CONFIG['repeats']):
+            runs = 0
+            rows = 0
+            elapsed = 0.0
+            while elapsed < BENCHMARK_CONFIG['min_run_seconds']:
+                # A fresh database every time; the fixed seed makes every run write the same rows
+                generator = TestDataGenerator()
+                started = time.perf_counter()
+                generator.run()
+                elapsed += time.perf_counter() - started
+                rows += sum(generator.writer.inserted.values())
+                runs += 1
+            results[name] = max(results.get(name, 0.0), rows / elapsed)
+        print(f"  {name:<32}{results[name]:>14,.0f} rows/s ({rows // runs} rows, best of "
+              f"{BENCHMARK_CONFIG['repeats']} x {runs} runs)")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Benchmarks whose rate fell more than `tolerance` below the baseline"""
+    regressions = []
+    for name, rate in results.items():
+        expected = baseline['results'].get(name)
+        if expected is None:
+            print(f"  {name}: no baseline")
+            continue
+        change = rate / expected - 1
+        status = "REGRESSION" if change < -tolerance else "ok"
+        print(f"  {name:<32}{change:>+8.1%}  {status}")
+        if change < -tolerance:
+            regressions.append(name)
+    return regressions
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark the test data generator against stored baselines")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store this run's results as the new baselines instead of comparing")
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help="baseline file (default: %(default)s)")
+    parser.add_argument('--tolerance', type=float, default=BENCHMARK_CONFIG['tolerance'],
+                        help="allowed drop below a baseline rate before it counts as a regression (default: %(default)s)")
+    parser.add_argument('--skip-end-to-end', action='store_true',
+                        help="only run the micro benchmarks")
+    return parser.parse_args()
+
+def main():
+    """Main function"""
+    args = parse_args()
+    logging.getLogger(generate_test_data.__name__).setLevel(logging.WARNING)
+    CONFIG['seed'] = BENCHMARK_CONFIG['seed']
+    CONFIG['reference_now'] = BENCHMARK_CONFIG['reference_now']
+    
+    print("Micro benchmarks:")
+    results = micro_benchmarks()
+    if not args.skip_end_to_end:
+        print("End-to-end generation:")
+        results.update(end_to_end_benchmarks())
+    
+    if args.save_baseline:
+        baseline = {
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+            'numpy': np.__version__ if np is not None else None,
+            'recorded_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'results': results
+        }
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump(baseline, handle, indent=2)
+            handle.write('\n')
+        print(f"Baselines written to {args.baseline}")
+        return
+    
+    if not os.path.exists(args.baseline):
+        raise SystemExit(f"No baselines at {args.baseline}; record them with --save-baseline")
+    with open(args.baseline, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    print(f"Compared with baselines recorded {baseline['recorded_at']} on {baseline['machine']}:")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        raise SystemExit(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+    print("No regressions")
+
+if __name__ == "__main__":
+    main()
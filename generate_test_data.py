@@ -7,14 +7,50 @@ To run this script, use the following command:
 source test_data_env/bin/activate && python3 generate_test_data.py
 """
 
-import mysql.connector
+import argparse
+import asyncio
+import bisect
+import calendar
+import contextlib
+import functools
+import gzip
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import queue
 import random
+import re
+import shutil
+import sqlite3
 import string
+import sys
+import tempfile
 import datetime
+import threading
 import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from typing import List, Dict, Any
 import logging
 
+try:
+    import mysql.connector
+    import mysql.connector.pooling
+except ImportError:                     # only the MySQL sink needs the driver
+    mysql = None
+
+try:
+    import numpy as np
+except ImportError:                     # only --vectorized needs NumPy
+    np = None
+
+try:
+    import resource
+except ImportError:                     # not available on Windows; peak RSS is then not reported
+    resource = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,21 +64,97 @@ DB_CONFIG = {
     'database': 'my_clinic',
     'charset': 'utf8mb4',
     'use_unicode': True,
-    'autocommit': True
+    'autocommit': False                 # BatchWriter commits explicitly, one transaction per batch
 }
 
 # Test data configuration - Production-like environment
 CONFIG = {
-    'num_users': 50,                    # Multiple therapists and admins
+    'num_users': 50,                    # Users at scale factor 1 (therapists and admins)
+    'scale_factor': 1.0,                # Multiplies the user count; per-user volumes stay the same
+    'therapist_ratio': 0.9,             # Share of users that are therapists, the rest are admins
     'num_clients_per_user': 25,         # Realistic client load per therapist
     'num_meetings_per_client': 30,      # Multiple sessions per client
     'num_personal_meetings_per_user': 15, # Regular personal development
     'num_expenses_per_user': 50,        # Comprehensive expense tracking
     'date_range_days': 365,             # Full year of data
     'include_edge_cases': True,
-    'production_simulation': True        # Enable production-like scenarios
+    'production_simulation': True,       # Enable production-like scenarios
+    'batch_size': 1000,                 # Rows per multi-row INSERT (and per transaction)
+    'workers': 1,                       # Processes generating per-therapist data in parallel
+    'seed': None,                       # Base RNG seed; None picks (and logs) a random one
+    'reference_now': None,              # "Now" all dates hang off; None means today at midnight
+    'output_dir': None,                 # Write per-table TSV files + a LOAD DATA script instead of INSERTs
+    'vectorized': False,                # Draw meeting schedules as NumPy arrays (needs numpy)
+    'chunk_size': 10,                   # Therapists per chunk; progress is checkpointed after every chunk
+    'checkpoint_file': 'test_data.checkpoint.json', # Progress file --resume continues from
+    'sink': 'mysql',                    # Database rows are written to: 'mysql' or 'sqlite'
+    'sqlite_path': 'test_data.sqlite3', # SQLite database file (':memory:' for a throwaway database)
+    'metrics_json': None,               # Also write the run's stage timings and counters to this JSON file
+    'query_concurrency': 8,             # Threads (one connection each) replaying queries with --query-load
+    'api_base_url': 'http://localhost:8080', # Backend --http-load logs in to and calls
+    'http_users': 20,                   # Therapists using the API concurrently with --http-load
+    'http_pool_size': 10,               # Keep-alive connections the --http-load users share
+    'distribution_profile': 'uniform',  # Name in DISTRIBUTION_PROFILES, or a profile dict of the same shape
+    'collision_rate': None,             # None: no overlap checks; else share of meetings deliberately double-booked
+    'pool_size': 4,                     # MySQL connections per process in the pool writers and query threads share
+    'write_retries': 5,                 # Attempts at a batch hit by a deadlock, lock wait timeout or lost connection
+    'retry_backoff': 0.5,               # Seconds before the first retry; doubles with every attempt (plus jitter)
+    'health_check_seconds': 30,         # Ping a connection that sat idle this long before its next batch
+    'fast_load': False,                 # Load without secondary indexes and FK checks, rebuild them after
+    'writer_threads': 0,                # Threads per process writing batches while rows are generated; 0 writes inline
+    'snapshot_dir': 'test_data_snapshots' # Compressed dumps of generated datasets, one directory per seed and scale factor
+}
+
+# How client counts, meeting volume per month and meeting times are distributed; None keeps the uniform default
+DISTRIBUTION_PROFILES = {
+    'uniform': {
+        'client_counts': None,          # uniform between 15 and num_clients_per_user
+        'monthly_volume': None,         # every scheduled session takes place
+        'weekday_hours': None,          # any day, uniform over 9:00-18:00
+    },
+    'production': {
+        # Zipf-like client counts: most therapists have 15-40 clients, a few have hundreds
+        'client_counts': {'exponent': 2.2, 'min': 15, 'max': 400},
+        # Relative meeting volume per month, January first: busy autumn and winter, quiet summer and holidays
+        'monthly_volume': [1.0, 1.0, 0.95, 0.8, 0.9, 0.85, 0.7, 0.55, 0.8, 1.0, 1.0, 0.85],
+        # Relative load per weekday (Monday = 0) and start hour 9..18: Sunday and Monday mornings are hot,
+        # Friday ends at noon and Saturday only has evening sessions
+        'weekday_hours': {
+            6: [9, 10, 10, 8, 5, 5, 6, 6, 4, 2],
+            0: [8, 9, 9, 7, 5, 5, 6, 6, 4, 2],
+            1: [5, 6, 6, 5, 4, 4, 5, 5, 4, 2],
+            2: [5, 6, 6, 5, 4, 4, 5, 5, 4, 2],
+            3: [4, 5, 5, 4, 4, 4, 5, 5, 3, 2],
+            4: [3, 4, 4, 2, 0, 0, 0, 0, 0, 0],
+            5: [0, 0, 0, 0, 0, 0, 0, 0, 1, 1],
+        },
+    },
 }
 
+# Start hours of client meetings, the hours the weekday_hours weights refer to
+MEETING_HOURS = [9, 10, 11, 12, 13, 14, 15, 16, 17, 18]
+
+# Flyway schema the SQLite sink is created from
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'src', 'main', 'resources', 'db', 'migration', 'V1__consolidated_schema.sql')
+
+# Tables in foreign-key order, the order bulk-load files must be loaded in
+TABLE_LOAD_ORDER = [
+    'users', 'clients', 'meetings', 'personal_meetings', 'expenses', 'payments', 'calendar_integrations'
+]
+
+# Columns of the generated tables with a UNIQUE index; bulk-load files skip rows that would repeat a value
+UNIQUE_COLUMNS = {'users': ('username', 'email')}
+
+# Columns that reference another row of the same table (the first session of a recurring series)
+SELF_REFERENCES = {'meetings': 'parent_meeting_id'}
+
+# Stages that run after every table is loaded (--fast-load), reported after the table stages
+POST_LOAD_STAGES = ('rebuild_indexes', 'check_foreign_keys')
+
+# Users the Flyway schema seeds; --reset keeps them along with the reference tables
+SEEDED_USERNAMES = ['admin']
+
 # Edge case data
 EDGE_CASES = {
     'names': [
@@ -103,62 +215,1490 @@ EDGE_CASES = {
         "050-123-4567 ext. 123",
         "050-123-4567 ext. 123",
         "050-123-4567 ext. 123",
-    ]
+    ],
+    'meeting_notes': ["", "   ", "NULL", "Notes'--", "Notes\"--", "Notes\\--", "A" * 1000],
+    'meeting_summaries': ["", "   ", "NULL", "Summary'--", "Summary\"--", "Summary\\--", "A" * 2000],
 }
 
-class TestDataGenerator:
+# Columns of every generated meeting row
+MEETING_COLUMNS = (
+    'id', 'user_id', 'client_id', 'meeting_date', 'duration', 'price', 'notes', 'summary',
+    'status', 'is_paid', 'is_active', 'is_recurring', 'recurrence_frequency',
+    'total_sessions', 'session_number', 'parent_meeting_id', 'created_at'
+)
+
+# MeetingRepository's queries in the shape Hibernate sends them (the entity's associations are lazy, so
+# every query reads the meetings table alone); {p} is the sink's placeholder
+MEETING_SELECT = (
+    "SELECT m.id, m.client_id, m.created_at, m.duration, m.google_event_id, m.is_active, m.is_paid, "
+    "m.is_recurring, m.meeting_date, m.notes, m.parent_meeting_id, m.price, m.recurrence_frequency, "
+    "m.session_number, m.status, m.summary, m.total_sessions, m.user_id FROM meetings m"
+)
+MEETING_QUERIES = {
+    'findByUser': MEETING_SELECT + " WHERE m.user_id = {p}",
+    'findByUserAndMeetingDateBetween': MEETING_SELECT + " WHERE m.user_id = {p} AND m.meeting_date BETWEEN {p} AND {p}",
+    'findByClient': MEETING_SELECT + " WHERE m.client_id = {p}",
+    'findByUserAndMonthYear': MEETING_SELECT + " WHERE m.user_id = {p} AND YEAR(m.meeting_date) = {p} "
+                                               "AND MONTH(m.meeting_date) = {p}",
+    'findByUserAndIsPaidFalse': MEETING_SELECT + " WHERE m.user_id = {p} AND m.is_paid = 0",
+    'findTop5ByOrderByCreatedAtDesc': MEETING_SELECT + " ORDER BY m.created_at DESC LIMIT {p}",
+}
+
+# Plaintext of the bcrypt hash every generated user gets, for logging in through AuthController
+TEST_USER_PASSWORD = '123456'
+
+# Dashboard and calendar calls of a therapist and how often each is made, for --http-load
+API_REQUEST_MIX = [
+    (10, '/api/meetings/user-dashboard-stats'),
+    (20, '/api/meetings/month?year={year}&month={month}'),
+    (8, '/api/meetings'),
+    (6, '/api/meetings/revenue?period={period}'),
+    (12, '/api/clients'),
+    (6, '/api/clients/search?name={name}'),
+    (6, '/api/expenses'),
+    (5, '/api/expenses/summary'),
+    (5, '/api/expenses/upcoming'),
+    (6, '/api/payments/date-range?startDate={start}&endDate={end}'),
+]
+
+# Realistic meeting notes and summaries
+MEETING_NOTES = [
+    "Initial assessment session",
+    "Follow-up therapy session",
+    "Crisis intervention",
+    "Progress review",
+    "Family session",
+    "Couples therapy",
+    "Group therapy session",
+    "Assessment and evaluation",
+    "Treatment planning session",
+    "Relapse prevention",
+    "Coping skills training",
+    "Mindfulness practice",
+    "Cognitive behavioral therapy",
+    "Dialectical behavior therapy",
+    "Exposure therapy",
+    "EMDR session",
+    "Play therapy",
+    "Art therapy",
+    "Music therapy",
+    "Movement therapy"
+]
+
+MEETING_SUMMARIES = [
+    "Client showed significant progress in managing anxiety symptoms. Implemented new coping strategies effectively.",
+    "Explored childhood trauma and its impact on current relationships. Client demonstrated increased self-awareness.",
+    "Focused on communication skills in couples therapy. Both partners engaged actively in the session.",
+    "Conducted comprehensive assessment for ADHD. Client reported improved focus with medication management.",
+    "Addressed eating disorder recovery progress. Client maintained healthy eating patterns this week.",
+    "PTSD treatment session - client processed traumatic memories with reduced distress levels.",
+    "Family therapy focused on improving parent-child communication. Positive changes observed.",
+    "Child therapy session - used play therapy to address behavioral concerns.",
+    "Substance abuse counseling - client maintained sobriety and attended support groups.",
+    "Grief therapy - client processed loss and developed healthy coping mechanisms.",
+    "Stress management techniques practiced. Client reported reduced work-related anxiety.",
+    "Anger management session - client learned new conflict resolution skills.",
+    "Self-esteem building activities. Client demonstrated increased confidence.",
+    "Relationship counseling - addressed trust issues and communication patterns.",
+    "Work stress management - developed strategies for work-life balance.",
+    "Parenting support - discussed effective discipline techniques.",
+    "Life transition support - client adapted well to recent changes.",
+    "Chronic pain management - integrated psychological and physical approaches.",
+    "Sleep disorder treatment - implemented sleep hygiene practices.",
+    "OCD treatment - exposure and response prevention techniques practiced."
+]
+
+# Realistic expense descriptions
+EXPENSE_DESCRIPTIONS = [
+    "Monthly office supplies for therapy practice",
+    "Professional development workshop registration",
+    "Annual professional liability insurance premium",
+    "Software license renewal for practice management",
+    "Marketing materials for new client acquisition",
+    "Travel expenses for professional conference",
+    "Equipment upgrade for improved client care",
+    "Monthly utility bills for office space",
+    "Office rent payment for therapy practice",
+    "Professional services for practice management"
+]
+
+# Production-like expense categories with realistic amounts
+EXPENSE_CATEGORIES = {
+    'Office Supplies': {
+        'names': ['Printer paper', 'Pens and notebooks', 'Staples and clips', 'Whiteboard markers', 'File folders'],
+        'amounts': (10.00, 200.00)
+    },
+    'Professional Development': {
+        'names': ['Conference registration', 'Workshop fees', 'Online course', 'Professional books', 'Certification exam'],
+        'amounts': (200.00, 2000.00)
+    },
+    'Insurance': {
+        'names': ['Professional liability insurance', 'Office insurance', 'Health insurance', 'Disability insurance'],
+        'amounts': (500.00, 5000.00)
+    },
+    'Software': {
+        'names': ['Therapy software license', 'Accounting software', 'Video conferencing platform', 'Practice management system'],
+        'amounts': (50.00, 500.00)
+    },
+    'Marketing': {
+        'names': ['Website hosting', 'Business cards', 'Online advertising', 'Brochures and flyers', 'SEO services'],
+        'amounts': (100.00, 1000.00)
+    },
+    'Travel': {
+        'names': ['Conference travel', 'Client home visits', 'Professional meetings', 'Training workshops'],
+        'amounts': (50.00, 500.00)
+    },
+    'Equipment': {
+        'names': ['Computer upgrade', 'Office furniture', 'Therapy equipment', 'Audio recording device', 'Security camera'],
+        'amounts': (200.00, 3000.00)
+    },
+    'Utilities': {
+        'names': ['Electricity bill', 'Internet service', 'Phone service', 'Water bill', 'Heating/cooling'],
+        'amounts': (100.00, 800.00)
+    },
+    'Rent': {
+        'names': ['Office rent', 'Storage unit', 'Meeting room rental'],
+        'amounts': (2000.00, 8000.00)
+    },
+    'Professional Services': {
+        'names': ['Accounting services', 'Legal consultation', 'IT support', 'Cleaning services'],
+        'amounts': (150.00, 1500.00)
+    }
+}
+
+# Session duration/price options per client source pricing tier
+SOURCE_PRICING_TIERS = {
+    'Private': {'durations': [60, 90, 120], 'prices': [350.00, 400.00, 450.00]},
+    'Natal': {'durations': [45, 60, 90], 'prices': [300.00, 350.00, 400.00]},
+    'Clalit': {'durations': [30, 45, 60], 'prices': [280.00, 300.00, 320.00]},
+}
+DEFAULT_PRICING_TIER = 'Clalit'
+
+def translate_schema_for_sqlite(sql):
+    """Rewrite the MySQL Flyway schema into SQLite DDL (key types, ENUMs, ALTER TABLE foreign keys)"""
+    sql = re.sub(r"--[^\n]*", '', sql)
+    sql = sql.replace('BIGINT AUTO_INCREMENT PRIMARY KEY', 'INTEGER PRIMARY KEY')
+    sql = re.sub(r"(\w+) ENUM\(([^)]*)\)", r"\1 TEXT CHECK (\1 IN (\2))", sql)
+    sql = re.sub(r"\s+ON UPDATE CURRENT_TIMESTAMP", '', sql)
+    sql = re.sub(r"\s+COMMENT '[^']*'", '', sql)
+    
+    # SQLite cannot add constraints later, so fold them into the CREATE TABLE statement
+    for table, constraint in re.findall(r"ALTER TABLE (\w+)\s+ADD (CONSTRAINT [^;]*);", sql):
+        sql = re.sub(rf"(CREATE TABLE {table} \(.*?)\n\);",
+                     lambda match: f"{match.group(1)},\n    {' '.join(constraint.split())}\n);",
+                     sql, count=1, flags=re.S)
+    sql = re.sub(r"ALTER TABLE \w+\s+ADD CONSTRAINT [^;]*;", '', sql)
+    
+    # InnoDB indexes every foreign key column; without them deleting parent rows scans the child tables
+    for table, body in re.findall(r"CREATE TABLE (\w+) \((.*?)\n\);", sql, flags=re.S):
+        for column in re.findall(r"FOREIGN KEY \((\w+)\)", body):
+            if not re.search(rf"ON {table}\({column}[,)]", sql):
+                sql += f"\nCREATE INDEX fk_{table}_{column} ON {table}({column});"
+    return sql
+
+class MySQLSink:
+    """The MySQL server in DB_CONFIG, through a pool of connections shared by the threads of a process"""
+    name = 'mysql'
+    placeholder = '%s'
+    retryable = {1213, 1205, 2006, 2013, 2055}  # deadlock, lock wait timeout and lost connections
+    lost_connection = {2006, 2013, 2055}        # retried on a reconnected connection
+
+    def __init__(self, config=None, pool_size=None, local_infile_dir=None):
+        if mysql is None:
+            raise RuntimeError("mysql-connector-python is not installed (pip install -r requirements.txt), "
+                               "or use --sink sqlite")
+        self.config = config or DB_CONFIG
+        self.local_infile_dir = local_infile_dir  # the only directory LOAD DATA LOCAL INFILE may read from
+        if local_infile_dir:
+            self.config = dict(self.config, allow_local_infile_in_path=local_infile_dir)
+        self.errors = (mysql.connector.Error,)
+        self.pool_size = pool_size or CONFIG['pool_size']
+        self.pool = None
+        self.slots = None       # semaphore making acquire() wait for a free connection instead of failing
+        self.connection = None  # the connection of the thread that called connect()
+
+    def connect(self):
+        """Create the pool and take its first connection"""
+        self.pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_name=f"test_data_{os.getpid()}", pool_size=self.pool_size, **self.config)
+        self.slots = threading.BoundedSemaphore(self.pool_size)
+        self.connection = self.acquire()
+        return self.connection
+
+    def acquire(self):
+        """Take a connection from the pool, waiting while all of them are in use"""
+        self.slots.acquire()
+        try:
+            connection = self.pool.get_connection()
+            self._configure(connection)
+            return connection
+        except self.errors:
+            self.slots.release()
+            raise
+
+    @staticmethod
+    def _configure(connection):
+        # Session settings; the pool resets them when a connection is returned
+        # UNIQUE_CHECKS stays on: edge cases repeat usernames and emails, and with the checks off
+        # InnoDB may store the duplicates instead of rejecting them
+        if CONFIG['fast_load']:
+            cursor = connection.cursor()
+            cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 0")
+            cursor.close()
+
+    def release(self, connection):
+        """Return a connection taken with acquire() to the pool"""
+        try:
+            connection.close()
+        finally:
+            self.slots.release()
+
+    def check(self, connection):
+        """Health check between batches: ping the server, reconnecting if the connection was dropped"""
+        if not connection.is_connected():
+            self.reconnect(connection)
+
+    def reconnect(self, connection):
+        """Reopen a lost connection in place, so cursors on it stay usable"""
+        connection.reconnect(attempts=CONFIG['write_retries'], delay=CONFIG['retry_backoff'])
+        self._configure(connection)
+
+    def foreign_keys(self, cursor, tables):
+        """(table, column, referenced table, referenced column) of every foreign key on the tables"""
+        cursor.execute("SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME "
+                       "FROM information_schema.KEY_COLUMN_USAGE "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL")
+        return [key for key in cursor.fetchall() if key[0] in tables]
+
+    def secondary_indexes(self, cursor, tables):
+        """Non-unique indexes on the tables that no foreign key relies on, as (table, name, columns).
+        
+        MySQL refuses to drop an index a foreign key needs even with FOREIGN_KEY_CHECKS off, so indexes
+        led by a foreign key column stay; with the checks off they cost no parent lookups either.
+        """
+        key_columns = {(table, column) for table, column, _, _ in self.foreign_keys(cursor, tables)}
+        cursor.execute("SELECT TABLE_NAME, INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX SEPARATOR ', ') "
+                       "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND NON_UNIQUE = 1 "
+                       "GROUP BY TABLE_NAME, INDEX_NAME ORDER BY TABLE_NAME, INDEX_NAME")
+        return [(table, name, columns) for table, name, columns in cursor.fetchall()
+                if table in tables and (table, columns.split(', ')[0]) not in key_columns]
+
+    def drop_index_statements(self, table, indexes):
+        """SQL dropping a table's (name, columns) indexes"""
+        return [f"ALTER TABLE {table} " + ', '.join(f"DROP INDEX {name}" for name, _ in indexes)]
+
+    def truncate_statement(self, table):
+        """SQL deleting every row of a table (needs foreign key checks off while other tables reference it)"""
+        return f"TRUNCATE TABLE {table}"
+
+    def foreign_key_checks_statement(self, enabled):
+        """SQL turning foreign key checks on or off for the session"""
+        return f"SET SESSION FOREIGN_KEY_CHECKS = {int(enabled)}"
+
+    def create_index_statements(self, table, indexes):
+        """SQL creating a table's (name, columns) indexes, all of them in one pass over its rows"""
+        return [f"ALTER TABLE {table} " + ', '.join(f"ADD INDEX {name} ({columns})" for name, columns in indexes)]
+
+    def cursor(self, buffered=False, connection=None):
+        """New cursor; buffered cursors can run queries while results of another are unread"""
+        return (connection or self.connection).cursor(buffered=buffered)
+
+    def load_dump(self, cursor, table, columns, dump_path):
+        """LOAD DATA LOCAL INFILE a gzipped --snapshot dump, decompressed into local_infile_dir; returns the rows loaded"""
+        path = os.path.join(self.local_infile_dir, f"{table}.tsv")
+        with gzip.open(dump_path, 'rb') as dump, open(path, 'wb') as unpacked:
+            shutil.copyfileobj(dump, unpacked)
+        try:
+            cursor.execute(f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                           f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                           f"({', '.join(columns)})", (path,))
+            return cursor.rowcount
+        finally:
+            os.remove(path)
+
+    def describe(self):
+        """Where the rows go, for log messages"""
+        return f"MySQL {self.config['host']}:{self.config['port']}/{self.config['database']}"
+
+    def close(self):
+        """Return the connection and close the pool's idle connections"""
+        if self.connection:
+            self.release(self.connection)
+            self.connection = None
+        if self.pool:
+            # The pool has no public call that closes the connections it holds
+            self.pool._remove_connections()
+
+class SQLiteSink:
+    """Embedded SQLite database created from the translated Flyway schema, for runs without a MySQL server"""
+    name = 'sqlite'
+    placeholder = '?'
+    errors = (sqlite3.Error,)
+    retryable = {'SQLITE_BUSY', 'SQLITE_LOCKED'}   # another process held the write lock past the timeout
+    lost_connection = set()
+    # Compiled statements kept per connection. Every partial batch is an INSERT of its own size, and a
+    # compiled 1000-row INSERT takes megabytes, so the default of 128 grows memory with the run's length
+    cached_statements = 16
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = None
+
+    def connect(self):
+        """Open the database, creating the schema (and its seed rows) when it does not exist yet"""
+        sqlite3.register_adapter(datetime.datetime, lambda value: value.isoformat(' '))
+        sqlite3.register_adapter(datetime.date, lambda value: value.isoformat())
+        self.connection = self._open()
+        # An existing file may still be empty, e.g. when an earlier run failed before creating the schema
+        tables = self.connection.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+        if not tables:
+            with open(SCHEMA_FILE, encoding='utf-8') as schema:
+                # One transaction, so a failure cannot leave half a schema behind
+                self.connection.executescript(f"BEGIN;\n{translate_schema_for_sqlite(schema.read())}\nCOMMIT;")
+            logger.info(f"Created SQLite schema in {self.path} from {os.path.basename(SCHEMA_FILE)}")
+        if self.path != ':memory:':
+            # Lets worker processes read while another one holds the write lock
+            self.connection.execute("PRAGMA journal_mode = WAL")
+        return self.connection
+
+    def _open(self):
+        connection = sqlite3.connect(self.path, timeout=60, cached_statements=self.cached_statements)
+        connection.execute(f"PRAGMA foreign_keys = {'OFF' if CONFIG['fast_load'] else 'ON'}")
+        # MySQL date functions the repository queries use (dates are stored as ISO text)
+        connection.create_function('YEAR', 1, lambda value: int(value[:4]) if value else None, deterministic=True)
+        connection.create_function('MONTH', 1, lambda value: int(value[5:7]) if value else None, deterministic=True)
+        return connection
+
+    def acquire(self):
+        """Another connection to the database file, for the calling thread (an in-memory database has only one)"""
+        return self.connection if self.path == ':memory:' else self._open()
+
+    def release(self, connection):
+        """Close a connection taken with acquire()"""
+        if connection is not self.connection:
+            connection.close()
+
+    def check(self, connection):
+        """Health check between batches; a local file needs none"""
+
+    def reconnect(self, connection):
+        """SQLite connections are not lost"""
+
+    def foreign_keys(self, cursor, tables):
+        """(table, column, referenced table, referenced column) of every foreign key on the tables"""
+        keys = []
+        for table in tables:
+            cursor.execute(f"PRAGMA foreign_key_list({table})")
+            keys.extend((table, column, parent, parent_column or 'id')
+                        for _, _, parent, column, parent_column, *_ in cursor.fetchall())
+        return keys
+
+    def secondary_indexes(self, cursor, tables):
+        """Non-unique indexes created with CREATE INDEX on the tables, as (table, name, columns)"""
+        indexes = []
+        for table in tables:
+            cursor.execute(f"PRAGMA index_list({table})")
+            for _, name, unique, origin, _ in cursor.fetchall():
+                if origin == 'c' and not unique:
+                    cursor.execute(f"PRAGMA index_info({name})")
+                    indexes.append((table, name, ', '.join(column for _, _, column in cursor.fetchall())))
+        return indexes
+
+    def drop_index_statements(self, table, indexes):
+        """SQL dropping a table's (name, columns) indexes"""
+        return [f"DROP INDEX {name}" for name, _ in indexes]
+
+    def truncate_statement(self, table):
+        """SQL deleting every row of a table"""
+        return f"DELETE FROM {table}"
+
+    def foreign_key_checks_statement(self, enabled):
+        """SQL turning foreign key checks on or off (outside a transaction)"""
+        return f"PRAGMA foreign_keys = {'ON' if enabled else 'OFF'}"
+
+    def create_index_statements(self, table, indexes):
+        """SQL creating a table's (name, columns) indexes"""
+        return [f"CREATE INDEX {name} ON {table} ({columns})" for name, columns in indexes]
+
+    def cursor(self, buffered=False, connection=None):
+        """New cursor (SQLite cursors are always buffered)"""
+        return (connection or self.connection).cursor()
+
+    def load_dump(self, cursor, table, columns, dump_path):
+        """Insert a gzipped --snapshot dump in multi-row INSERTs of batch_size rows; returns the rows loaded.
+        
+        They bind the dumped text straight away, with no BatchWriter bookkeeping per row, and beat
+        executemany's one statement per row by about a third.
+        """
+        row_placeholder = f"({', '.join('?' * len(columns))})"
+        rows = 0
+        with gzip.open(dump_path, 'rt', encoding='utf-8', newline='\n') as dump:
+            while True:
+                batch = [parse_dump_line(line) for line in itertools.islice(dump, CONFIG['batch_size'])]
+                if not batch:
+                    return rows
+                cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                               + ', '.join([row_placeholder] * len(batch)), [value for row in batch for value in row])
+                rows += len(batch)
+
+    def describe(self):
+        """Where the rows go, for log messages"""
+        return f"SQLite {self.path}"
+
+    def close(self):
+        """Close the connection"""
+        if self.connection:
+            self.connection.close()
+
+class LookupCache:
+    """name -> id maps for reference tables, loaded once and shared by all generators"""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.cursor = sink.cursor(buffered=True)
+        self.tables = {}    # table -> {name: id}
+
+    def load(self, table, key_column='name'):
+        """(Re)load a reference table into the cache"""
+        self.cursor.execute(f"SELECT {key_column}, id FROM {table}")
+        self.tables[table] = dict(self.cursor.fetchall())
+        return self.tables[table]
+
+    def get(self, table, name, default=None):
+        """Id for a name, or default when the table has no such row"""
+        return self.tables.get(table, {}).get(name, default)
+
+    def ids(self, table):
+        """All cached ids of a table, in ascending order"""
+        return sorted(self.tables.get(table, {}).values())
+
+    def ensure(self, table, rows, key_column='name'):
+        """Create the rows whose key is not cached yet in a single INSERT, then refresh the table"""
+        cached = self.tables.get(table) or self.load(table, key_column)
+        missing = [row for row in rows if row[key_column] not in cached]
+        if not missing:
+            return 0
+        
+        columns = list(missing[0])
+        row_placeholder = f"({', '.join([self.sink.placeholder] * len(columns))})"
+        self.cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ', '.join([row_placeholder] * len(missing)),
+            [row[column] for row in missing for column in columns]
+        )
+        self.sink.connection.commit()
+        self.load(table, key_column)
+        return len(missing)
+
+class IdAllocator:
+    """Hands out primary keys client-side so rows never depend on lastrowid.
+    
+    Each table's MAX(id) is read once; after that ids come from memory, either one at a time or
+    as contiguous blocks that can be handed to other processes.
+    """
+
+    def __init__(self, cursor=None, blocks=None):
+        self.cursor = cursor
+        self.next_ids = {}                  # table -> next free id
+        self.blocks = dict(blocks or {})    # table -> range this allocator is confined to
+
+    def reserve(self, table, count):
+        """Reserve a contiguous range of count ids"""
+        if table not in self.next_ids:
+            if table in self.blocks:
+                self.next_ids[table] = self.blocks[table].start
+            else:
+                self.cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+                self.next_ids[table] = self.cursor.fetchone()[0] + 1
+        
+        start = self.next_ids[table]
+        if table in self.blocks and start + count > self.blocks[table].stop:
+            raise RuntimeError(f"Id block for {table} exhausted ({self.blocks[table]})")
+        self.next_ids[table] = start + count
+        return range(start, start + count)
+
+    def next_id(self, table):
+        """Reserve a single id"""
+        return self.reserve(table, 1).start
+
+    def snapshot(self):
+        """Next free id per table, for checkpoints"""
+        return dict(self.next_ids)
+
+    def restore(self, next_ids):
+        """Continue from a snapshot instead of reading MAX(id)"""
+        self.next_ids.update(next_ids)
+
+class BatchWriter:
+    """Buffers rows per table and writes them as multi-row INSERTs, one transaction per batch"""
+
+    def __init__(self, sink, batch_size=1000, connection=None):
+        self.sink = sink
+        self.connection = connection or sink.connection
+        self.cursor = sink.cursor(connection=self.connection)
+        self.batch_size = batch_size
+        self.pending = {}   # (table, columns) -> list of (values, label, on_insert)
+        self.inserted = {}  # table -> rows written
+        self.failed = {}    # table -> rows rejected by the database
+        self.failed_by_code = {}    # database error code -> rows rejected with it
+        self.retried_by_code = {}   # transient error code -> batches retried after it
+        self.write_seconds = 0.0    # time spent in the database, as opposed to generating rows
+        self.round_trips = 0        # statements and commits sent to the database
+        self.last_write = time.monotonic()
+
+    def add(self, table, columns, values, label=None, on_insert=None):
+        """Queue a row; on_insert() is called once it is stored, rejected rows are only logged"""
+        key = (table, tuple(columns))
+        rows = self.pending.setdefault(key, [])
+        rows.append((values, label or table, on_insert))
+        if len(rows) >= self.batch_size:
+            self._flush_batch(key)
+
+    def inserted_count(self, table):
+        """Number of rows successfully written to a table so far"""
+        return self.inserted.get(table, 0)
+
+    def flush(self, table=None):
+        """Write all pending rows (optionally only for one table)"""
+        for key in list(self.pending):
+            if table is None or key[0] == table:
+                self._flush_batch(key)
+
+    def _flush_batch(self, key):
+        rows = self.pending.pop(key, [])
+        if not rows:
+            return
+        for on_insert in self.write_batch(key, rows):
+            if on_insert:
+                on_insert()
+
+    def write_batch(self, key, rows):
+        """Write one batch in a single INSERT; returns the on_insert callbacks of the rows that were stored"""
+        table, columns = key
+        row_placeholder = f"({', '.join([self.sink.placeholder] * len(columns))})"
+        reconnected = []
+        
+        def write():
+            pending = self._split_stored(table, columns, rows)[1] if reconnected else rows
+            if not pending:
+                return
+            self.round_trips += 2
+            self.cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+                                + ', '.join([row_placeholder] * len(pending)),
+                                [value for values, _, _ in pending for value in values])
+            self.connection.commit()
+        
+        started = time.perf_counter()
+        try:
+            if time.monotonic() - self.last_write > CONFIG['health_check_seconds']:
+                self.sink.check(self.connection)
+            retry_transient(self.sink, self.connection, write, f"batch of {len(rows)} {table}", self.retried_by_code,
+                            on_reconnect=lambda: reconnected.append(True))
+        except self.sink.errors as err:
+            if error_code(err) in self.sink.retryable:
+                raise
+            self.connection.rollback()
+            self.write_seconds += time.perf_counter() - started
+            logger.debug(f"Batch insert into {table} failed ({err}), retrying {len(rows)} rows one by one")
+            return self._insert_rows_individually(table, columns, rows)
+        finally:
+            self.last_write = time.monotonic()
+        self.write_seconds += time.perf_counter() - started
+        
+        self.inserted[table] = self.inserted.get(table, 0) + len(rows)
+        return [on_insert for _, _, on_insert in rows]
+
+    def _insert_rows_individually(self, table, columns, rows):
+        """Fallback for a rejected batch so only the offending rows are skipped.
+        
+        A deadlock or lost connection undoes the rows inserted before it, so transient errors are not
+        counted as rejected rows: retry_transient starts the batch over instead.
+        """
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([self.sink.placeholder] * len(columns))})"
+        reconnected = []
+        
+        def insert():
+            stored, rejected = [], []
+            pending = rows
+            if reconnected:
+                committed, pending = self._split_stored(table, columns, rows)
+                stored.extend(on_insert for _, _, on_insert in committed)
+            for values, label, on_insert in pending:
+                try:
+                    self.round_trips += 1
+                    self.cursor.execute(sql, values)
+                except self.sink.errors as err:
+                    if error_code(err) in self.sink.retryable:
+                        raise
+                    rejected.append((label, err))
+                    continue
+                stored.append(on_insert)
+            self.round_trips += 1
+            self.connection.commit()
+            return stored, rejected
+        
+        started = time.perf_counter()
+        try:
+            stored, rejected = retry_transient(self.sink, self.connection, insert, f"{len(rows)} {table} rows one by one",
+                                               self.retried_by_code, on_reconnect=lambda: reconnected.append(True))
+        finally:
+            self.write_seconds += time.perf_counter() - started
+        
+        for label, err in rejected:
+            logger.warning(f"Failed to insert {label}: {err}")
+            self.failed[table] = self.failed.get(table, 0) + 1
+            code = error_code(err)
+            self.failed_by_code[code] = self.failed_by_code.get(code, 0) + 1
+        self.inserted[table] = self.inserted.get(table, 0) + len(stored)
+        return stored
+
+    def _split_stored(self, table, columns, rows):
+        """(rows already in the table, rows to write) of a batch retried on a new connection.
+        
+        A commit whose reply was lost with the connection may have gone through; its rows are stored,
+        so they are not written again (failing as duplicates) and their on_insert callbacks still run.
+        """
+        if 'id' not in columns:
+            return [], rows
+        position = columns.index('id')
+        ids = [values[position] for values, _, _ in rows]
+        self.round_trips += 1
+        self.cursor.execute(f"SELECT id FROM {table} WHERE id IN ({', '.join([self.sink.placeholder] * len(ids))})", ids)
+        stored_ids = {stored_id for stored_id, in self.cursor.fetchall()}
+        committed, pending = [], []
+        for row in rows:
+            # Rows are written in order, so of rows sharing an id the first is the one stored
+            if row[0][position] in stored_ids:
+                stored_ids.discard(row[0][position])
+                committed.append(row)
+            else:
+                pending.append(row)
+        if committed:
+            logger.warning(f"{len(committed)} of {len(rows)} {table} rows were committed before the connection "
+                           f"was lost; writing the other {len(pending)}")
+        return committed, pending
+    
+    def close(self):
+        """Release the cursor; rows that were never flushed are discarded"""
+        self.pending.clear()
+        self.cursor.close()
+
+class PipelinedWriter:
+    """BatchWriter whose batches are written by background threads while the generator keeps producing rows.
+    
+    Full batches go round-robin through small bounded queues to writer threads, each with its own
+    BatchWriter on a pooled connection. With foreign key checks on, a batch with rows referencing rows
+    of its own table in earlier batches (SELF_REFERENCES) waits until those batches are stored. The
+    waits only point back, so they cannot deadlock. flush() waits for the queued batches and then runs
+    their on_insert callbacks in the order the batches were queued, so the rows generated afterwards
+    do not depend on how the threads were scheduled.
+    """
+
+    def __init__(self, sink, batch_size, threads):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.pending = {}           # (table, columns) -> list of (values, label, on_insert)
+        self.queues = [queue.Queue(maxsize=2) for _ in range(threads)]  # the generator blocks when writers fall behind
+        self.writers = [None] * threads     # per thread BatchWriter, created on the thread's own connection
+        self.id_ranges = {}         # table -> [(first id, last id, stored event)] of the batches queued since the last flush
+        self.batches = 0            # batches queued so far
+        self.stored = {}            # batch number -> on_insert callbacks of its stored rows
+        self.error = None           # first exception raised in a writer thread
+        self.write_seconds = 0.0    # time the generator waited for the writer threads
+        self.background_write_seconds = 0.0 # wall time during which any writer thread was in the database
+        self.busy = 0               # writer threads in the database right now
+        self.busy_since = 0.0
+        self.busy_lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._drain, args=(number,), name=f"writer-{number}", daemon=True)
+                        for number in range(threads)]
+        for thread in self.threads:
+            thread.start()
+
+    def _drain(self, number):
+        """Writer thread: write queued batches until the None sentinel arrives"""
+        try:
+            writer = self.writers[number] = BatchWriter(self.sink, self.batch_size, self.sink.acquire())
+        except Exception as err:
+            self.error = self.error or err
+            writer = None
+        while True:
+            item = self.queues[number].get()
+            try:
+                if item is None:
+                    break
+                batch, key, rows, stored, parents = item
+                try:
+                    for parent in parents:
+                        parent.wait()
+                    # After an error the batches are only drained, so the generator never blocks on a full queue
+                    if writer and not self.error:
+                        self._busy(1)
+                        try:
+                            self.stored[batch] = writer.write_batch(key, rows)
+                        finally:
+                            self._busy(-1)
+                finally:
+                    stored.set()
+            except Exception as err:
+                self.error = self.error or err
+            finally:
+                self.queues[number].task_done()
+        if writer:
+            writer.close()
+            self.sink.release(writer.connection)
+
+    def _busy(self, change):
+        """Count writer threads in the database; overlapping writes count once, as the database serializes them"""
+        with self.busy_lock:
+            now = time.perf_counter()
+            if self.busy:
+                self.background_write_seconds += now - self.busy_since
+            self.busy += change
+            self.busy_since = now
+
+    def add(self, table, columns, values, label=None, on_insert=None):
+        """Queue a row; on_insert() is called at the next flush once it is stored"""
+        key = (table, tuple(columns))
+        rows = self.pending.setdefault(key, [])
+        rows.append((values, label or table, on_insert))
+        if len(rows) >= self.batch_size:
+            self._queue_batch(key)
+
+    def _queue_batch(self, key):
+        rows = self.pending.pop(key, [])
+        if not rows:
+            return
+        self._raise_error()
+        stored = threading.Event()
+        parents = self._parent_batches(key, rows, stored)
+        started = time.perf_counter()
+        self.queues[self.batches % len(self.queues)].put((self.batches, key, rows, stored, parents))
+        self.write_seconds += time.perf_counter() - started
+        self.batches += 1
+
+    def _parent_batches(self, key, rows, stored):
+        """Stored events of the earlier batches holding rows this batch references in its own table.
+        
+        None with --fast-load, whose foreign key checks are off. Records the batch's id range for later batches.
+        """
+        table, columns = key
+        if CONFIG['fast_load'] or SELF_REFERENCES.get(table) not in columns or 'id' not in columns:
+            return []
+        id_column, reference_column = columns.index('id'), columns.index(SELF_REFERENCES[table])
+        # int(): rows restored from a snapshot carry their values as text
+        ids = [int(values[id_column]) for values, _, _ in rows]
+        references = {int(values[reference_column]) for values, _, _ in rows
+                      if values[reference_column] is not None} - set(ids)
+        ranges = self.id_ranges.setdefault(table, [])
+        parents = [event for first, last, event in ranges if any(first <= reference <= last for reference in references)]
+        ranges.append((min(ids), max(ids), stored))
+        return parents
+
+    def _raise_error(self):
+        if self.error:
+            raise self.error
+
+    def flush(self, table=None):
+        """Write all pending rows (optionally only for one table) and wait for the writer threads"""
+        for key in list(self.pending):
+            if table is None or key[0] == table:
+                self._queue_batch(key)
+        started = time.perf_counter()
+        for batches in self.queues:
+            batches.join()
+        self.write_seconds += time.perf_counter() - started
+        self.id_ranges.clear()
+        self._raise_error()
+        for batch in sorted(self.stored):
+            for on_insert in self.stored.pop(batch):
+                if on_insert:
+                    on_insert()
+
+    def inserted_count(self, table):
+        """Number of rows successfully written to a table so far"""
+        return self.inserted.get(table, 0)
+
+    def _total(self, name):
+        """Per key sum of a counter dict over the writer threads"""
+        totals = {}
+        for writer in self.writers:
+            for key, count in dict(getattr(writer, name, {})).items():
+                totals[key] = totals.get(key, 0) + count
+        return totals
+
+    @property
+    def inserted(self):
+        return self._total('inserted')
+
+    @property
+    def failed(self):
+        return self._total('failed')
+
+    @property
+    def failed_by_code(self):
+        return self._total('failed_by_code')
+
+    @property
+    def retried_by_code(self):
+        return self._total('retried_by_code')
+
+    @property
+    def round_trips(self):
+        return sum(writer.round_trips for writer in self.writers if writer)
+
+    def close(self):
+        """Stop the writer threads and release their connections; rows that were never flushed are discarded"""
+        self.pending.clear()
+        for batches in self.queues:
+            batches.put(None)
+        for thread in self.threads:
+            thread.join()
+
+class BulkFileWriter:
+    """Streams rows into per-table TSV files for LOAD DATA LOCAL INFILE instead of inserting them.
+    
+    Rows carry ids from the IdAllocator, so child rows reference their parents without the
+    parents ever reaching the database. Worker processes write their own part files (suffix),
+    which every later chunk of the same process appends to.
+    """
+    
+    started_paths = set()   # part files this worker process has already written, reopened for appending
+
+    def __init__(self, output_dir, suffix=None):
+        self.output_dir = os.path.abspath(output_dir)
+        self.suffix = suffix
+        self.files = {}     # table -> open file
+        self.parts = {}     # table -> [(path, columns)] to load, including other processes' parts
+        self.inserted = {}
+        self.failed = {}
+        self.failed_by_code = {}
+        self.retried_by_code = {}
+        self.write_seconds = 0.0
+        self.round_trips = 0    # the database is only reached by load_data.sql
+        self.before_load = []   # --fast-load: statements load_data.sql runs before and after the loads
+        self.after_load = []
+        self.checks = []        # queries load_data.sql ends with, each listing rows that break a constraint
+        self.unique_values = {} # (table, column) -> values written to a UNIQUE column, case folded
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def add(self, table, columns, values, label=None, on_insert=None):
+        """Append the row to the table's file; a row repeating a UNIQUE value is skipped like the database would"""
+        started = time.perf_counter()
+        if table in UNIQUE_COLUMNS and not self._unique(table, columns, values, label):
+            return
+        if table not in self.files:
+            self._open(table, columns)
+        
+        self.files[table].write('\t'.join(self._format(value) for value in values) + '\n')
+        self.write_seconds += time.perf_counter() - started
+        self.inserted[table] = self.inserted.get(table, 0) + 1
+        if on_insert:
+            on_insert()
+
+    def _unique(self, table, columns, values, label):
+        """Record the row's UNIQUE values, or count the row as rejected when one of them was written before"""
+        # The default collations compare case-insensitively
+        keys = [(column, str(values[columns.index(column)]).casefold())
+                for column in UNIQUE_COLUMNS[table] if column in columns]
+        for column, key in keys:
+            if key in self.unique_values.get((table, column), ()):
+                logger.warning(f"Skipped {label or table}: {column} {values[columns.index(column)]!r} is already taken")
+                self.failed[table] = self.failed.get(table, 0) + 1
+                # ER_DUP_ENTRY, what LOAD DATA would have rejected the row with
+                self.failed_by_code[1062] = self.failed_by_code.get(1062, 0) + 1
+                return False
+        for column, key in keys:
+            self.unique_values.setdefault((table, column), set()).add(key)
+        return True
+    
+    def inserted_count(self, table):
+        """Number of rows written to a table's file so far"""
+        return self.inserted.get(table, 0)
+
+    def flush(self, table=None):
+        """Flush buffered file output (optionally only for one table)"""
+        for name, handle in self.files.items():
+            if table is None or name == table:
+                handle.flush()
+
+    def _open(self, table, columns):
+        path = self.path(table)
+        self.files[table] = open(path, 'a' if path in self.started_paths else 'w', encoding='utf-8', newline='')
+        if self.suffix:
+            # The main process writes its files once per run, so a later run in it starts them over
+            self.started_paths.add(path)
+        self.parts.setdefault(table, []).append((path, tuple(columns)))
+
+    def add_parts(self, parts):
+        """Include files written by other processes in the load script, each once"""
+        for table, table_parts in parts.items():
+            listed = self.parts.setdefault(table, [])
+            listed.extend(part for part in map(tuple, table_parts) if part not in listed)
+
+    def path(self, table):
+        """Location of this writer's data file for a table"""
+        name = f"{table}.{self.suffix}.tsv" if self.suffix else f"{table}.tsv"
+        return os.path.join(self.output_dir, name)
+
+    @staticmethod
+    def _format(value):
+        """Render a value in LOAD DATA's default text format (tab separated, backslash escaped)"""
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return '1' if value else '0'
+        if isinstance(value, datetime.datetime):
+            return value.strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(value, datetime.date):
+            return value.isoformat()
+        return (str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+                .replace('\r', '\\r').replace('\0', '\\0'))
+
+    def write_load_script(self):
+        """Write load_data.sql loading every table file in foreign-key order"""
+        tables = sorted(self.parts, key=lambda table: TABLE_LOAD_ORDER.index(table)
+                        if table in TABLE_LOAD_ORDER else len(TABLE_LOAD_ORDER))
+        script_path = os.path.join(self.output_dir, 'load_data.sql')
+        with open(script_path, 'w', encoding='utf-8') as script:
+            script.write("-- Generated by generate_test_data.py; run with: mysql --local-infile=1 <database> < load_data.sql\n")
+            script.write("SET NAMES utf8mb4;\n\n")
+            if CONFIG['fast_load']:
+                script.write("SET FOREIGN_KEY_CHECKS = 0;\n")
+                script.writelines(f"{sql};\n" for sql in self.before_load)
+                script.write("\n")
+            for table in tables:
+                for path, columns in self.parts[table]:
+                    quoted_path = path.replace('\\', '\\\\').replace("'", "\\'")
+                    script.write(
+                        f"LOAD DATA LOCAL INFILE '{quoted_path}'\n"
+                        f"    INTO TABLE {table} CHARACTER SET utf8mb4\n"
+                        f"    FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'\n"
+                        f"    LINES TERMINATED BY '\\n'\n"
+                        f"    ({', '.join(columns)});\n\n"
+                    )
+            if CONFIG['fast_load']:
+                script.writelines(f"{sql};\n" for sql in self.after_load)
+                script.write("SET FOREIGN_KEY_CHECKS = 1;\n")
+            if self.checks:
+                script.write("\n-- Checks: every query below should return no rows\n")
+                script.writelines(f"{sql};\n" for sql in self.checks)
+        logger.info(f"Wrote {sum(len(parts) for parts in self.parts.values())} files for {len(tables)} tables, "
+                    f"load script: {script_path}")
+
+    def close(self):
+        """Close the table files; the main process (no suffix) also writes the load script"""
+        for handle in self.files.values():
+            handle.close()
+        if self.parts and not self.suffix:
+            self.write_load_script()
+
+class Checkpoint:
+    """Progress of a run in a JSON file, rewritten (atomically) after every stage and therapist chunk.
+    
+    Every RNG is derived from the seed and an entity key, so the seed, the users and the list of
+    finished chunks are the whole random state of a run. The saved id allocator state and the id
+    blocks of unfinished chunks tell --resume which rows were written after the last save.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {}
+
+    def exists(self):
+        """Whether a checkpoint file is present"""
+        return os.path.exists(self.path)
+
+    def load(self):
+        """Read the checkpoint file"""
+        with open(self.path, encoding='utf-8') as handle:
+            self.state = json.load(handle)
+        return self.state
+
+    def save(self, state):
+        """Replace the checkpoint file with state"""
+        self.state = state
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as handle:
+            json.dump(state, handle)
+        os.replace(temporary_path, self.path)
+
+    def done(self, stage):
+        """Whether a stage finished before the checkpoint was saved"""
+        return stage in self.state.get('stages', [])
+
+    def remove(self):
+        """Delete the checkpoint file once the run has completed"""
+        if self.exists():
+            os.remove(self.path)
+
+class TherapistSchedule:
+    """Time booked by one therapist's meetings and personal meetings, as disjoint sorted minute intervals per day.
+    
+    Bookings bisect a single day's list, which holds a handful of intervals, so checking and booking a
+    slot stays O(log n) however many meetings the therapist has.
+    """
+
+    DAY_END = 20 * 60       # a moved booking ends by 20:00
+
+    def __init__(self, rng, weekday_hours=None):
+        self.rng = rng
+        self.weekday_hours = weekday_hours  # the profile's start hour weights per weekday; None for uniform
+        self.days = {}          # date -> sorted [(start minute, end minute)], merged where bookings overlap
+        self.bookings = 0
+        self.collisions = 0     # bookings that overlap an earlier one
+        self.owed = 0           # collisions drawn on days without bookings, still to be placed
+
+    def book(self, start, duration, collide=False):
+        """Book `duration` minutes at `start`, or at a free slot nearby; returns the start used.
+        
+        With collide, the meeting is instead put on top of one already booked that day; on a day without
+        bookings the collision is owed to the next booking on a day that has some.
+        """
+        date = start.date()
+        begin = start.hour * 60 + start.minute
+        day = self.days.get(date)
+        if (collide or self.owed) and day:
+            begin = self.rng.choice(day)[0]
+            if not collide:
+                self.owed -= 1
+        else:
+            if collide:
+                self.owed += 1
+            date, begin = self._free_slot(date, begin, duration)
+        
+        self.bookings += 1
+        if self._overlaps(self.days.get(date, []), begin, begin + duration):
+            self.collisions += 1
+        self.add(date, begin, duration)
+        return datetime.datetime.combine(date, datetime.time(begin // 60, begin % 60))
+
+    def add(self, date, begin, duration):
+        """Record a booking of `duration` minutes from minute `begin` of `date` as it is"""
+        self._insert(self.days.setdefault(date, []), begin, begin + duration)
+
+    def _free_slot(self, date, begin, duration):
+        """The requested slot if it is free, else a free quarter hour that day or in the next days"""
+        for shift in range(8):
+            day = self.days.get(date + datetime.timedelta(days=shift), [])
+            candidates = [begin] if shift == 0 else []
+            candidates += self._candidate_starts((date + datetime.timedelta(days=shift)).weekday(), duration)
+            for candidate in candidates:
+                if not self._overlaps(day, candidate, candidate + duration):
+                    return date + datetime.timedelta(days=shift), candidate
+        # A fully booked week: keep the requested slot, which is counted as a collision
+        return date, begin
+
+    def _candidate_starts(self, weekday, duration):
+        """Every quarter hour of the weekday's meeting hours, in a random order weighted like the start
+        hours of new meetings, so moved bookings stay in the profile's busy hours"""
+        weights = self.weekday_hours[weekday] if self.weekday_hours else [1] * len(MEETING_HOURS)
+        # Sorting by random() ** (1 / weight) draws the order without replacement
+        keyed = [(self.rng.random() ** (1 / weight), hour * 60 + minute)
+                 for hour, weight in zip(MEETING_HOURS, weights) if weight
+                 for minute in (0, 15, 30, 45) if hour * 60 + minute + duration <= self.DAY_END]
+        return [start for _, start in sorted(keyed, reverse=True)]
+
+    @staticmethod
+    def _overlaps(day, begin, end):
+        index = bisect.bisect_left(day, (begin, end))
+        return (index > 0 and day[index - 1][1] > begin) or (index < len(day) and day[index][0] < end)
+
+    @staticmethod
+    def _insert(day, begin, end):
+        """Insert an interval, merging it with the ones it overlaps so the list stays disjoint"""
+        index = bisect.bisect_left(day, (begin, end))
+        while index > 0 and day[index - 1][1] > begin:
+            index -= 1
+            previous_begin, previous_end = day.pop(index)
+            begin, end = min(begin, previous_begin), max(end, previous_end)
+        while index < len(day) and day[index][0] < end:
+            end = max(end, day.pop(index)[1])
+        day.insert(index, (begin, end))
+
+class RunMetrics:
+    """Wall time, rows written, database time and round trips per stage, summed over chunks and workers.
+    
+    peak_rss_mb is the process' peak resident memory when the stage last ended, the largest over
+    chunks and workers: a stage whose peak keeps rising with the dataset size accumulates rows.
+    With --writer-threads, write_seconds is the time the generator waited for the writer threads
+    and background_write_seconds the time they spent in the database meanwhile.
+    """
+
+    COUNTERS = ('calls', 'seconds', 'rows', 'failed', 'write_seconds', 'background_write_seconds', 'round_trips',
+                'peak_rss_mb')
+    PEAKS = ('peak_rss_mb',)    # combined with max() instead of summed
+
     def __init__(self):
+        self.stages = {}    # stage -> COUNTERS totals, in the order the stages first ran
+
+    @contextlib.contextmanager
+    def stage(self, name, writer):
+        """Measure the block as one run of a stage, from the writer's counters before and after it"""
+        before = self._writer_counters(writer)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            after = self._writer_counters(writer)
+            self.add(name, {'calls': 1, 'seconds': time.perf_counter() - started,
+                            **{key: after[key] - before[key] for key in after}, 'peak_rss_mb': peak_rss_mb() or 0})
+
+    @staticmethod
+    def _writer_counters(writer):
+        return {'rows': sum(writer.inserted.values()), 'failed': sum(writer.failed.values()),
+                'write_seconds': writer.write_seconds,
+                'background_write_seconds': getattr(writer, 'background_write_seconds', 0.0),
+                'round_trips': writer.round_trips}
+
+    def add(self, name, counters):
+        """Add counters to a stage's totals"""
+        totals = self.stages.setdefault(name, dict.fromkeys(self.COUNTERS, 0))
+        for key, value in counters.items():
+            totals[key] = max(totals[key], value) if key in self.PEAKS else totals[key] + value
+
+    def merge(self, stages):
+        """Add the stage totals of another process"""
+        for name, counters in stages.items():
+            self.add(name, counters)
+
+class QueryLoad:
+    """Replays MeetingRepository's queries from a thread pool against the generated data.
+    
+    Every thread takes its own connection from the sink's pool, has its own RNG and runs a random query
+    shape at a time, with parameters drawn from the users, clients and meeting date ranges in the database.
+    """
+
+    def __init__(self, concurrency, seconds):
+        self.concurrency = concurrency
+        self.seconds = seconds
+        self.clients = []       # (user id, client id, first meeting, last meeting)
+
+    def load_parameters(self, sink):
+        """Read the users, clients and meeting date ranges the query parameters are drawn from"""
+        cursor = sink.cursor(buffered=True)
+        cursor.execute("SELECT user_id, client_id, MIN(meeting_date), MAX(meeting_date) FROM meetings "
+                       "GROUP BY user_id, client_id")
+        self.clients = [(user_id, client_id, as_datetime(first), as_datetime(last))
+                        for user_id, client_id, first, last in cursor.fetchall()]
+        cursor.close()
+        if not self.clients:
+            raise RuntimeError("No meetings to query; generate data first")
+        logger.info(f"Drawing query parameters from {len({client[0] for client in self.clients})} users "
+                    f"and {len(self.clients)} clients")
+
+    def parameters(self, shape, rng):
+        """Parameters for one query, around the meetings of a random client"""
+        user_id, client_id, first, last = rng.choice(self.clients)
+        day = first + datetime.timedelta(days=rng.randint(0, (last - first).days))
+        if shape == 'findByUserAndMeetingDateBetween':
+            return [user_id, day, day + datetime.timedelta(days=rng.choice([1, 7, 30]))]
+        if shape == 'findByUserAndMonthYear':
+            return [user_id, day.year, day.month]
+        if shape == 'findByClient':
+            return [client_id]
+        if shape == 'findTop5ByOrderByCreatedAtDesc':
+            return [5]
+        return [user_id]
+
+    def run(self, sink):
+        """Run the load for the configured time and return the latencies in seconds per query shape"""
+        deadline = time.perf_counter() + self.seconds
+        latencies = {shape: [] for shape in MEETING_QUERIES}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for thread_latencies in pool.map(lambda thread: self._thread(sink, thread, deadline), range(self.concurrency)):
+                for shape, values in thread_latencies.items():
+                    latencies[shape].extend(values)
+        return latencies
+
+    def _thread(self, sink, thread, deadline):
+        """One thread of the load, on its own pooled connection"""
+        rng = random.Random(f"{CONFIG['seed']}:query-load:{thread}")
+        connection = sink.acquire()
+        cursor = sink.cursor(connection=connection)
+        queries = {shape: sql.format(p=sink.placeholder) for shape, sql in MEETING_QUERIES.items()}
+        latencies = {shape: [] for shape in queries}
+        try:
+            while time.perf_counter() < deadline:
+                shape = rng.choice(list(queries))
+                params = self.parameters(shape, rng)
+                started = time.perf_counter()
+                cursor.execute(queries[shape], params)
+                cursor.fetchall()
+                latencies[shape].append(time.perf_counter() - started)
+        finally:
+            cursor.close()
+            sink.release(connection)
+        return latencies
+
+class HttpConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one server over asyncio streams, shared by concurrent callers"""
+
+    def __init__(self, base_url, size):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.ssl = url.scheme == 'https'
+        self.port = url.port or (443 if self.ssl else 80)
+        self.base_path = url.path.rstrip('/')
+        self.size = size
+        self.idle = []          # (reader, writer) ready for the next request
+        self.slots = None       # semaphore limiting open connections, created inside the event loop
+        self.opened = 0
+
+    async def request(self, method, path, body=None, token=None):
+        """Send a request and return (status, decoded JSON body or None)"""
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.size)
+        async with self.slots:
+            reused = bool(self.idle)
+            connection = self.idle.pop() if reused else await self._open()
+            try:
+                status, headers, payload = await self._exchange(connection, method, path, body, token)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection[1].close()
+                if not reused:
+                    raise
+                # The server closed the idle connection; retry once on a fresh one
+                connection = await self._open()
+                status, headers, payload = await self._exchange(connection, method, path, body, token)
+            if headers.get('connection', '').lower() == 'close':
+                connection[1].close()
+            else:
+                self.idle.append(connection)
+        if payload and headers.get('content-type', '').startswith('application/json'):
+            return status, json.loads(payload)
+        return status, None
+
+    async def _open(self):
+        connection = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        self.opened += 1
+        return connection
+
+    async def _exchange(self, connection, method, path, body, token):
+        """Write one request and read its response: (status, lower-cased headers, body bytes)"""
+        reader, writer = connection
+        data = json.dumps(body).encode('utf-8') if body is not None else b''
+        lines = [f"{method} {self.base_path}{path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 "Accept: application/json", "Connection: keep-alive"]
+        if token:
+            lines.append(f"Authorization: Bearer {token}")
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(data)}"]
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+        
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before the response")
+        status = int(status_line.split()[1])
+        headers = await self._read_headers(reader)
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            payload = b''
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self._read_headers(reader)    # trailers
+                    break
+                payload += await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif 'content-length' in headers:
+            payload = await reader.readexactly(int(headers['content-length']))
+        else:
+            payload = await reader.read()
+            headers['connection'] = 'close'
+        return status, headers, payload
+
+    @staticmethod
+    async def _read_headers(reader):
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    async def close(self):
+        """Close the idle connections"""
+        for _, writer in self.idle:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+        self.idle = []
+
+class HttpLoad:
+    """Therapists using the REST API at once: each logs in through AuthController (one cached JWT per user),
+    then keeps making a weighted mix of dashboard and calendar calls until the time is up.
+    """
+
+    def __init__(self, pool, users, seconds):
+        self.pool = pool
+        self.users = users      # [(username, [client name prefixes])]
+        self.seconds = seconds
+        self.tokens = {}        # username -> JWT
+        self.latencies = {}     # endpoint -> [seconds]
+        self.failures = {}      # (endpoint, status or exception) -> count
+
+    async def run(self, virtual_users):
+        """Run virtual_users concurrent sessions (users are reused round robin) for the configured time"""
+        deadline = time.perf_counter() + self.seconds
+        await asyncio.gather(*(self._session(number, deadline) for number in range(virtual_users)))
+        return self.latencies
+
+    async def _session(self, number, deadline):
+        rng = random.Random(f"{CONFIG['seed']}:http-load:{number}")
+        username, client_names = self.users[number % len(self.users)]
+        token = await self.login(username)
+        if not token:
+            return
+        
+        weights = [weight for weight, _ in API_REQUEST_MIX]
+        while time.perf_counter() < deadline:
+            (_, template), = rng.choices(API_REQUEST_MIX, weights=weights)
+            await self.call('GET', template, self.path(template, client_names, rng), token=token)
+
+    async def login(self, username):
+        """JWT for a user, signing in the first time it is needed"""
+        if username not in self.tokens:
+            self.tokens[username] = None
+            status, response = await self.call('POST', '/api/auth/signin', '/api/auth/signin',
+                                               body={'username': username, 'password': TEST_USER_PASSWORD})
+            if status == 200 and response:
+                self.tokens[username] = response['token']
+            else:
+                logger.warning(f"Could not sign in as {username!r} ({f'HTTP {status}' if status else 'no response'})")
+        return self.tokens[username]
+
+    async def call(self, method, endpoint, path, body=None, token=None):
+        """Make a request, recording its latency under the endpoint template"""
+        name = f"{method} {endpoint.split('?')[0]}"
+        started = time.perf_counter()
+        try:
+            status, response = await self.pool.request(method, path, body, token)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as err:
+            key = (name, type(err).__name__)
+            self.failures[key] = self.failures.get(key, 0) + 1
+            return None, None
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        if status >= 400:
+            self.failures[(name, status)] = self.failures.get((name, status), 0) + 1
+        return status, response
+
+    @staticmethod
+    def path(template, client_names, rng):
+        """Fill a path template with parameters around the reference time and the user's clients"""
+        day = CONFIG['reference_now'] - datetime.timedelta(days=rng.randint(-30, CONFIG['date_range_days']))
+        return template.format(
+            year=day.year, month=day.month, period=rng.choice(['daily', 'monthly', 'yearly']),
+            name=urllib.parse.quote(rng.choice(client_names) if client_names else 'a'),
+            start=day.replace(day=1).isoformat(timespec='seconds'),
+            end=(day.replace(day=1) + datetime.timedelta(days=31)).replace(day=1).isoformat(timespec='seconds'))
+
+class TestDataGenerator:
+    def __init__(self, id_blocks=None, file_suffix=None):
+        # Pin the seed and reference time in CONFIG so worker processes generate the same data
+        if CONFIG['seed'] is None:
+            CONFIG['seed'] = random.SystemRandom().randrange(2 ** 32)
+        if CONFIG['reference_now'] is None:
+            CONFIG['reference_now'] = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        self.seed = CONFIG['seed']
+        self.now = CONFIG['reference_now']
+        
+        self.id_blocks = id_blocks          # worker processes only allocate ids inside their blocks
+        self.file_suffix = file_suffix      # worker processes write their own bulk-load part files
+        self.sink = None
         self.connection = None
         self.cursor = None
+        self.writer = None
+        self.lookups = None
+        self.ids = None
         self.user_ids = []
+        self.therapist_ids = []
+        self.admin_ids = []
+        self.user_index = {}                # user id -> generation index (stable RNG key)
         self.client_ids = []
+        self.client_keys = {}               # client id -> (user index, client index)
+        self.clients_by_user = {}           # user id -> client ids, in insertion order
         self.client_source_ids = []
+        self.client_sources = {}            # source id -> name, default_sessions, pricing_tier
+        self.client_source_by_client = {}   # client id -> source id
         self.payment_type_ids = []
         self.personal_meeting_type_ids = []
+        self.paid_sessions = {}             # user id -> [(session type, id, client id, price, date, paid at)]
+        self.schedules = {}                 # user id -> TherapistSchedule, when CONFIG['collision_rate'] is set
+        self.chunks = []                    # [{'therapists', 'blocks', 'done'}], see plan_chunks
+        self.checkpoint = None
+        self.dropped_indexes = {}           # table -> [(name, columns)] dropped by --fast-load until rebuilt
+        self.first_ids = {}                 # table -> first id of this run's rows, for --snapshot
+        self.metrics = RunMetrics()
+        self.profile = distribution_profile()
         
-    def connect(self):
-        """Establish database connection"""
+    def connect(self, local_infile_dir=None):
+        """Establish database connection through the configured sink"""
+        # Every writer thread holds a pooled connection next to the generator's own
+        self.sink = create_sink(pool_size=max(CONFIG['pool_size'], CONFIG['writer_threads'] + 1),
+                                local_infile_dir=local_infile_dir)
         try:
-            self.connection = mysql.connector.connect(**DB_CONFIG)
-            self.cursor = self.connection.cursor()
-            logger.info("Successfully connected to database")
-        except mysql.connector.Error as err:
+            self.connection = self.sink.connect()
+            self.cursor = self.sink.cursor(buffered=True)
+            self.ids = IdAllocator(self.cursor, self.id_blocks)
+            if CONFIG['output_dir']:
+                self.writer = BulkFileWriter(CONFIG['output_dir'], self.file_suffix)
+            elif CONFIG['writer_threads']:
+                self.writer = PipelinedWriter(self.sink, CONFIG['batch_size'], CONFIG['writer_threads'])
+            else:
+                self.writer = BatchWriter(self.sink, CONFIG['batch_size'])
+            self.lookups = LookupCache(self.sink)
+            logger.info(f"Successfully connected to {self.sink.describe()}")
+        except self.sink.errors as err:
             logger.error(f"Error connecting to database: {err}")
             raise
     
     def disconnect(self):
         """Close database connection"""
+        if self.writer:
+            self.writer.close()
         if self.cursor:
             self.cursor.close()
-        if self.connection:
-            self.connection.close()
+        if self.sink:
+            self.sink.close()
         logger.info("Database connection closed")
     
-    def random_string(self, length=10, include_special=True):
+    def stage(self, name):
+        """Context manager recording a stage's timing and writer counters in self.metrics"""
+        return self.metrics.stage(name, self.writer)
+    
+    def rng_for(self, *key):
+        """Independent RNG for one entity (e.g. ('clients', user_index)), stable for a given seed"""
+        return random.Random(f"{self.seed}:" + ':'.join(str(part) for part in key))
+    
+    def user_key(self, user_id):
+        """Generation index of a user, the stable part of its per-entity RNG keys"""
+        return self.user_index.get(user_id, user_id)
+    
+    def random_string(self, length=10, include_special=True, rng=random):
         """Generate random string"""
         chars = string.ascii_letters + string.digits
         if include_special:
             chars += "!@#$%^&*()_+-=[]{}|;:,.<>?"
-        return ''.join(random.choices(chars, k=length))
+        return ''.join(rng.choices(chars, k=length))
     
-    def random_date(self, start_date, end_date):
+    def random_date(self, start_date, end_date, rng=random):
         """Generate random date between start and end"""
         time_between = end_date - start_date
         days_between = time_between.days
-        random_days = random.randrange(days_between)
-        random_seconds = random.randrange(86400)
+        random_days = rng.randrange(days_between)
+        random_seconds = rng.randrange(86400)
         return start_date + datetime.timedelta(days=random_days, seconds=random_seconds)
     
-    def random_time_slot(self, date):
+    def random_time_slot(self, date, rng=random):
         """Generate random time slot for a given date"""
-        hour = random.randint(8, 19)  # 8 AM to 7 PM
-        minute = random.choice([0, 15, 30, 45])
+        hour = rng.randint(8, 19)  # 8 AM to 7 PM
+        minute = rng.choice([0, 15, 30, 45])
         return datetime.datetime.combine(date, datetime.time(hour, minute))
     
-    def get_edge_case_or_random(self, edge_cases, default_func):
+    def get_edge_case_or_random(self, edge_cases, default_func, rng=random):
         """Get edge case with probability or random value"""
-        if CONFIG['include_edge_cases'] and random.random() < 0.1:  # 10% chance for edge case
-            return random.choice(edge_cases)
+        if CONFIG['include_edge_cases'] and rng.random() < 0.1:  # 10% chance for edge case
+            return rng.choice(edge_cases)
         return default_func()
     
     def generate_users(self):
@@ -187,15 +1727,20 @@ class TestDataGenerator:
             "Practice Manager", "Administrative Director", "Clinic Coordinator", "Practice Administrator"
         ]
         
-        for i in range(CONFIG['num_users']):
+        num_therapists, num_admins = scaled_user_counts()
+        
+        for i in range(num_therapists + num_admins):
+            rng = self.rng_for('user', i)
+            
             # Determine user type based on production-like distribution
-            if i < 45:  # 90% therapists
-                full_name = therapist_names[i] if i < len(therapist_names) else f"Dr. {self.random_string(8)} {self.random_string(6)}"
+            if i < num_therapists:
+                full_name = therapist_names[i] if i < len(therapist_names) else f"Dr. {self.random_string(8, rng=rng)} {self.random_string(6, rng=rng)}"
                 role = 'USER'
                 enabled = True  # Most therapists are enabled
                 approval_status = 'APPROVED'  # Most therapists are approved
-            else:  # 10% admins
-                full_name = admin_names[i - 45] if (i - 45) < len(admin_names) else f"Admin {self.random_string(6)}"
+            else:
+                admin_number = i - num_therapists
+                full_name = admin_names[admin_number] if admin_number < len(admin_names) else f"Admin {self.random_string(6, rng=rng)}"
                 role = 'ADMIN'
                 enabled = True
                 approval_status = 'APPROVED'
@@ -208,41 +1753,49 @@ class TestDataGenerator:
             email = f"{username}@clinic.example.com"
             
             # Edge cases for some users
-            if random.random() < 0.05:  # 5% edge case
+            if rng.random() < 0.05:  # 5% edge case
                 username = self.get_edge_case_or_random(
                     ["", "   ", "NULL", "user'--", "user\"--", "user\\--"],
-                    lambda: username
+                    lambda: username,
+                    rng=rng
                 )
-                email = self.get_edge_case_or_random(EDGE_CASES['emails'], lambda: email)
-                full_name = self.get_edge_case_or_random(EDGE_CASES['names'], lambda: full_name)
+                email = self.get_edge_case_or_random(EDGE_CASES['emails'], lambda: email, rng=rng)
+                full_name = self.get_edge_case_or_random(EDGE_CASES['names'], lambda: full_name, rng=rng)
             
             password = "$2a$10$PD5iyqOP/2BOgETgrMrC8uRjEu.P17cuArZESURXbE7aoAwz.U1Ri"
             
             # Generate created_at with realistic distribution
             created_at = self.random_date(
-                datetime.datetime.now() - datetime.timedelta(days=730),  # Up to 2 years ago
-                datetime.datetime.now()
+                self.now - datetime.timedelta(days=730),  # Up to 2 years ago
+                self.now,
+                rng=rng
             )
             
             # Add some pending/rejected users for testing
-            if random.random() < 0.1:  # 10% chance for non-approved status
-                approval_status = random.choice(['PENDING', 'REJECTED'])
-                enabled = random.choice([True, False])
+            if rng.random() < 0.1:  # 10% chance for non-approved status
+                approval_status = rng.choice(['PENDING', 'REJECTED'])
+                enabled = rng.choice([True, False])
             
-            try:
-                self.cursor.execute("""
-                    INSERT INTO users (username, email, full_name, password, role, enabled, approval_status, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                """, (username, email, full_name, password, role, enabled, approval_status, created_at))
-                
-                user_id = self.cursor.lastrowid
-                self.user_ids.append(user_id)
-                
-            except mysql.connector.Error as err:
-                logger.warning(f"Failed to insert user {i}: {err}")
-                continue
+            user_id = self.ids.next_id('users')
+            self.writer.add(
+                'users',
+                ('id', 'username', 'email', 'full_name', 'password', 'role', 'enabled', 'approval_status', 'created_at'),
+                (user_id, username, email, full_name, password, role, enabled, approval_status, created_at),
+                label=f"user {i}",
+                on_insert=functools.partial(self._record_user, user_id, index=i, role=role)
+            )
         
-        logger.info(f"Generated {len(self.user_ids)} users ({45 if len(self.user_ids) >= 45 else len(self.user_ids)} therapists, {len(self.user_ids) - 45 if len(self.user_ids) > 45 else 0} admins)")
+        self.writer.flush('users')
+        logger.info(f"Generated {len(self.user_ids)} users ({len(self.therapist_ids)} therapists, {len(self.admin_ids)} admins)")
+    
+    def _record_user(self, user_id, index, role):
+        """Remember an inserted user, its generation index and its role"""
+        self.user_ids.append(user_id)
+        self.user_index[user_id] = index
+        if role == 'ADMIN':
+            self.admin_ids.append(user_id)
+        else:
+            self.therapist_ids.append(user_id)
     
     def generate_clients(self):
         """Generate production-like clients with realistic distribution"""
@@ -298,285 +1851,457 @@ class TestDataGenerator:
             "Career counseling"
         ]
         
-        client_count = 0
+        clients_before = self.writer.inserted_count('clients')
         
-        for user_id in self.user_ids:
-            # Only therapists have clients (not admins)
-            if user_id <= 45:  # Assuming first 45 are therapists
-                num_clients = random.randint(15, CONFIG['num_clients_per_user'])
+        # Only therapists have clients (not admins)
+        for user_id in self.therapist_ids:
+            rng = self.rng_for('clients', self.user_key(user_id))
+            num_clients = self._client_count(rng)
+            
+            for i in range(num_clients):
+                # Generate realistic Israeli name
+                first_name = rng.choice(client_first_names)
+                last_name = rng.choice(client_last_names)
+                full_name = f"{first_name} {last_name}"
                 
-                for i in range(num_clients):
-                    # Generate realistic Israeli name
-                    first_name = random.choice(client_first_names)
-                    last_name = random.choice(client_last_names)
-                    full_name = f"{first_name} {last_name}"
-                    
-                    # Edge cases for some clients
-                    if random.random() < 0.05:  # 5% edge case
-                        full_name = self.get_edge_case_or_random(EDGE_CASES['names'], lambda: full_name)
-                    
-                    # Generate email based on name
-                    email = f"{first_name.lower()}.{last_name.lower()}@gmail.com"
-                    if random.random() < 0.05:  # 5% edge case
-                        email = self.get_edge_case_or_random(EDGE_CASES['emails'], lambda: email)
-                    
-                    # Generate Israeli phone number
-                    phone = f"05{random.randint(10000000, 99999999)}"
-                    if random.random() < 0.05:  # 5% edge case
-                        phone = self.get_edge_case_or_random(EDGE_CASES['phones'], lambda: phone)
-                    
-                    # Generate realistic notes
-                    notes = random.choice(client_notes)
-                    if random.random() < 0.05:  # 5% edge case
-                        notes = self.get_edge_case_or_random(
-                            ["", "   ", "NULL", "Notes'--", "Notes\"--", "Notes\\--", "A" * 1000],
-                            lambda: random.choice(client_notes)
-                        )
-                    
-                    # Most clients are active (realistic)
-                    is_active = random.choice([True, True, True, False])  # 75% active
-                    
-                    # Generate realistic creation date
-                    created_at = self.random_date(
-                        datetime.datetime.now() - datetime.timedelta(days=730),  # Up to 2 years ago
-                        datetime.datetime.now()
+                # Edge cases for some clients
+                if rng.random() < 0.05:  # 5% edge case
+                    full_name = self.get_edge_case_or_random(EDGE_CASES['names'], lambda: full_name, rng=rng)
+                
+                # Generate email based on name
+                email = f"{first_name.lower()}.{last_name.lower()}@gmail.com"
+                if rng.random() < 0.05:  # 5% edge case
+                    email = self.get_edge_case_or_random(EDGE_CASES['emails'], lambda: email, rng=rng)
+                
+                # Generate Israeli phone number
+                phone = f"05{rng.randint(10000000, 99999999)}"
+                if rng.random() < 0.05:  # 5% edge case
+                    phone = self.get_edge_case_or_random(EDGE_CASES['phones'], lambda: phone, rng=rng)
+                
+                # Generate realistic notes
+                notes = rng.choice(client_notes)
+                if rng.random() < 0.05:  # 5% edge case
+                    notes = self.get_edge_case_or_random(
+                        ["", "   ", "NULL", "Notes'--", "Notes\"--", "Notes\\--", "A" * 1000],
+                        lambda: rng.choice(client_notes),
+                        rng=rng
                     )
-                    
-                    try:
-                        # Assign a random client source
-                        source_id = random.choice(self.client_source_ids)
-                        
-                        self.cursor.execute("""
-                            INSERT INTO clients (user_id, source_id, full_name, email, phone, notes, is_active, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (user_id, source_id, full_name, email, phone, notes, is_active, created_at))
-                        
-                        client_id = self.cursor.lastrowid
-                        self.client_ids.append(client_id)
-                        client_count += 1
-                        
-                    except mysql.connector.Error as err:
-                        logger.warning(f"Failed to insert client {i} for user {user_id}: {err}")
-                        continue
+                
+                # Most clients are active (realistic)
+                is_active = rng.choice([True, True, True, False])  # 75% active
+                
+                # Generate realistic creation date
+                created_at = self.random_date(
+                    self.now - datetime.timedelta(days=730),  # Up to 2 years ago
+                    self.now,
+                    rng=rng
+                )
+                
+                # Assign a random client source
+                source_id = rng.choice(self.client_source_ids)
+                
+                client_id = self.ids.next_id('clients')
+                self.writer.add(
+                    'clients',
+                    ('id', 'user_id', 'source_id', 'full_name', 'email', 'phone', 'notes', 'is_active', 'created_at'),
+                    (client_id, user_id, source_id, full_name, email, phone, notes, is_active, created_at),
+                    label=f"client {i} for user {user_id}",
+                    on_insert=functools.partial(self._record_client, client_id, user_id=user_id,
+                                                key=(self.user_key(user_id), i), source_id=source_id)
+                )
         
+        self.writer.flush('clients')
+        client_count = self.writer.inserted_count('clients') - clients_before
         logger.info(f"Generated {client_count} clients for therapists")
     
+    def _record_client(self, client_id, user_id, key, source_id):
+        """Remember an inserted client, its owner, its (user index, client index) key and its source"""
+        self.client_ids.append(client_id)
+        self.clients_by_user.setdefault(user_id, []).append(client_id)
+        self.client_keys[client_id] = key
+        self.client_source_by_client[client_id] = source_id
+    
     def get_existing_data(self):
         """Get existing IDs from database"""
         logger.info("Fetching existing data...")
         
-        # Get client sources
-        self.cursor.execute("SELECT id FROM client_sources")
-        self.client_source_ids = [row[0] for row in self.cursor.fetchall()]
-        
-        # Get payment types
-        self.cursor.execute("SELECT id FROM payment_types")
-        self.payment_type_ids = [row[0] for row in self.cursor.fetchall()]
+        # Get client sources with everything meeting generation needs
+        self.cursor.execute("SELECT id, name, default_sessions FROM client_sources")
+        for source_id, name, default_sessions in self.cursor.fetchall():
+            self.client_sources[source_id] = {
+                'name': name,
+                'default_sessions': default_sessions,
+                'pricing_tier': name if name in SOURCE_PRICING_TIERS else DEFAULT_PRICING_TIER
+            }
+        self.client_source_ids = list(self.client_sources)
         
-        # Get personal meeting types
-        self.cursor.execute("SELECT id FROM personal_meeting_types")
-        self.personal_meeting_type_ids = [row[0] for row in self.cursor.fetchall()]
+        # Name -> id caches for the reference tables
+        for table in ('payment_types', 'personal_meeting_types', 'expense_categories'):
+            self.lookups.load(table)
+        self.payment_type_ids = self.lookups.ids('payment_types')
+        self.personal_meeting_type_ids = self.lookups.ids('personal_meeting_types')
         
         logger.info(f"Found {len(self.client_source_ids)} client sources, {len(self.payment_type_ids)} payment types, {len(self.personal_meeting_type_ids)} personal meeting types")
     
     def generate_meetings(self):
         """Generate production-like meetings with realistic scheduling patterns"""
+        if CONFIG['vectorized']:
+            return self.generate_meetings_vectorized()
         logger.info("Generating meetings...")
         
-        # Get clients grouped by user
-        self.cursor.execute("SELECT id, user_id FROM clients")
-        clients_by_user = {}
-        for client_id, user_id in self.cursor.fetchall():
-            if user_id not in clients_by_user:
-                clients_by_user[user_id] = []
-            clients_by_user[user_id].append(client_id)
-        
-        meeting_count = 0
-        start_date = datetime.datetime.now() - datetime.timedelta(days=CONFIG['date_range_days'])
-        end_date = datetime.datetime.now() + datetime.timedelta(days=30)
-        
-        # Realistic meeting notes and summaries
-        meeting_notes = [
-            "Initial assessment session",
-            "Follow-up therapy session",
-            "Crisis intervention",
-            "Progress review",
-            "Family session",
-            "Couples therapy",
-            "Group therapy session",
-            "Assessment and evaluation",
-            "Treatment planning session",
-            "Relapse prevention",
-            "Coping skills training",
-            "Mindfulness practice",
-            "Cognitive behavioral therapy",
-            "Dialectical behavior therapy",
-            "Exposure therapy",
-            "EMDR session",
-            "Play therapy",
-            "Art therapy",
-            "Music therapy",
-            "Movement therapy"
-        ]
+        # Clients recorded by generate_clients; with bulk-load files they are not in the database yet
+        clients_by_user = self.clients_by_user
         
-        meeting_summaries = [
-            "Client showed significant progress in managing anxiety symptoms. Implemented new coping strategies effectively.",
-            "Explored childhood trauma and its impact on current relationships. Client demonstrated increased self-awareness.",
-            "Focused on communication skills in couples therapy. Both partners engaged actively in the session.",
-            "Conducted comprehensive assessment for ADHD. Client reported improved focus with medication management.",
-            "Addressed eating disorder recovery progress. Client maintained healthy eating patterns this week.",
-            "PTSD treatment session - client processed traumatic memories with reduced distress levels.",
-            "Family therapy focused on improving parent-child communication. Positive changes observed.",
-            "Child therapy session - used play therapy to address behavioral concerns.",
-            "Substance abuse counseling - client maintained sobriety and attended support groups.",
-            "Grief therapy - client processed loss and developed healthy coping mechanisms.",
-            "Stress management techniques practiced. Client reported reduced work-related anxiety.",
-            "Anger management session - client learned new conflict resolution skills.",
-            "Self-esteem building activities. Client demonstrated increased confidence.",
-            "Relationship counseling - addressed trust issues and communication patterns.",
-            "Work stress management - developed strategies for work-life balance.",
-            "Parenting support - discussed effective discipline techniques.",
-            "Life transition support - client adapted well to recent changes.",
-            "Chronic pain management - integrated psychological and physical approaches.",
-            "Sleep disorder treatment - implemented sleep hygiene practices.",
-            "OCD treatment - exposure and response prevention techniques practiced."
-        ]
+        meetings_before = self.writer.inserted_count('meetings')
+        start_date = self.now - datetime.timedelta(days=CONFIG['date_range_days'])
+        end_date = self.now + datetime.timedelta(days=30)
         
         for user_id, clients in clients_by_user.items():
             for client_id in clients:
-                # Generate realistic number of meetings per client
-                num_meetings = random.randint(8, CONFIG['num_meetings_per_client'])
-                
-                # Create meeting schedule with realistic patterns
-                meeting_dates = []
-                for i in range(num_meetings):
-                    # Generate meeting date with realistic distribution
-                    if i == 0:  # First meeting
-                        meeting_date = self.random_date(start_date, start_date + datetime.timedelta(days=30))
-                    else:
-                        # Subsequent meetings with realistic intervals
-                        last_meeting = meeting_dates[-1] if meeting_dates else start_date
-                        interval_days = random.choice([7, 7, 7, 14, 14, 21, 30])  # Weekly, bi-weekly, monthly
-                        meeting_date = last_meeting + datetime.timedelta(days=interval_days)
-                        if meeting_date > end_date:
-                            break
-                    
-                    meeting_dates.append(meeting_date)
+                rng = self.rng_for('meetings', *self.client_keys.get(client_id, (client_id,)))
+                meeting_dates = self._meeting_schedule(start_date, end_date, rng)
                 
                 # Create meetings with realistic scheduling
+                series_end = None   # a recurring series replaces the client's regular meetings until its last session
                 for i, meeting_date in enumerate(meeting_dates):
+                    if series_end and meeting_date.date() <= series_end.date():
+                        continue
+                    if not self._keeps_meeting(meeting_date, rng):
+                        continue
+                    
                     # Generate realistic time slots (business hours)
-                    hour = random.choice([9, 10, 11, 12, 13, 14, 15, 16, 17, 18])
-                    minute = random.choice([0, 15, 30, 45])
+                    hour = self._meeting_hour(meeting_date, rng)
+                    minute = rng.choice([0, 15, 30, 45])
                     time_slot = datetime.datetime.combine(meeting_date.date(), datetime.time(hour, minute))
                     
                     # Create multiple meetings on the same day (realistic scenario)
-                    if random.random() < 0.15:  # 15% chance for multiple meetings per day
-                        num_same_day = random.randint(2, 3)
+                    if rng.random() < 0.15:  # 15% chance for multiple meetings per day
+                        num_same_day = rng.randint(2, 3)
                         for j in range(num_same_day):
-                            hour = random.choice([9, 10, 11, 12, 13, 14, 15, 16, 17, 18])
-                            minute = random.choice([0, 15, 30, 45])
+                            hour = self._meeting_hour(meeting_date, rng)
+                            minute = rng.choice([0, 15, 30, 45])
                             time_slot = datetime.datetime.combine(meeting_date.date(), datetime.time(hour, minute))
-                            self._create_meeting(user_id, client_id, time_slot, i, meeting_notes, meeting_summaries)
-                            meeting_count += 1
+                            series_end = self._create_meeting(user_id, client_id, time_slot, i + j, MEETING_NOTES,
+                                                              MEETING_SUMMARIES, rng) or series_end
                         continue
                     
-                    self._create_meeting(user_id, client_id, time_slot, i, meeting_notes, meeting_summaries)
-                    meeting_count += 1
+                    series_end = self._create_meeting(user_id, client_id, time_slot, i, MEETING_NOTES,
+                                                      MEETING_SUMMARIES, rng)
         
+        self.writer.flush('meetings')
+        meeting_count = self.writer.inserted_count('meetings') - meetings_before
         logger.info(f"Generated {meeting_count} meetings")
     
-    def _create_meeting(self, user_id, client_id, meeting_date, meeting_index=0, meeting_notes=None, meeting_summaries=None):
-        """Create a single meeting with production-like data"""
-        payment_type_id = random.choice([None] + self.payment_type_ids)
+    def _meeting_schedule(self, start_date, end_date, rng=random):
+        """Meeting dates of one client: a first meeting within 30 days of start_date, then regular intervals"""
+        # Generate realistic number of meetings per client
+        num_meetings = rng.randint(8, CONFIG['num_meetings_per_client'])
         
-        # Get client's source for pricing
-        self.cursor.execute("SELECT source_id FROM clients WHERE id = %s", (client_id,))
-        client_source_id = self.cursor.fetchone()[0]
+        # Create meeting schedule with realistic patterns
+        meeting_dates = []
+        for i in range(num_meetings):
+            # Generate meeting date with realistic distribution
+            if i == 0:  # First meeting
+                meeting_date = self._first_meeting_date(start_date, rng)
+            else:
+                # Subsequent meetings with realistic intervals
+                last_meeting = meeting_dates[-1] if meeting_dates else start_date
+                interval_days = rng.choice([7, 7, 7, 14, 14, 21, 30])  # Weekly, bi-weekly, monthly
+                if interval_days == 30 and self.profile['weekday_hours']:
+                    interval_days = 28  # Monthly clients keep their weekday slot
+                meeting_date = last_meeting + datetime.timedelta(days=interval_days)
+                if meeting_date > end_date:
+                    break
+            
+            meeting_dates.append(meeting_date)
+        return meeting_dates
+    
+    def _client_count(self, rng):
+        """Number of clients of one therapist, from the profile's client_counts"""
+        counts = self.profile['client_counts']
+        if not counts:
+            return rng.randint(15, CONFIG['num_clients_per_user'])
+        # A Pareto draw has the tail of a Zipf distribution with the given exponent
+        return min(counts['max'], round(counts['min'] * rng.paretovariate(counts['exponent'] - 1)))
+    
+    def _first_meeting_date(self, start_date, rng):
+        """First meeting of a client within 30 days of start_date, on a day weighted by the profile's weekday load"""
+        heatmap = self.profile['weekday_hours']
+        if not heatmap:
+            return self.random_date(start_date, start_date + datetime.timedelta(days=30), rng=rng)
+        weights = [sum(heatmap[(start_date + datetime.timedelta(days=day)).weekday()]) for day in range(30)]
+        day = rng.choices(range(30), weights=weights)[0]
+        return start_date + datetime.timedelta(days=day, seconds=rng.randrange(86400))
+    
+    def _keeps_meeting(self, meeting_date, rng):
+        """Whether a scheduled session takes place, given the profile's volume for its month"""
+        volume = self.profile['monthly_volume']
+        if not volume:
+            return True
+        return rng.random() < volume[meeting_date.month - 1] / max(volume)
+    
+    def _meeting_hour(self, meeting_date, rng):
+        """Start hour of a meeting, weighted by the profile's load for its weekday"""
+        heatmap = self.profile['weekday_hours']
+        if not heatmap:
+            return rng.choice(MEETING_HOURS)
+        return rng.choices(MEETING_HOURS, weights=heatmap[meeting_date.weekday()])[0]
+    
+    def _create_meeting(self, user_id, client_id, meeting_date, meeting_index=0, meeting_notes=None, meeting_summaries=None, rng=random):
+        """Create a single meeting with production-like data; a recurring first meeting also gets its series.
+        
+        Returns the date of the series' last session when the meeting starts a series, else None.
+        """
+        # Client's source comes from the in-memory maps, no lookup per meeting
+        client_source = self.client_sources.get(self.client_source_by_client.get(client_id), {})
         
         # Realistic duration and pricing based on client's source
-        if client_source_id == 1:  # Private
-            duration = random.choice([60, 90, 120])
-            price = random.choice([350.00, 400.00, 450.00])
-        elif client_source_id == 2:  # Natal
-            duration = random.choice([45, 60, 90])
-            price = random.choice([300.00, 350.00, 400.00])
-        else:  # Clalit
-            duration = random.choice([30, 45, 60])
-            price = random.choice([280.00, 300.00, 320.00])
+        pricing = SOURCE_PRICING_TIERS[client_source.get('pricing_tier', DEFAULT_PRICING_TIER)]
+        duration = rng.choice(pricing['durations'])
+        price = rng.choice(pricing['prices'])
+        meeting_date = self._book_slot(user_id, meeting_date, duration)
         
         # Generate realistic notes and summaries
         if meeting_notes and meeting_summaries:
-            notes = random.choice(meeting_notes)
-            summary = random.choice(meeting_summaries)
+            notes = rng.choice(meeting_notes)
+            summary = rng.choice(meeting_summaries)
         else:
-            notes = random.choice(['', f'Meeting notes {self.random_string(10)}', None])
-            summary = random.choice(['', f'Meeting summary {self.random_string(20)}', None])
+            notes = rng.choice(['', f'Meeting notes {self.random_string(10, rng=rng)}', None])
+            summary = rng.choice(['', f'Meeting summary {self.random_string(20, rng=rng)}', None])
         
         # Edge cases for some meetings
-        if random.random() < 0.05:  # 5% edge case
-            notes = self.get_edge_case_or_random(
-                ["", "   ", "NULL", "Notes'--", "Notes\"--", "Notes\\--", "A" * 1000],
-                lambda: notes
-            )
-            summary = self.get_edge_case_or_random(
-                ["", "   ", "NULL", "Summary'--", "Summary\"--", "Summary\\--", "A" * 2000],
-                lambda: summary
-            )
+        if rng.random() < 0.05:  # 5% edge case
+            notes = self.get_edge_case_or_random(EDGE_CASES['meeting_notes'], lambda: notes, rng=rng)
+            summary = self.get_edge_case_or_random(EDGE_CASES['meeting_summaries'], lambda: summary, rng=rng)
+        
+        status, is_paid = self._meeting_status(meeting_date, rng)
+        is_active = rng.choice([True, True, True, False])  # 75% active
+        
+        # Recurring meeting fields (10% chance for recurring)
+        is_recurring = rng.random() < 0.1  # 10% chance
+        recurrence_frequency = None
+        total_sessions = None
         
+        if is_recurring and meeting_index == 0:  # Only a client's first meeting starts a series
+            recurrence_frequency = rng.choice(['WEEKLY', 'BIWEEKLY', 'MONTHLY'])
+            default_sessions = client_source.get('default_sessions', 1)
+            total_sessions = rng.choice([default_sessions, default_sessions + 2, default_sessions + 5])
+        
+        meeting_id = self.ids.next_id('meetings')
+        self._add_meeting(meeting_id, user_id, client_id, meeting_date, duration, price, notes, summary, status,
+                          is_paid, is_active, recurrence_frequency, total_sessions)
+        if recurrence_frequency:
+            return self._create_series(meeting_id, user_id, client_id, meeting_date, duration, price, notes, summary,
+                                       recurrence_frequency, total_sessions, rng)
+        return None
+    
+    def _meeting_status(self, meeting_date, rng):
+        """Status and paid flag of a meeting, depending on whether it is in the past"""
         # Realistic status distribution
-        if meeting_date < datetime.datetime.now():
-            status = random.choice(['COMPLETED', 'COMPLETED', 'COMPLETED', 'CANCELLED', 'NO_SHOW'])
+        if meeting_date < self.now:
+            status = rng.choice(['COMPLETED', 'COMPLETED', 'COMPLETED', 'CANCELLED', 'NO_SHOW'])
         else:
-            status = random.choice(['SCHEDULED', 'SCHEDULED', 'SCHEDULED', 'CANCELLED'])
+            status = rng.choice(['SCHEDULED', 'SCHEDULED', 'SCHEDULED', 'CANCELLED'])
         
         # Realistic payment scenarios
         if status == 'COMPLETED':
-            is_paid = random.choice([True, True, True, False])  # 75% paid
+            is_paid = rng.choice([True, True, True, False])  # 75% paid
         else:
-            is_paid = random.choice([True, False])
+            is_paid = rng.choice([True, False])
+        return status, is_paid
+    
+    def _create_series(self, parent_id, user_id, client_id, parent_date, duration, price, notes, summary,
+                       recurrence_frequency, total_sessions, rng=random):
+        """Sessions 2..total_sessions of a recurring series, the way MeetingService creates them.
         
-        payment_date = None
-        if is_paid and status == 'COMPLETED':
-            payment_date = self.random_date(meeting_date, meeting_date + datetime.timedelta(days=7))
+        Their ids are reserved in one block after the parent's, so the whole series goes out in the same
+        batch without reading back generated keys. Returns the date of the last session.
+        """
+        session_date = parent_date
+        child_ids = self.ids.reserve('meetings', total_sessions - 1)
+        for session_number, meeting_id in enumerate(child_ids, start=2):
+            session_date = self._book_slot(user_id, next_session_date(session_date, recurrence_frequency), duration)
+            status, is_paid = self._meeting_status(session_date, rng)
+            self._add_meeting(meeting_id, user_id, client_id, session_date, duration, price, notes, summary, status,
+                              is_paid, True, recurrence_frequency, total_sessions, session_number, parent_id)
+        return session_date
+    
+    def _add_meeting(self, meeting_id, user_id, client_id, meeting_date, duration, price, notes, summary, status,
+                     is_paid, is_active, recurrence_frequency=None, total_sessions=None, session_number=1,
+                     parent_meeting_id=None):
+        """Queue a meeting row; paid meetings are remembered for generate_payments once stored"""
+        self.writer.add(
+            'meetings',
+            MEETING_COLUMNS,
+            (meeting_id, user_id, client_id, meeting_date, duration, price,
+             notes, summary, status, is_paid, is_active, recurrence_frequency is not None,
+             recurrence_frequency, total_sessions, session_number, parent_meeting_id, meeting_date),
+            label="meeting",
+            on_insert=functools.partial(self._record_paid_session, user_id, 'MEETING', meeting_id,
+                                        client_id, price, meeting_date) if is_paid else None
+        )
+    
+    def _record_paid_session(self, user_id, session_type, session_id, client_id, price, session_date, paid_at=None):
+        """Remember a stored paid (personal) meeting for generate_payments"""
+        self.paid_sessions.setdefault(user_id, []).append(
+            (session_type, session_id, client_id, price, session_date, paid_at))
+    
+    def generate_meetings_vectorized(self):
+        """Columnar version of generate_meetings: each therapist's meetings are drawn as NumPy arrays"""
+        if np is None:
+            raise RuntimeError("Vectorized meeting generation needs numpy (pip install numpy)")
+        logger.info("Generating meetings (vectorized)...")
         
-        is_active = random.choice([True, True, True, False])  # 75% active
+        meetings_before = self.writer.inserted_count('meetings')
+        start_date = self.now - datetime.timedelta(days=CONFIG['date_range_days'])
+        end_date = self.now + datetime.timedelta(days=30)
         
-        # Recurring meeting fields (10% chance for recurring)
-        is_recurring = random.random() < 0.1  # 10% chance
-        recurrence_frequency = None
-        total_sessions = None
-        session_number = 1
-        parent_meeting_id = None
+        for user_id, clients in self.clients_by_user.items():
+            if clients:
+                self._write_meeting_columns(user_id, self._meeting_columns(user_id, clients, start_date, end_date))
         
-        if is_recurring and meeting_index == 0:  # Only make first meeting in series recurring
-            recurrence_frequency = random.choice(['WEEKLY', 'BIWEEKLY', 'MONTHLY'])
-            # Get default sessions from client source
-            self.cursor.execute("SELECT default_sessions FROM client_sources WHERE id = %s", (client_source_id,))
-            default_sessions = self.cursor.fetchone()[0]
-            total_sessions = random.choice([default_sessions, default_sessions + 2, default_sessions + 5])
+        self.writer.flush('meetings')
+        meeting_count = self.writer.inserted_count('meetings') - meetings_before
+        logger.info(f"Generated {meeting_count} meetings")
+    
+    def _meeting_columns(self, user_id, clients, start_date, end_date):
+        """All meetings of one therapist as arrays, drawn with the same distributions as _create_meeting"""
+        rng = np.random.default_rng(self.rng_for('meetings-vectorized', self.user_key(user_id)).getrandbits(128))
+        max_meetings = CONFIG['num_meetings_per_client']
+        num_clients = len(clients)
         
-        try:
-            self.cursor.execute("""
-                INSERT INTO meetings (user_id, client_id, payment_type_id, meeting_date, 
-                                   duration, price, notes, summary, status, is_paid, payment_date, 
-                                   is_active, is_recurring, recurrence_frequency, total_sessions, 
-                                   session_number, parent_meeting_id, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (user_id, client_id, payment_type_id, meeting_date, duration, price,
-                  notes, summary, status, is_paid, payment_date, is_active, is_recurring,
-                  recurrence_frequency, total_sessions, session_number, parent_meeting_id, meeting_date))
-            
-        except mysql.connector.Error as err:
-            logger.warning(f"Failed to insert meeting: {err}")
+        # One row of candidate dates per client: a first meeting within 30 days of start_date, then
+        # weekly/bi-weekly/monthly intervals, cut at the client's meeting count and at end_date
+        counts = rng.integers(8, max_meetings, endpoint=True, size=num_clients)
+        heatmap = self.profile['weekday_hours']
+        if heatmap:
+            day_weights = np.array([sum(heatmap[(start_date + datetime.timedelta(days=day)).weekday()])
+                                    for day in range(30)])
+            first_days = rng.choice(30, size=num_clients, p=day_weights / day_weights.sum())
+        else:
+            first_days = rng.integers(30, size=num_clients)
+        first = first_days * 86400 + rng.integers(86400, size=num_clients)
+        intervals = rng.choice([7, 7, 7, 14, 14, 21, 30 if not heatmap else 28],   # monthly clients keep their weekday
+                               size=(num_clients, max_meetings)) * 86400
+        intervals[:, 0] = 0
+        offsets = first[:, None] + np.cumsum(intervals, axis=1)
+        scheduled = ((np.arange(max_meetings) < counts[:, None])
+                     & (offsets <= (end_date - start_date).total_seconds()))
+        volume = self.profile['monthly_volume']
+        if volume:
+            # Sessions take place with the profile's relative volume of their month
+            months = (np.datetime64(start_date, 's') + offsets).astype('datetime64[M]').astype(np.int64) % 12
+            scheduled &= rng.random(offsets.shape) < np.array(volume)[months] / max(volume)
+        client_index, meeting_index = np.nonzero(scheduled)
+        
+        # 15% of the dates get 2-3 meetings on the same day, each with its own time slot
+        per_date = np.where(rng.random(client_index.size) < 0.15,
+                            rng.integers(2, 3, endpoint=True, size=client_index.size), 1)
+        client_index = np.repeat(client_index, per_date)
+        # Numbered like _create_meeting's i + j, so only the first meeting of a client's first date starts a series
+        same_day = np.arange(per_date.sum()) - np.repeat(np.cumsum(per_date) - per_date, per_date)
+        meeting_index = np.repeat(meeting_index, per_date) + same_day
+        days = (np.datetime64(start_date, 's') + np.repeat(offsets[scheduled], per_date)).astype('datetime64[D]')
+        size = days.size
+        if heatmap:
+            weekdays = (days.astype(np.int64) + 3) % 7     # 1970-01-01 was a Thursday
+            hours = np.empty(size, dtype=np.int64)
+            for weekday, weights in heatmap.items():
+                on_weekday = weekdays == weekday
+                hours[on_weekday] = rng.choice(MEETING_HOURS, size=on_weekday.sum(),
+                                               p=np.array(weights) / sum(weights))
+        else:
+            hours = rng.integers(9, 18, endpoint=True, size=size)
+        minutes = rng.choice([0, 15, 30, 45], size=size)
+        meeting_dates = days + (hours * 3600 + minutes * 60).astype('timedelta64[s]')
+        
+        # Duration and price from each client's pricing tier
+        sources = [self.client_sources.get(self.client_source_by_client.get(client_id), {}) for client_id in clients]
+        tier_names = list(SOURCE_PRICING_TIERS)
+        tiers = np.array([tier_names.index(source.get('pricing_tier', DEFAULT_PRICING_TIER)) for source in sources])[client_index]
+        durations = np.empty(size, dtype=np.int64)
+        prices = np.empty(size)
+        for tier, pricing in enumerate(SOURCE_PRICING_TIERS.values()):
+            in_tier = tiers == tier
+            durations[in_tier] = rng.choice(pricing['durations'], size=in_tier.sum())
+            prices[in_tier] = rng.choice(pricing['prices'], size=in_tier.sum())
+        
+        notes = np.array(MEETING_NOTES, dtype=object)[rng.integers(len(MEETING_NOTES), size=size)]
+        summaries = np.array(MEETING_SUMMARIES, dtype=object)[rng.integers(len(MEETING_SUMMARIES), size=size)]
+        if CONFIG['include_edge_cases']:
+            # 5% of meetings are candidates, and get_edge_case_or_random picks an edge case for 10% of those
+            candidates = rng.random(size) < 0.05
+            for values, edge_cases in ((notes, EDGE_CASES['meeting_notes']),
+                                       (summaries, EDGE_CASES['meeting_summaries'])):
+                edge = candidates & (rng.random(size) < 0.1)
+                values[edge] = np.array(edge_cases, dtype=object)[rng.integers(len(edge_cases), size=edge.sum())]
+        
+        status = np.where(meeting_dates < np.datetime64(self.now, 's'),
+                          rng.choice(['COMPLETED', 'COMPLETED', 'COMPLETED', 'CANCELLED', 'NO_SHOW'], size=size),
+                          rng.choice(['SCHEDULED', 'SCHEDULED', 'SCHEDULED', 'CANCELLED'], size=size))
+        is_paid = rng.random(size) < np.where(status == 'COMPLETED', 0.75, 0.5)
+        is_active = rng.random(size) < 0.75
+        is_recurring = rng.random(size) < 0.1
+        
+        # Only the first meeting of a client's schedule carries the recurrence details
+        series_start = is_recurring & (meeting_index == 0)
+        recurrence_frequency = np.full(size, None, dtype=object)
+        recurrence_frequency[series_start] = rng.choice(['WEEKLY', 'BIWEEKLY', 'MONTHLY'], size=series_start.sum())
+        default_sessions = np.array([source.get('default_sessions', 1) for source in sources])[client_index]
+        total_sessions = np.full(size, None, dtype=object)
+        total_sessions[series_start] = (default_sessions[series_start]
+                                        + rng.choice([0, 2, 5], size=series_start.sum()))
+        
+        return {
+            'client_id': np.array(clients)[client_index],
+            'meeting_date': meeting_dates,
+            'duration': durations,
+            'price': prices,
+            'notes': notes,
+            'summary': summaries,
+            'status': status,
+            'is_paid': is_paid,
+            'is_active': is_active,
+            'is_recurring': series_start,
+            'recurrence_frequency': recurrence_frequency,
+            'total_sessions': total_sessions,
+        }
+    
+    def _write_meeting_columns(self, user_id, columns):
+        """Hand the rows of _meeting_columns to the writer, with ids reserved in one block"""
+        meeting_ids = self.ids.reserve('meetings', len(columns['client_id']))
+        meeting_dates = columns['meeting_date'].tolist()
+        rows = zip(meeting_ids, columns['client_id'].tolist(), meeting_dates, columns['duration'].tolist(),
+                   columns['price'].tolist(), columns['notes'].tolist(), columns['summary'].tolist(),
+                   columns['status'].tolist(), columns['is_paid'].tolist(), columns['is_active'].tolist(),
+                   columns['is_recurring'].tolist(), columns['recurrence_frequency'].tolist(),
+                   [None if total is None else int(total) for total in columns['total_sessions'].tolist()])
+        series_rng = self.rng_for('meeting-series', self.user_key(user_id))
+        # client id -> (first day, last session) of its recurring series, which replaces the regular meetings
+        # of the later days; the other meetings on the series' first day stay, as in generate_meetings
+        series_ends = {}
+        for (meeting_id, client_id, meeting_date, duration, price, notes, summary, status, is_paid, is_active,
+             is_recurring, recurrence_frequency, total_sessions) in rows:
+            if client_id in series_ends:
+                first_day, series_end = series_ends[client_id]
+                if first_day < meeting_date.date() <= series_end.date():
+                    continue
+            scheduled_day = meeting_date.date()
+            meeting_date = self._book_slot(user_id, meeting_date, duration)
+            self._add_meeting(meeting_id, user_id, client_id, meeting_date, duration, price, notes, summary, status,
+                              is_paid, is_active, recurrence_frequency, total_sessions)
+            if recurrence_frequency:
+                series_ends[client_id] = (scheduled_day, self._create_series(
+                    meeting_id, user_id, client_id, meeting_date, duration, price, notes, summary,
+                    recurrence_frequency, total_sessions, series_rng))
     
     def generate_personal_meetings(self):
         """Generate production-like personal meetings for therapists"""
         logger.info("Generating personal meetings...")
         
-        meeting_count = 0
-        start_date = datetime.datetime.now() - datetime.timedelta(days=CONFIG['date_range_days'])
-        end_date = datetime.datetime.now() + datetime.timedelta(days=30)
+        meetings_before = self.writer.inserted_count('personal_meetings')
+        start_date = self.now - datetime.timedelta(days=CONFIG['date_range_days'])
+        end_date = self.now + datetime.timedelta(days=30)
         
         # Realistic therapist names for personal meetings
         therapist_names = [
@@ -634,324 +2359,1716 @@ class TestDataGenerator:
             "Discussed personal growth and therapeutic guidance approaches."
         ]
         
-        for user_id in self.user_ids:
-            # Only therapists have personal meetings (not admins)
-            if user_id <= 45:  # Assuming first 45 are therapists
-                num_meetings = random.randint(8, CONFIG['num_personal_meetings_per_user'])
+        # Only therapists have personal meetings (not admins)
+        for user_id in self.therapist_ids:
+            rng = self.rng_for('personal_meetings', self.user_key(user_id))
+            num_meetings = rng.randint(8, CONFIG['num_personal_meetings_per_user'])
+            
+            # Create realistic personal meeting schedule
+            meeting_dates = []
+            for i in range(num_meetings):
+                if i == 0:  # First meeting
+                    meeting_date = self.random_date(start_date, start_date + datetime.timedelta(days=60), rng=rng)
+                else:
+                    # Subsequent meetings with realistic intervals
+                    last_meeting = meeting_dates[-1] if meeting_dates else start_date
+                    interval_days = rng.choice([7, 14, 21, 30, 30, 60])  # Weekly to monthly
+                    meeting_date = last_meeting + datetime.timedelta(days=interval_days)
+                    if meeting_date > end_date:
+                        break
                 
-                # Create realistic personal meeting schedule
-                meeting_dates = []
-                for i in range(num_meetings):
-                    if i == 0:  # First meeting
-                        meeting_date = self.random_date(start_date, start_date + datetime.timedelta(days=60))
-                    else:
-                        # Subsequent meetings with realistic intervals
-                        last_meeting = meeting_dates[-1] if meeting_dates else start_date
-                        interval_days = random.choice([7, 14, 21, 30, 30, 60])  # Weekly to monthly
-                        meeting_date = last_meeting + datetime.timedelta(days=interval_days)
-                        if meeting_date > end_date:
-                            break
-                    
-                    meeting_dates.append(meeting_date)
+                meeting_dates.append(meeting_date)
+            
+            for i, meeting_date in enumerate(meeting_dates):
+                therapist_name = rng.choice(therapist_names)
+                meeting_type_id = rng.choice([1, 2]) if len(self.personal_meeting_type_ids) >= 2 else rng.choice(self.personal_meeting_type_ids)
+                provider_type = rng.choice(['Therapist', 'Guide', 'Counselor', 'Mentor', 'Life Coach'])
+                provider_credentials = rng.choice(['Licensed Therapist', 'Professional Guide', 'Certified Counselor', 'Life Coach', 'Personal Development Specialist', ''])
                 
-                for i, meeting_date in enumerate(meeting_dates):
-                    therapist_name = random.choice(therapist_names)
-                    meeting_type_id = random.choice([1, 2]) if len(self.personal_meeting_type_ids) >= 2 else random.choice(self.personal_meeting_type_ids)
-                    provider_type = random.choice(['Therapist', 'Guide', 'Counselor', 'Mentor', 'Life Coach'])
-                    provider_credentials = random.choice(['Licensed Therapist', 'Professional Guide', 'Certified Counselor', 'Life Coach', 'Personal Development Specialist', ''])
-                    
-                    # Generate realistic time slots
-                    hour = random.choice([8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19])
-                    minute = random.choice([0, 15, 30, 45])
-                    time_slot = datetime.datetime.combine(meeting_date.date(), datetime.time(hour, minute))
-                    
-                    # Realistic duration and pricing based on type
-                    if meeting_type_id == 1:  # Personal Therapy
-                        duration = 60
-                        price = 400.00
-                    else:  # Guidance
-                        duration = 90
-                        price = 500.00
-                    
-                    notes = random.choice(personal_meeting_notes)
-                    summary = random.choice(personal_meeting_summaries)
-                    
-                    # Realistic status distribution
-                    if meeting_date < datetime.datetime.now():
-                        status = random.choice(['COMPLETED', 'COMPLETED', 'COMPLETED', 'CANCELLED', 'NO_SHOW'])
-                    else:
-                        status = random.choice(['SCHEDULED', 'SCHEDULED', 'SCHEDULED', 'CANCELLED'])
-                    
-                    # Realistic payment scenarios
-                    if status == 'COMPLETED':
-                        is_paid = random.choice([True, True, True, False])  # 75% paid
-                    else:
-                        is_paid = random.choice([True, False])
-                    
-                    payment_date = None
-                    if is_paid and status == 'COMPLETED':
-                        payment_date = self.random_date(time_slot, time_slot + datetime.timedelta(days=7))
-                    
-                    is_recurring = random.choice([True, False])
-                    
-                    recurrence_frequency = None
-                    next_due_date = None
-                    if is_recurring:
-                        recurrence_frequency = random.choice(['weekly', 'monthly', 'quarterly'])
-                        next_due_date = self.random_date(time_slot.date(), time_slot.date() + datetime.timedelta(days=365))
-                    
-                    is_active = random.choice([True, True, True, False])  # 75% active
-                    
-                    try:
-                        self.cursor.execute("""
-                            INSERT INTO personal_meetings (user_id, therapist_name, meeting_type_id, provider_type,
-                                                        provider_credentials, meeting_date, duration, price, notes,
-                                                        summary, status, is_paid, payment_date, is_recurring, 
-                                                        recurrence_frequency, next_due_date, is_active, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (user_id, therapist_name, meeting_type_id, provider_type, provider_credentials,
-                             time_slot, duration, price, notes, summary, status, is_paid, payment_date,
-                             is_recurring, recurrence_frequency, next_due_date, is_active, time_slot))
-                        
-                        meeting_count += 1
-                        
-                    except mysql.connector.Error as err:
-                        logger.warning(f"Failed to insert personal meeting: {err}")
+                # Generate realistic time slots
+                hour = rng.choice([8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19])
+                minute = rng.choice([0, 15, 30, 45])
+                time_slot = datetime.datetime.combine(meeting_date.date(), datetime.time(hour, minute))
+                
+                # Realistic duration and pricing based on type
+                if meeting_type_id == 1:  # Personal Therapy
+                    duration = 60
+                    price = 400.00
+                else:  # Guidance
+                    duration = 90
+                    price = 500.00
+                time_slot = self._book_slot(user_id, time_slot, duration)
+                
+                notes = rng.choice(personal_meeting_notes)
+                summary = rng.choice(personal_meeting_summaries)
+                
+                # Realistic status distribution, for the slot the meeting was finally booked in
+                if time_slot < self.now:
+                    status = rng.choice(['COMPLETED', 'COMPLETED', 'COMPLETED', 'CANCELLED', 'NO_SHOW'])
+                else:
+                    status = rng.choice(['SCHEDULED', 'SCHEDULED', 'SCHEDULED', 'CANCELLED'])
+                
+                # Realistic payment scenarios
+                if status == 'COMPLETED':
+                    is_paid = rng.choice([True, True, True, False])  # 75% paid
+                else:
+                    is_paid = rng.choice([True, False])
+                
+                payment_date = None
+                if is_paid and status == 'COMPLETED':
+                    payment_date = self.random_date(time_slot, time_slot + datetime.timedelta(days=7), rng=rng)
+                
+                is_recurring = rng.choice([True, False])
+                
+                recurrence_frequency = None
+                next_due_date = None
+                if is_recurring:
+                    recurrence_frequency = rng.choice(['weekly', 'monthly', 'quarterly'])
+                    next_due_date = self.random_date(time_slot.date(), time_slot.date() + datetime.timedelta(days=365), rng=rng)
+                
+                is_active = rng.choice([True, True, True, False])  # 75% active
+                
+                meeting_id = self.ids.next_id('personal_meetings')
+                self.writer.add(
+                    'personal_meetings',
+                    ('id', 'user_id', 'therapist_name', 'meeting_type_id', 'provider_type', 'provider_credentials',
+                     'meeting_date', 'duration', 'price', 'notes', 'summary', 'status', 'is_paid',
+                     'payment_date', 'is_recurring', 'recurrence_frequency', 'next_due_date', 'is_active',
+                     'created_at'),
+                    (meeting_id, user_id, therapist_name, meeting_type_id,
+                     provider_type, provider_credentials, time_slot, duration, price, notes, summary, status,
+                     is_paid, payment_date, is_recurring, recurrence_frequency, next_due_date, is_active, time_slot),
+                    label="personal meeting",
+                    on_insert=functools.partial(self._record_paid_session, user_id, 'PERSONAL_MEETING', meeting_id,
+                                                None, price, time_slot, payment_date) if is_paid else None
+                )
         
+        self.writer.flush('personal_meetings')
+        meeting_count = self.writer.inserted_count('personal_meetings') - meetings_before
         logger.info(f"Generated {meeting_count} personal meetings for therapists")
+        self.log_schedule_collisions()
+    
+    def _book_slot(self, user_id, start, duration):
+        """Book a (personal) meeting in its therapist's schedule, moving it to a free slot unless it is
+        one of the CONFIG['collision_rate'] share of deliberate double bookings; returns its start time
+        """
+        if CONFIG['collision_rate'] is None:
+            return start
+        schedule = self.therapist_schedule(user_id)
+        return schedule.book(start, duration, collide=schedule.rng.random() < CONFIG['collision_rate'])
+    
+    def therapist_schedule(self, user_id):
+        """The therapist's TherapistSchedule, created on first use"""
+        schedule = self.schedules.get(user_id)
+        if schedule is None:
+            schedule = self.schedules[user_id] = TherapistSchedule(self.rng_for('schedule', self.user_key(user_id)),
+                                                                   self.profile['weekday_hours'])
+        return schedule
+    
+    def log_schedule_collisions(self):
+        """Log how many of the booked (personal) meetings overlap another one"""
+        bookings = sum(schedule.bookings for schedule in self.schedules.values())
+        if bookings:
+            collisions = sum(schedule.collisions for schedule in self.schedules.values())
+            logger.info(f"Scheduled {bookings} meetings and personal meetings, {collisions} overlapping "
+                        f"({collisions / bookings:.1%}, target {CONFIG['collision_rate']:.1%})")
+    
+    def load_schedules(self, since, user_ids):
+        """Book these therapists' meetings and personal meetings already in the database from `since` on"""
+        for table in ('meetings', 'personal_meetings'):
+            self.cursor.execute(f"SELECT user_id, meeting_date, duration FROM {table} "
+                                f"WHERE meeting_date >= {self.sink.placeholder} "
+                                f"AND user_id IN ({', '.join([self.sink.placeholder] * len(user_ids))})",
+                                [since, *user_ids])
+            for user_id, meeting_date, duration in self.cursor.fetchall():
+                meeting_date = as_datetime(meeting_date)
+                self.therapist_schedule(user_id).add(meeting_date.date(), meeting_date.hour * 60 + meeting_date.minute, duration)
     
     def generate_expenses(self):
         """Generate production-like expenses with realistic categories and amounts"""
         logger.info("Generating expenses...")
         
-        expense_count = 0
-        start_date = datetime.datetime.now() - datetime.timedelta(days=CONFIG['date_range_days'])
-        end_date = datetime.datetime.now() + datetime.timedelta(days=30)
-        
-        # Production-like expense categories with realistic amounts
-        expense_categories = {
-            'Office Supplies': {
-                'names': ['Printer paper', 'Pens and notebooks', 'Staples and clips', 'Whiteboard markers', 'File folders'],
-                'amounts': (10.00, 200.00)
-            },
-            'Professional Development': {
-                'names': ['Conference registration', 'Workshop fees', 'Online course', 'Professional books', 'Certification exam'],
-                'amounts': (200.00, 2000.00)
-            },
-            'Insurance': {
-                'names': ['Professional liability insurance', 'Office insurance', 'Health insurance', 'Disability insurance'],
-                'amounts': (500.00, 5000.00)
-            },
-            'Software': {
-                'names': ['Therapy software license', 'Accounting software', 'Video conferencing platform', 'Practice management system'],
-                'amounts': (50.00, 500.00)
-            },
-            'Marketing': {
-                'names': ['Website hosting', 'Business cards', 'Online advertising', 'Brochures and flyers', 'SEO services'],
-                'amounts': (100.00, 1000.00)
-            },
-            'Travel': {
-                'names': ['Conference travel', 'Client home visits', 'Professional meetings', 'Training workshops'],
-                'amounts': (50.00, 500.00)
-            },
-            'Equipment': {
-                'names': ['Computer upgrade', 'Office furniture', 'Therapy equipment', 'Audio recording device', 'Security camera'],
-                'amounts': (200.00, 3000.00)
-            },
-            'Utilities': {
-                'names': ['Electricity bill', 'Internet service', 'Phone service', 'Water bill', 'Heating/cooling'],
-                'amounts': (100.00, 800.00)
-            },
-            'Rent': {
-                'names': ['Office rent', 'Storage unit', 'Meeting room rental'],
-                'amounts': (2000.00, 8000.00)
-            },
-            'Professional Services': {
-                'names': ['Accounting services', 'Legal consultation', 'IT support', 'Cleaning services'],
-                'amounts': (150.00, 1500.00)
-            }
-        }
+        expenses_before = self.writer.inserted_count('expenses')
+        self.ensure_expense_categories()
         
-        # Realistic expense descriptions
-        expense_descriptions = [
-            "Monthly office supplies for therapy practice",
-            "Professional development workshop registration",
-            "Annual professional liability insurance premium",
-            "Software license renewal for practice management",
-            "Marketing materials for new client acquisition",
-            "Travel expenses for professional conference",
-            "Equipment upgrade for improved client care",
-            "Monthly utility bills for office space",
-            "Office rent payment for therapy practice",
-            "Professional services for practice management"
-        ]
+        start_date = self.now - datetime.timedelta(days=CONFIG['date_range_days'])
+        end_date = self.now + datetime.timedelta(days=30)
         
-        for user_id in self.user_ids:
-            # Only therapists have significant expenses (not admins)
-            if user_id <= 45:  # Assuming first 45 are therapists
-                num_expenses = random.randint(20, CONFIG['num_expenses_per_user'])
-                
-                # Create realistic expense schedule
-                expense_dates = []
-                for i in range(num_expenses):
-                    if i == 0:  # First expense
-                        expense_date = self.random_date(start_date, start_date + datetime.timedelta(days=30))
-                    else:
-                        # Subsequent expenses with realistic intervals
-                        last_expense = expense_dates[-1] if expense_dates else start_date
-                        interval_days = random.choice([1, 7, 14, 30, 30, 60, 90])  # Daily to quarterly
-                        expense_date = last_expense + datetime.timedelta(days=interval_days)
-                        if expense_date > end_date:
-                            break
-                    
-                    expense_dates.append(expense_date)
+        # Only therapists have significant expenses (not admins)
+        for user_id in self.therapist_ids:
+            rng = self.rng_for('expenses', self.user_key(user_id))
+            num_expenses = rng.randint(20, CONFIG['num_expenses_per_user'])
+            
+            # Create realistic expense schedule
+            expense_dates = []
+            for i in range(num_expenses):
+                if i == 0:  # First expense
+                    expense_date = self.random_date(start_date, start_date + datetime.timedelta(days=30), rng=rng)
+                else:
+                    # Subsequent expenses with realistic intervals
+                    last_expense = expense_dates[-1] if expense_dates else start_date
+                    interval_days = rng.choice([1, 7, 14, 30, 30, 60, 90])  # Daily to quarterly
+                    expense_date = last_expense + datetime.timedelta(days=interval_days)
+                    if expense_date > end_date:
+                        break
                 
-                for i, expense_date in enumerate(expense_dates):
-                    category = random.choice(list(expense_categories.keys()))
-                    category_data = expense_categories[category]
-                    
-                    name = random.choice(category_data['names'])
-                    min_amount, max_amount = category_data['amounts']
-                    amount = round(random.uniform(min_amount, max_amount), 2)
-                    
-                    # Edge cases for some expenses
-                    if random.random() < 0.05:  # 5% edge case
-                        name = self.get_edge_case_or_random(
-                            ["", "   ", "NULL", "Expense'--", "Expense\"--", "Expense\\--", "A" * 255],
-                            lambda: name
-                        )
-                    
-                    description = random.choice(expense_descriptions)
-                    if random.random() < 0.05:  # 5% edge case
-                        description = self.get_edge_case_or_random(
-                            ["", "   ", "NULL", "Description'--", "Description\"--", "Description\\--", "A" * 1000],
-                            lambda: description
-                        )
-                    
-                    currency = random.choice(['ILS', 'ILS', 'ILS', 'USD', 'EUR'])  # Mostly ILS
-                    
-                    notes = random.choice(['', f'Notes for {name}', None])
-                    
-                    # Realistic recurring expenses
-                    is_recurring = random.choice([True, True, False, False, False])  # 40% recurring
-                    recurrence_frequency = None
-                    next_due_date = None
-                    if is_recurring:
-                        recurrence_frequency = random.choice(['monthly', 'quarterly', 'yearly'])
-                        next_due_date = self.random_date(datetime.datetime.now(), datetime.datetime.now() + datetime.timedelta(days=365)).date()
-                    
-                    # Realistic payment scenarios
-                    is_paid = random.choice([True, True, True, False])  # 75% paid
-                    payment_method = random.choice(['Bank Transfer', 'Credit Card', 'Cash', 'Check'])
-                    receipt_url = random.choice([None, f"https://receipt.example.com/{self.random_string(10)}"])
-                    is_active = random.choice([True, True, True, False])  # 75% active
-                    
-                    try:
-                        # Get or create expense category
-                        self.cursor.execute("SELECT id FROM expense_categories WHERE name = %s", (category,))
-                        category_result = self.cursor.fetchone()
-                        if category_result:
-                            category_id = category_result[0]
-                        else:
-                            # Create the category if it doesn't exist
-                            self.cursor.execute("""
-                                INSERT INTO expense_categories (name, description, is_active, created_at, updated_at)
-                                VALUES (%s, %s, %s, %s, %s)
-                            """, (category, f"Category for {category}", True, datetime.datetime.now(), datetime.datetime.now()))
-                            category_id = self.cursor.lastrowid
-                        
-                        # Get payment type ID if specified
-                        payment_type_id = None
-                        if payment_method:
-                            self.cursor.execute("SELECT id FROM payment_types WHERE name = %s", (payment_method,))
-                            payment_result = self.cursor.fetchone()
-                            if payment_result:
-                                payment_type_id = payment_result[0]
-                        
-                        self.cursor.execute("""
-                            INSERT INTO expenses (user_id, name, description, amount, currency, category_id, notes,
-                                               expense_date, is_recurring, recurrence_frequency, next_due_date,
-                                               is_paid, payment_type_id, receipt_url, is_active, created_at, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (user_id, name, description, amount, currency, category_id, notes, expense_date.date(),
-                             is_recurring, recurrence_frequency, next_due_date, is_paid, payment_type_id,
-                             receipt_url, is_active, datetime.datetime.now(), datetime.datetime.now()))
-                        
-                        expense_count += 1
-                        
-                    except mysql.connector.Error as err:
-                        logger.warning(f"Failed to insert expense: {err}")
+                expense_dates.append(expense_date)
+            
+            for expense_date in expense_dates:
+                self._create_expense(user_id, expense_date, rng)
         
+        self.writer.flush('expenses')
+        expense_count = self.writer.inserted_count('expenses') - expenses_before
         logger.info(f"Generated {expense_count} expenses for therapists")
     
+    def _create_expense(self, user_id, expense_date, rng=random):
+        """Create a single expense with production-like data"""
+        category = rng.choice(list(EXPENSE_CATEGORIES.keys()))
+        category_data = EXPENSE_CATEGORIES[category]
+        
+        name = rng.choice(category_data['names'])
+        min_amount, max_amount = category_data['amounts']
+        amount = round(rng.uniform(min_amount, max_amount), 2)
+        
+        # Edge cases for some expenses
+        if rng.random() < 0.05:  # 5% edge case
+            name = self.get_edge_case_or_random(
+                ["", "   ", "NULL", "Expense'--", "Expense\"--", "Expense\\--", "A" * 255],
+                lambda: name,
+                rng=rng
+            )
+        
+        description = rng.choice(EXPENSE_DESCRIPTIONS)
+        if rng.random() < 0.05:  # 5% edge case
+            description = self.get_edge_case_or_random(
+                ["", "   ", "NULL", "Description'--", "Description\"--", "Description\\--", "A" * 1000],
+                lambda: description,
+                rng=rng
+            )
+        
+        currency = rng.choice(['ILS', 'ILS', 'ILS', 'USD', 'EUR'])  # Mostly ILS
+        
+        notes = rng.choice(['', f'Notes for {name}', None])
+        
+        # Realistic recurring expenses
+        is_recurring = rng.choice([True, True, False, False, False])  # 40% recurring
+        recurrence_frequency = None
+        next_due_date = None
+        if is_recurring:
+            recurrence_frequency = rng.choice(['monthly', 'quarterly', 'yearly'])
+            next_due_date = self.random_date(self.now, self.now + datetime.timedelta(days=365), rng=rng).date()
+        
+        # Realistic payment scenarios
+        is_paid = rng.choice([True, True, True, False])  # 75% paid
+        payment_method = rng.choice(['Bank Transfer', 'Credit Card', 'Cash', 'Check'])
+        receipt_url = rng.choice([None, f"https://receipt.example.com/{self.random_string(10, rng=rng)}"])
+        is_active = rng.choice([True, True, True, False])  # 75% active
+        
+        category_id = self.lookups.get('expense_categories', category)
+        payment_type_id = self.lookups.get('payment_types', payment_method)
+        
+        self.writer.add(
+            'expenses',
+            ('id', 'user_id', 'name', 'description', 'amount', 'currency', 'category_id', 'notes',
+             'expense_date', 'is_recurring', 'recurrence_frequency', 'next_due_date', 'is_paid',
+             'payment_type_id', 'receipt_url', 'is_active', 'created_at', 'updated_at'),
+            (self.ids.next_id('expenses'), user_id, name, description, amount, currency, category_id,
+             notes, expense_date.date(), is_recurring, recurrence_frequency, next_due_date, is_paid,
+             payment_type_id, receipt_url, is_active, self.now, self.now),
+            label="expense"
+        )
+    
+    def generate_payments(self):
+        """Generate payment rows for the paid meetings and personal meetings recorded in memory.
+        
+        Most sessions are paid in full (a few of them refunded later), some in 2-3 monthly
+        installments whose future ones are still pending, and some together with the client's other
+        sessions of the month under one transaction.
+        """
+        logger.info("Generating payments...")
+        if not self.payment_type_ids:
+            logger.warning("No payment types found, skipping payments")
+            return
+        
+        payments_before = self.writer.inserted_count('payments')
+        for user_id, sessions in self.paid_sessions.items():
+            if CONFIG['vectorized']:
+                self._write_payment_columns(user_id, sessions, self._payment_columns(user_id, sessions))
+            else:
+                self._generate_user_payments(user_id, sessions)
+        
+        self.writer.flush('payments')
+        payment_count = self.writer.inserted_count('payments') - payments_before
+        logger.info(f"Generated {payment_count} payments")
+    
+    def _generate_user_payments(self, user_id, sessions):
+        """Payments for one user's paid sessions, one session at a time"""
+        rng = self.rng_for('payments', self.user_key(user_id))
+        monthly = {}    # (client id, year, month) -> payment date, payment type, reference, transaction id
+        
+        for session_type, session_id, client_id, price, session_date, paid_at in sessions:
+            payment_type_id = rng.choice(self.payment_type_ids)
+            reference_number = f"REF-{rng.randrange(10 ** 8):08d}" if rng.random() < 0.4 else None
+            transaction_id = f"TXN-{rng.randrange(16 ** 12):012X}" if rng.random() < 0.6 else None
+            if paid_at is None and session_date > self.now:   # paid in advance
+                paid_at = self.now - datetime.timedelta(seconds=rng.randrange(14 * 86400))
+            elif paid_at is None:
+                paid_at = min(session_date + datetime.timedelta(seconds=rng.randrange(7 * 86400)), self.now)
+            
+            plan = rng.random()
+            if plan < 0.08:
+                key = (client_id, session_date.year, session_date.month)
+                if key not in monthly:
+                    next_month = (session_date.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+                    month_start = datetime.datetime.combine(next_month, datetime.time())
+                    monthly[key] = (min(month_start, self.now), payment_type_id, reference_number, transaction_id)
+                paid_at, payment_type_id, reference_number, transaction_id = monthly[key]
+                self._add_payment(user_id, session_type, session_id, payment_type_id, price, paid_at, 'COMPLETED',
+                                  reference_number, transaction_id, f"Monthly payment {key[1]}-{key[2]:02d}")
+            elif plan < 0.2:
+                amounts = split_installments(price, rng.randint(2, 3), rng.uniform(0.3, 0.7))
+                for number, amount in enumerate(amounts):
+                    due = paid_at + datetime.timedelta(days=30 * number)
+                    self._add_payment(user_id, session_type, session_id, payment_type_id, amount, due,
+                                      'PENDING' if due > self.now else 'COMPLETED', reference_number,
+                                      transaction_id, f"Installment {number + 1} of {len(amounts)}")
+            else:
+                refunded = rng.random() < 0.02
+                payment_id = self._add_payment(user_id, session_type, session_id, payment_type_id, price, paid_at,
+                                               'REFUNDED' if refunded else 'COMPLETED', reference_number,
+                                               transaction_id)
+                if refunded:
+                    refunded_at = min(paid_at + datetime.timedelta(days=rng.randint(1, 14)), self.now)
+                    self._add_payment(user_id, session_type, session_id, payment_type_id, -price, refunded_at,
+                                      'REFUNDED', notes=f"Refund for payment #{payment_id}")
+    
+    def _add_payment(self, user_id, session_type, session_id, payment_type_id, amount, payment_date, status,
+                     reference_number=None, transaction_id=None, notes=None, payment_id=None):
+        """Queue a payment row and return its id"""
+        payment_id = payment_id or self.ids.next_id('payments')
+        self.writer.add(
+            'payments',
+            ('id', 'user_id', 'session_id', 'session_type', 'payment_type_id', 'amount', 'currency',
+             'payment_date', 'reference_number', 'notes', 'transaction_id', 'status', 'is_active',
+             'created_at', 'updated_at'),
+            (payment_id, user_id, session_id, session_type, payment_type_id, amount, 'ILS', payment_date,
+             reference_number, notes, transaction_id, status, True, payment_date, payment_date),
+            label="payment"
+        )
+        return payment_id
+    
+    def _payment_columns(self, user_id, sessions):
+        """Columnar version of _generate_user_payments: the rows of one user's payments as arrays.
+        
+        The first len(sessions) rows are each session's first payment, in session order; further
+        installments and refunds follow, pointing back at their session through 'session'.
+        """
+        rng = np.random.default_rng(self.rng_for('payments-vectorized', self.user_key(user_id)).getrandbits(128))
+        size = len(sessions)
+        _, _, client_ids, prices, session_dates, paid_ats = zip(*sessions)
+        prices = np.array(prices, dtype=float)
+        session_dates = np.array(session_dates, dtype='datetime64[s]')
+        now = np.datetime64(self.now, 's')
+        
+        payment_types = rng.choice(self.payment_type_ids, size=size)
+        references = np.where(rng.random(size) < 0.4, rng.integers(10 ** 8, size=size), -1)
+        transactions = np.where(rng.random(size) < 0.6, rng.integers(16 ** 12, size=size), -1)
+        paid_at = np.where(session_dates > now,
+                           now - rng.integers(14 * 86400, size=size).astype('timedelta64[s]'),
+                           np.minimum(session_dates + rng.integers(7 * 86400, size=size).astype('timedelta64[s]'), now))
+        recorded = np.array([value is not None for value in paid_ats])
+        paid_at[recorded] = np.array([value for value in paid_ats if value is not None], dtype='datetime64[s]')
+        
+        plan = rng.random(size)
+        monthly = plan < 0.08
+        partial = (plan >= 0.08) & (plan < 0.2)
+        refunded = ~monthly & ~partial & (rng.random(size) < 0.02)
+        
+        # Sessions paid together share the group's first payment type, references and date
+        months = session_dates.astype('datetime64[M]')
+        clients = np.array([client_id or 0 for client_id in client_ids])
+        members = np.flatnonzero(monthly)
+        if members.size:
+            _, first, group = np.unique(np.stack([clients, months.astype(np.int64)])[:, members], axis=1,
+                                        return_index=True, return_inverse=True)
+            leaders = members[first][group.ravel()]
+            payment_types[members] = payment_types[leaders]
+            references[members] = references[leaders]
+            transactions[members] = transactions[leaders]
+            paid_at[members] = np.minimum((months[members] + 1).astype('datetime64[s]'), now)
+        
+        # Installments: the first share rounded to 10, a rounded half of the rest, the remainder last
+        installments = np.where(partial, rng.integers(2, 3, endpoint=True, size=size), 1)
+        first_amount = np.round(prices * rng.uniform(0.3, 0.7, size=size) / 10) * 10
+        middle_amount = np.round((prices - first_amount) / 2 / 10) * 10
+        amounts = [np.where(partial, first_amount, prices),
+                   np.where(installments == 3, middle_amount, prices - first_amount),
+                   prices - first_amount - middle_amount]
+        
+        rows = {'session': [], 'amount': [], 'payment_date': [], 'number': []}
+        for number in range(3):
+            in_plan = np.flatnonzero(installments > number)
+            rows['session'].append(in_plan)
+            rows['amount'].append(np.round(amounts[number][in_plan], 2))
+            rows['payment_date'].append(paid_at[in_plan] + np.timedelta64(30 * number, 'D'))
+            rows['number'].append(np.full(in_plan.size, number))
+        refunds = np.flatnonzero(refunded)
+        rows['session'].append(refunds)
+        rows['amount'].append(-prices[refunds])
+        rows['payment_date'].append(np.minimum(paid_at[refunds] + rng.integers(1, 14, endpoint=True, size=refunds.size)
+                                               .astype('timedelta64[D]'), now))
+        rows['number'].append(np.full(refunds.size, -1))
+        rows = {name: np.concatenate(parts) for name, parts in rows.items()}
+        
+        session = rows['session']
+        rows['status'] = np.where(rows['payment_date'] > now, 'PENDING', 'COMPLETED')
+        rows['status'][refunded[session]] = 'REFUNDED'
+        rows['payment_type'] = payment_types[session]
+        rows['reference'] = np.where(rows['number'] < 0, -1, references[session])
+        rows['transaction'] = np.where(rows['number'] < 0, -1, transactions[session])
+        rows['monthly'] = monthly[session]
+        rows['installments'] = np.where(partial[session], installments[session], 0)
+        return rows
+    
+    def _write_payment_columns(self, user_id, sessions, rows):
+        """Hand the rows of _payment_columns to the writer, with ids reserved in one block"""
+        payment_ids = self.ids.reserve('payments', len(rows['session']))
+        columns = zip(payment_ids, rows['session'].tolist(), rows['amount'].tolist(),
+                      rows['payment_date'].tolist(), rows['number'].tolist(), rows['status'].tolist(),
+                      rows['payment_type'].tolist(), rows['reference'].tolist(), rows['transaction'].tolist(),
+                      rows['monthly'].tolist(), rows['installments'].tolist())
+        for (payment_id, index, amount, payment_date, number, status, payment_type_id, reference, transaction,
+             monthly, installments) in columns:
+            session_type, session_id, _, _, session_date, _ = sessions[index]
+            if number < 0:
+                notes = f"Refund for payment #{payment_ids[index]}"
+            elif monthly:
+                notes = f"Monthly payment {session_date.year}-{session_date.month:02d}"
+            elif installments:
+                notes = f"Installment {number + 1} of {installments}"
+            else:
+                notes = None
+            self._add_payment(user_id, session_type, session_id, payment_type_id, amount, payment_date, status,
+                              f"REF-{reference:08d}" if reference >= 0 else None,
+                              f"TXN-{transaction:012X}" if transaction >= 0 else None, notes, payment_id)
+    
+    def ensure_expense_categories(self):
+        """Create any missing categories upfront so the expense loop never touches the database"""
+        created = self.lookups.ensure('expense_categories', [
+            {'name': category, 'description': f"Category for {category}", 'is_active': True,
+             'created_at': self.now, 'updated_at': self.now}
+            for category in EXPENSE_CATEGORIES
+        ])
+        if created:
+            logger.info(f"Created {created} missing expense categories")
+    
     def generate_calendar_integrations(self):
         """Generate calendar integrations for some users"""
         logger.info("Generating calendar integrations...")
         
-        integration_count = 0
+        integrations_before = self.writer.inserted_count('calendar_integrations')
         
         for user_id in self.user_ids:
+            rng = self.rng_for('calendar_integration', self.user_key(user_id))
+            
             # Only some users have calendar integration
-            if random.random() < 0.3:  # 30% chance
-                google_calendar_id = f"calendar_{self.random_string(10)}@group.calendar.google.com"
-                is_active = random.choice([True, False])
+            if rng.random() < 0.3:  # 30% chance
+                google_calendar_id = f"calendar_{self.random_string(10, rng=rng)}@group.calendar.google.com"
+                is_active = rng.choice([True, False])
                 
-                try:
-                    self.cursor.execute("""
-                        INSERT INTO calendar_integrations (user_id, google_calendar_id, sync_enabled, 
-                                                        sync_client_sessions, sync_personal_meetings, 
-                                                        last_sync_date, created_at, updated_at)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (user_id, google_calendar_id, is_active, True, True, 
-                         datetime.datetime.now() - datetime.timedelta(days=random.randint(1, 30)),
-                         datetime.datetime.now(), datetime.datetime.now()))
-                    
-                    integration_count += 1
-                    
-                except mysql.connector.Error as err:
-                    logger.warning(f"Failed to insert calendar integration: {err}")
+                self.writer.add(
+                    'calendar_integrations',
+                    ('id', 'user_id', 'google_calendar_id', 'sync_enabled', 'sync_client_sessions',
+                     'sync_personal_meetings', 'last_sync_date', 'created_at', 'updated_at'),
+                    (self.ids.next_id('calendar_integrations'), user_id, google_calendar_id, is_active, True, True,
+                     self.now - datetime.timedelta(days=rng.randint(1, 30)),
+                     self.now, self.now),
+                    label="calendar integration"
+                )
         
+        self.writer.flush('calendar_integrations')
+        integration_count = self.writer.inserted_count('calendar_integrations') - integrations_before
         logger.info(f"Generated {integration_count} calendar integrations")
     
-    def run(self):
-        """Run the complete data generation process"""
+    def generate_therapist_data(self):
+        """Generate everything owned by the therapists in self.therapist_ids"""
+        with self.stage('clients'):
+            self.generate_clients()
+        with self.stage('meetings'):
+            self.generate_meetings()
+        with self.stage('personal_meetings'):
+            self.generate_personal_meetings()
+        with self.stage('expenses'):
+            self.generate_expenses()
+        with self.stage('payments'):
+            self.generate_payments()
+    
+    def plan_chunks(self):
+        """Split the therapists into chunks; for parallel runs each chunk's id blocks are reserved up front"""
+        size = CONFIG['chunk_size']
+        capacity = therapist_id_capacity()
+        chunks = []
+        for start in range(0, len(self.therapist_ids), max(1, size)):
+            therapist_ids = self.therapist_ids[start:start + size]
+            blocks = None
+            if CONFIG['workers'] > 1:
+                # Disjoint blocks sized for the most these therapists can produce
+                blocks = {table: self.ids.reserve(table, count * len(therapist_ids)) for table, count in capacity.items()}
+            chunks.append({'therapists': therapist_ids, 'blocks': blocks, 'done': False})
+        return chunks
+    
+    def generate_therapist_chunks(self):
+        """Generate the chunks that are not done yet, checkpointing after each one"""
+        pending = [(index, chunk) for index, chunk in enumerate(self.chunks) if not chunk['done']]
+        if CONFIG['workers'] > 1:
+            return self.generate_therapist_data_parallel(pending)
+        
+        results = []
+        for index, chunk in pending:
+            started = time.time()
+            rows_before = dict(self.writer.inserted)
+            write_before = self.writer.write_seconds
+            self.generate_therapist_chunk(chunk['therapists'])
+            results.append(_shard_result(index, chunk['therapists'], self.writer, rows_before, started, write_before))
+            chunk['done'] = True
+            self.save_checkpoint()
+        return results
+    
+    def generate_therapist_chunk(self, therapist_ids):
+        """Generate one chunk of therapists, then drop the clients and paid sessions it kept in memory"""
+        all_therapist_ids = self.therapist_ids
+        self.therapist_ids = therapist_ids
         try:
+            self.generate_therapist_data()
+        finally:
+            self.therapist_ids = all_therapist_ids
+            self.client_ids = []
+            self.client_keys = {}
+            self.clients_by_user = {}
+            self.client_source_by_client = {}
+            self.paid_sessions = {}
+            self.schedules = {}
+    
+    def generate_therapist_data_parallel(self, chunks):
+        """Generate chunks in a process pool; every chunk runs on its own connection inside its id blocks.
+        
+        Every entity draws from its own seed-derived RNG, so the data does not depend on the
+        number of workers or on which worker a therapist lands on.
+        """
+        logger.info(f"Generating therapist data for {len(chunks)} chunks with {CONFIG['workers']} workers...")
+        results = []
+        pending = iter(chunks)
+        futures = {}    # at most two chunks per worker queued or running, however many chunks there are
+        # Each process takes a number to name its bulk-load part files with, however many chunks it generates
+        worker_numbers = multiprocessing.Queue()
+        for number in range(CONFIG['workers']):
+            worker_numbers.put(number)
+        with ProcessPoolExecutor(max_workers=CONFIG['workers'], initializer=_init_worker,
+                                 initargs=(worker_numbers,)) as pool:
+            while True:
+                for index, chunk in itertools.islice(pending, 2 * CONFIG['workers'] - len(futures)):
+                    user_index = {user_id: self.user_key(user_id) for user_id in chunk['therapists']}
+                    futures[pool.submit(_generate_shard, index, user_index, chunk['blocks'], dict(CONFIG))] = chunk
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results.append(future.result())
+                    futures.pop(future)['done'] = True
+                    self.save_checkpoint()
+        
+        if isinstance(self.writer, BulkFileWriter):
+            for result in sorted(results, key=lambda result: result['worker']):
+                self.writer.add_parts(result['files'])
+        return results
+    
+    def checkpoint_state(self, stages):
+        """Everything --resume needs, as JSON-serializable data"""
+        return {
+            'seed': self.seed,
+            'reference_now': self.now.isoformat(),
+            'config': {key: CONFIG[key] for key in RESUMED_CONFIG},
+            'stages': stages,
+            'users': {'user_index': self.user_index, 'admin_ids': self.admin_ids},
+            'ids': self.ids.snapshot(),
+            'first_ids': self.first_ids,
+            'dropped_indexes': self.dropped_indexes,
+            'chunks': [
+                {'therapists': chunk['therapists'],
+                 'blocks': {table: [block.start, block.stop] for table, block in (chunk['blocks'] or {}).items()},
+                 'done': chunk['done']}
+                for chunk in self.chunks
+            ]
+        }
+    
+    def save_checkpoint(self, stage=None):
+        """Commit pending rows and record progress, optionally marking a stage as done"""
+        if not self.checkpoint:
+            return
+        self.writer.flush()
+        stages = self.checkpoint.state.get('stages', []) + ([stage] if stage else [])
+        self.checkpoint.save(self.checkpoint_state(stages))
+    
+    def restore_checkpoint(self):
+        """Continue from the loaded checkpoint: users, chunks and ids, minus rows written after the save"""
+        state = self.checkpoint.state
+        admin_ids = set(state['users']['admin_ids'])
+        self.user_index = {int(user_id): index for user_id, index in state['users']['user_index'].items()}
+        self.user_ids = sorted(self.user_index)
+        self.admin_ids = [user_id for user_id in self.user_ids if user_id in admin_ids]
+        self.therapist_ids = [user_id for user_id in self.user_ids if user_id not in admin_ids]
+        self.chunks = [
+            {'therapists': chunk['therapists'],
+             'blocks': {table: range(*block) for table, block in chunk['blocks'].items()} or None,
+             'done': chunk['done']}
+            for chunk in state['chunks']
+        ]
+        self.ids.restore(state['ids'])
+        self.first_ids = state.get('first_ids', {})
+        # Indexes the interrupted --fast-load run dropped; those it already rebuilt (or never got to drop) exist
+        existing = {(table, name) for table, name, _ in self.sink.secondary_indexes(self.cursor, TABLE_LOAD_ORDER)}
+        for table, indexes in state.get('dropped_indexes', {}).items():
+            missing = [(name, columns) for name, columns in indexes if (table, name) not in existing]
+            if missing:
+                self.dropped_indexes[table] = missing
+        self.discard_rows_after_checkpoint()
+        
+        done = sum(chunk['done'] for chunk in self.chunks)
+        logger.info(f"Resuming from {self.checkpoint.path}: stages done {state['stages'] or 'none'}, "
+                    f"{done}/{len(self.chunks)} therapist chunks done")
+    
+    def discard_rows_after_checkpoint(self):
+        """Delete partial rows: ids past the saved allocator state and the id blocks of unfinished chunks"""
+        placeholder = self.sink.placeholder
+        for table in reversed(TABLE_LOAD_ORDER):
+            conditions = []
+            params = []
+            if table in self.ids.next_ids:
+                conditions.append(f"id >= {placeholder}")
+                params.append(self.ids.next_ids[table])
+            for chunk in self.chunks:
+                if not chunk['done'] and table in (chunk['blocks'] or {}):
+                    conditions.append(f"id BETWEEN {placeholder} AND {placeholder}")
+                    params.extend([chunk['blocks'][table].start, chunk['blocks'][table].stop - 1])
+            if conditions:
+                self.cursor.execute(f"DELETE FROM {table} WHERE " + ' OR '.join(conditions), params)
+                if self.cursor.rowcount > 0:
+                    logger.info(f"Deleted {self.cursor.rowcount} partial rows from {table}")
+        self.connection.commit()
+    
+    def run(self, checkpoint=None):
+        """Run the complete data generation process, checkpointing progress when a checkpoint is given"""
+        self.checkpoint = checkpoint
+        try:
+            started = time.time()
             self.connect()
             self.get_existing_data()
             
+            if checkpoint and checkpoint.state:
+                self.restore_checkpoint()
+            else:
+                # Read every table's MAX(id) now so the first checkpoint marks where this run's rows start
+                for table in TABLE_LOAD_ORDER:
+                    self.ids.reserve(table, 0)
+                self.first_ids = self.ids.snapshot()
+                self.save_checkpoint()
+            
+            if CONFIG['output_dir']:
+                self.writer.checks = self.load_checks()
+            if CONFIG['fast_load']:
+                self.drop_secondary_indexes()
+            
             logger.info("Starting test data generation...")
+            logger.info(f"Seed {self.seed}, reference now {self.now} "
+                        f"(pass --seed {self.seed} --reference-now {self.now.isoformat()} to reproduce)")
             
-            self.generate_users()
-            self.generate_clients()
-            self.generate_meetings()
-            self.generate_personal_meetings()
-            self.generate_expenses()
-            self.generate_calendar_integrations()
+            if not (checkpoint and checkpoint.done('users')):
+                with self.stage('users'):
+                    self.generate_users()
+                self.chunks = self.plan_chunks()
+                self.save_checkpoint('users')
+            # Reference rows are created once here so chunks and workers never race on them
+            self.ensure_expense_categories()
+            worker_results = self.generate_therapist_chunks()
+            if not (checkpoint and checkpoint.done('calendar_integrations')):
+                with self.stage('calendar_integrations'):
+                    self.generate_calendar_integrations()
+                self.save_checkpoint('calendar_integrations')
+            if self.dropped_indexes:
+                with self.stage('rebuild_indexes'):
+                    self.rebuild_secondary_indexes()
+            # The checks were off during the load whether or not there were indexes to drop
+            if CONFIG['fast_load'] and not CONFIG['output_dir']:
+                with self.stage('check_foreign_keys'):
+                    self.check_foreign_keys()
             
             logger.info("Test data generation completed successfully!")
+            log_generation_report(worker_results, self.writer, self.metrics, time.time() - started)
+            if checkpoint:
+                checkpoint.remove()
             
         except Exception as e:
             logger.error(f"Error during data generation: {e}")
+            if checkpoint and checkpoint.exists():
+                logger.error(f"Progress was saved to {checkpoint.path}; rerun with --resume to continue")
+            if self.dropped_indexes:
+                self.restore_secondary_indexes()
             raise
         finally:
             self.disconnect()
+    
+    def drop_secondary_indexes(self):
+        """--fast-load: drop the generated tables' secondary indexes so inserts do not maintain them.
+        
+        With bulk-load files nothing is dropped now; load_data.sql drops and rebuilds them around the loads
+        (when the indexes were read from MySQL, the database the script is written for).
+        """
+        indexes = {}    # table -> [(name, columns)]
+        if not (CONFIG['output_dir'] and self.sink.name != 'mysql'):
+            for table, name, columns in self.sink.secondary_indexes(self.cursor, TABLE_LOAD_ORDER):
+                indexes.setdefault(table, []).append((name, columns))
+        drops = [sql for table, table_indexes in indexes.items()
+                 for sql in self.sink.drop_index_statements(table, table_indexes)]
+        if CONFIG['output_dir']:
+            self.writer.before_load = drops
+            self.writer.after_load = [sql for table, table_indexes in indexes.items()
+                                      for sql in self.sink.create_index_statements(table, table_indexes)]
+            logger.info(f"Fast load: load_data.sql drops and rebuilds {sum(map(len, indexes.values()))} "
+                        f"secondary indexes and turns foreign key checks off")
+            return
+        
+        for table, table_indexes in indexes.items():
+            self.dropped_indexes.setdefault(table, []).extend(table_indexes)
+        # Checkpointed before the drops, so --resume rebuilds them even when this run is killed
+        self.save_checkpoint()
+        for sql in drops:
+            self.cursor.execute(sql)
+        self.connection.commit()
+        logger.info(f"Fast load: dropped {sum(map(len, indexes.values()))} secondary indexes on {len(indexes)} tables, "
+                    f"foreign key checks off")
+        resumed = sum(map(len, self.dropped_indexes.values())) - sum(map(len, indexes.values()))
+        if resumed:
+            logger.info(f"Fast load: {resumed} more secondary indexes are still dropped by the interrupted run")
+    
+    def rebuild_secondary_indexes(self):
+        """Recreate the indexes drop_secondary_indexes dropped, timing every table"""
+        logger.info("Rebuilding secondary indexes...")
+        for table, indexes in list(self.dropped_indexes.items()):
+            started = time.perf_counter()
+            for sql in self.sink.create_index_statements(table, indexes):
+                self.cursor.execute(sql)
+            self.connection.commit()
+            del self.dropped_indexes[table]
+            logger.info(f"  {table}: {', '.join(name for name, _ in indexes)} in {time.perf_counter() - started:.1f}s")
+    
+    def restore_secondary_indexes(self):
+        """Rebuild the dropped indexes after a failed run, or log the statements that would"""
+        try:
+            self.rebuild_secondary_indexes()
+        except self.sink.errors as err:
+            logger.error(f"Could not rebuild the dropped indexes ({err}); recreate them with:")
+            for table, indexes in self.dropped_indexes.items():
+                for sql in self.sink.create_index_statements(table, indexes):
+                    logger.error(f"  {sql};")
+    
+    def check_foreign_keys(self):
+        """Count the rows whose foreign key matches no row, for every foreign key of the generated tables"""
+        keys = self.sink.foreign_keys(self.cursor, TABLE_LOAD_ORDER)
+        orphans = 0
+        for table, column, parent, parent_column in keys:
+            self.cursor.execute(orphaned_rows_query(table, column, parent, parent_column))
+            count = self.cursor.fetchone()[0]
+            if count:
+                logger.error(f"  {table}.{column}: {count} rows reference no {parent} row")
+                orphans += count
+        logger.info(f"Checked {len(keys)} foreign keys: {orphans or 'no'} orphaned rows")
+        return orphans
+    
+    def load_checks(self):
+        """Queries for the end of load_data.sql, listing repeated UNIQUE values and rows with a dangling foreign key"""
+        checks = [f"SELECT '{table}.{column}' AS duplicated, {column}, COUNT(*) AS copies FROM {table} "
+                  f"GROUP BY {column} HAVING COUNT(*) > 1"
+                  for table, columns in UNIQUE_COLUMNS.items() for column in columns]
+        checks += [f"SELECT '{table}.{column}' AS orphaned, ({orphaned_rows_query(table, column, parent, parent_column)}) "
+                   f"AS orphaned_rows FROM DUAL HAVING orphaned_rows > 0"
+                   for table, column, parent, parent_column in self.sink.foreign_keys(self.cursor, TABLE_LOAD_ORDER)]
+        return checks
+    
+    def reset(self):
+        """Delete every generated row, keeping the reference tables and the users the schema seeds"""
+        try:
+            self.connect()
+            self.reset_tables()
+        finally:
+            self.disconnect()
+    
+    def reset_tables(self):
+        """Empty the generated tables, children first"""
+        self.connection.commit()
+        self.cursor.execute(self.sink.foreign_key_checks_statement(False))
+        for table in reversed(TABLE_LOAD_ORDER):
+            if table == 'users':
+                # Generated users reference each other (approved_by), hence the checks being off
+                self.cursor.execute(f"DELETE FROM users WHERE username NOT IN "
+                                    f"({', '.join([self.sink.placeholder] * len(SEEDED_USERNAMES))})", SEEDED_USERNAMES)
+            else:
+                self.cursor.execute(self.sink.truncate_statement(table))
+        self.connection.commit()
+        self.cursor.execute(self.sink.foreign_key_checks_statement(not CONFIG['fast_load']))
+        logger.info(f"Reset {', '.join(TABLE_LOAD_ORDER)}; kept the reference tables and the seeded users "
+                    f"({', '.join(SEEDED_USERNAMES)})")
+    
+    def save_snapshot(self, first_ids=None):
+        """Dump the generated tables to gzipped per-table files under the run's seed and scale factor.
+        
+        With the run's first_ids only its own rows are dumped, leaving out whatever the database held before.
+        The expense categories are dumped whole, since the expenses reference them by id.
+        """
+        path = snapshot_path()
+        partial_path = f"{path}.partial"
+        try:
+            started = time.time()
+            self.connect()
+            shutil.rmtree(partial_path, ignore_errors=True)
+            os.makedirs(partial_path)
+            manifest = {'seed': self.seed, 'scale_factor': CONFIG['scale_factor'],
+                        'reference_now': self.now.isoformat(), 'config': {key: CONFIG[key] for key in RESUMED_CONFIG},
+                        'created_at': datetime.datetime.now().isoformat(timespec='seconds'), 'tables': {}}
+            cursor = self.sink.cursor()
+            left_out = 0
+            for table in ['expense_categories'] + TABLE_LOAD_ORDER:
+                conditions = ["1 = 1"]
+                params = []
+                if table == 'users':
+                    conditions.append(f"username NOT IN ({', '.join([self.sink.placeholder] * len(SEEDED_USERNAMES))})")
+                    params.extend(SEEDED_USERNAMES)
+                if (first_ids or {}).get(table):
+                    cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {' AND '.join(conditions)} "
+                                   f"AND id < {self.sink.placeholder}", [*params, first_ids[table]])
+                    left_out += cursor.fetchone()[0]
+                    conditions.append(f"id >= {self.sink.placeholder}")
+                    params.append(first_ids[table])
+                cursor.execute(f"SELECT * FROM {table} WHERE {' AND '.join(conditions)} ORDER BY id", params)
+                columns = [description[0] for description in cursor.description]
+                rows = 0
+                with gzip.open(os.path.join(partial_path, f"{table}.tsv.gz"), 'wt', encoding='utf-8', newline='\n') as dump:
+                    for batch in iter(lambda: cursor.fetchmany(CONFIG['batch_size']), []):
+                        dump.writelines('\t'.join(map(BulkFileWriter._format, row)) + '\n' for row in batch)
+                        rows += len(batch)
+                manifest['tables'][table] = {'columns': columns, 'rows': rows}
+            cursor.close()
+            with open(os.path.join(partial_path, 'manifest.json'), 'w', encoding='utf-8') as handle:
+                json.dump(manifest, handle, indent=2)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(partial_path, path)
+            
+            size = sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+            logger.info(f"Snapshot of {sum(table['rows'] for table in manifest['tables'].values())} rows written to "
+                        f"{path} ({size / 2 ** 20:.1f} MB) in {time.time() - started:.1f}s")
+            if left_out:
+                logger.info(f"Left {left_out} rows of earlier runs out of the snapshot")
+        finally:
+            self.disconnect()
+    
+    def restore_snapshot(self, reference_now=None):
+        """Replace the generated tables with the snapshot of this seed and scale factor.
+        
+        The snapshot must have been generated with this run's SNAPSHOT_CONFIG and, when given, reference_now.
+        """
+        path = snapshot_path()
+        manifest_path = os.path.join(path, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            raise RuntimeError(f"No snapshot for seed {self.seed} and scale factor {CONFIG['scale_factor']:g} in "
+                               f"{CONFIG['snapshot_dir']}; generate one with --snapshot")
+        with open(manifest_path, encoding='utf-8') as handle:
+            manifest = json.load(handle)
+        # Compared as they went through the manifest's JSON (profile weekdays become strings)
+        mismatches = [f"{key} {manifest['config'].get(key)!r} instead of {CONFIG[key]!r}" for key in SNAPSHOT_CONFIG
+                      if manifest['config'].get(key) != json.loads(json.dumps(CONFIG[key]))]
+        if reference_now and manifest['reference_now'] != reference_now.isoformat():
+            mismatches.append(f"reference now {manifest['reference_now']} instead of {reference_now.isoformat()}")
+        if mismatches:
+            raise RuntimeError(f"The snapshot in {path} was generated with {', '.join(mismatches)}; take a new "
+                               f"one with --snapshot")
+        
+        if 'expense_categories' not in manifest['tables']:
+            raise RuntimeError(f"The snapshot in {path} has no expense categories; take a new one with --snapshot")
+        
+        # MySQL loads the dumps with LOAD DATA LOCAL INFILE, from decompressed copies in a scratch directory
+        unpacked = tempfile.TemporaryDirectory(prefix='restore_', dir=CONFIG['snapshot_dir'])
+        try:
+            started = time.time()
+            self.connect(local_infile_dir=unpacked.name)
+            logger.info(f"Restoring {path} (reference now {manifest['reference_now']}, taken {manifest['created_at']})")
+            categories = self.snapshot_expense_categories(path, manifest)
+            self.reset_tables()
+            self.restore_expense_categories(categories, manifest['tables']['expense_categories']['columns'])
+            if CONFIG['fast_load']:
+                self.drop_secondary_indexes()
+            # Rows go back as they were dumped, so the order within a table needs no checks
+            self.cursor.execute(self.sink.foreign_key_checks_statement(False))
+            for table in TABLE_LOAD_ORDER:
+                with self.stage(table):
+                    write_started = time.perf_counter()
+                    rows = self.sink.load_dump(self.cursor, table, manifest['tables'][table]['columns'],
+                                               os.path.join(path, f"{table}.tsv.gz"))
+                    self.connection.commit()
+                    # The report and the stage metrics read the writer's counters
+                    self.writer.write_seconds += time.perf_counter() - write_started
+                    self.writer.inserted[table] = self.writer.inserted.get(table, 0) + rows
+                if rows != manifest['tables'][table]['rows']:
+                    raise RuntimeError(f"Loaded {rows} of the {manifest['tables'][table]['rows']} {table} rows "
+                                       f"in {path}")
+            self.cursor.execute(self.sink.foreign_key_checks_statement(not CONFIG['fast_load']))
+            if self.dropped_indexes:
+                with self.stage('rebuild_indexes'):
+                    self.rebuild_secondary_indexes()
+            with self.stage('check_foreign_keys'):
+                self.check_foreign_keys()
+            
+            logger.info("Snapshot restored successfully!")
+            log_generation_report([], self.writer, self.metrics, time.time() - started)
+        
+        except Exception as e:
+            logger.error(f"Error during snapshot restore: {e}")
+            if self.dropped_indexes:
+                self.restore_secondary_indexes()
+            raise
+        finally:
+            self.disconnect()
+            unpacked.cleanup()
+    
+    def snapshot_expense_categories(self, path, manifest):
+        """The snapshot's expense categories the database lacks; refuses when an id or name is taken by another one"""
+        columns = manifest['tables']['expense_categories']['columns']
+        with gzip.open(os.path.join(path, 'expense_categories.tsv.gz'), 'rt', encoding='utf-8', newline='\n') as dump:
+            rows = [parse_dump_line(line) for line in dump]
+        self.cursor.execute("SELECT id, name FROM expense_categories")
+        existing = {int(category_id): name for category_id, name in self.cursor.fetchall()}
+        # Names are UNIQUE under a case-insensitive collation
+        taken = {name.casefold(): category_id for category_id, name in existing.items()}
+        missing = []
+        conflicts = []
+        for row in rows:
+            category_id, name = int(row[columns.index('id')]), row[columns.index('name')]
+            if existing.get(category_id, name) != name or taken.get(name.casefold(), category_id) != category_id:
+                conflicts.append(f"{category_id} {name!r}")
+            elif category_id not in existing:
+                missing.append(row)
+        if conflicts:
+            raise RuntimeError(f"Expense categories {', '.join(conflicts)} of the snapshot in {path} have other ids in "
+                               f"this database; restore into the database it was taken from or into a new one")
+        return missing
+    
+    def restore_expense_categories(self, rows, columns):
+        """Insert the snapshot's missing expense categories with the ids its expenses reference"""
+        placeholders = ', '.join([self.sink.placeholder] * len(columns))
+        for row in rows:
+            self.cursor.execute(f"INSERT INTO expense_categories ({', '.join(columns)}) VALUES ({placeholders})", row)
+        self.connection.commit()
+        if rows:
+            logger.info(f"Restored {len(rows)} expense categories from the snapshot")
+    
+    def advance(self, days):
+        """Append `days` days of activity to the data already in the database.
+        
+        The reference time moves forward by `days`, and with it the 30-day scheduling horizon the full
+        generation stops at: SCHEDULED meetings that are now in the past are completed, every active
+        client's meetings continue at the client's cadence up to the new horizon, expenses continue
+        from each therapist's latest expense, and the new paid meetings get their payments.
+        """
+        try:
+            started = time.time()
+            self.connect()
+            self.get_existing_data()
+            self.ensure_expense_categories()
+            
+            # New meetings start after each active client's last one, at most 60 days before the old "now"
+            booked_since = self.now - datetime.timedelta(days=60)
+            self.now += datetime.timedelta(days=days)
+            logger.info(f"Advancing {days} days to {self.now} "
+                        f"(pass --reference-now {self.now.isoformat()} to the next --advance-days run)")
+            until = self.now + datetime.timedelta(days=30)
+            with self.stage('complete_past_meetings'):
+                self.complete_past_meetings()
+            
+            # Therapists advance chunk by chunk, so memory does not grow with the size of the database
+            self.cursor.execute("SELECT DISTINCT user_id FROM meetings ORDER BY user_id")
+            user_ids = [user_id for user_id, in self.cursor.fetchall()]
+            for start in range(0, len(user_ids), CONFIG['chunk_size']):
+                chunk = user_ids[start:start + CONFIG['chunk_size']]
+                if CONFIG['collision_rate'] is not None:
+                    self.load_schedules(booked_since, chunk)
+                with self.stage('meetings'):
+                    self.advance_meetings(until, chunk)
+                self.log_schedule_collisions()
+                with self.stage('payments'):
+                    self.generate_payments()
+                self.client_source_by_client = {}
+                self.paid_sessions = {}
+                self.schedules = {}
+            with self.stage('expenses'):
+                self.advance_expenses(until)
+            
+            logger.info("Time advance completed successfully!")
+            log_generation_report([], self.writer, self.metrics, time.time() - started)
+            
+        except Exception as e:
+            logger.error(f"Error during time advance: {e}")
+            raise
+        finally:
+            self.disconnect()
+    
+    def complete_past_meetings(self):
+        """Mark SCHEDULED (personal) meetings before the reference time as COMPLETED"""
+        for table in ('meetings', 'personal_meetings'):
+            self.cursor.execute(
+                f"UPDATE {table} SET status = 'COMPLETED' WHERE status = 'SCHEDULED' AND meeting_date < {self.sink.placeholder}",
+                [self.now]
+            )
+            logger.info(f"Completed {self.cursor.rowcount} past scheduled {table.replace('_', ' ')}")
+        self.connection.commit()
+    
+    def advance_meetings(self, until, user_ids):
+        """Continue the meetings of each active client of these therapists at its cadence up to `until`"""
+        logger.info("Appending meetings...")
+        meetings_before = self.writer.inserted_count('meetings')
+        
+        # One row per client: its span of meetings and on how many distinct days they fell
+        self.cursor.execute(
+            "SELECT m.user_id, m.client_id, c.source_id, MIN(m.meeting_date), MAX(m.meeting_date), "
+            "COUNT(DISTINCT DATE(m.meeting_date)) "
+            "FROM meetings m JOIN clients c ON c.id = m.client_id "
+            f"WHERE m.user_id IN ({', '.join([self.sink.placeholder] * len(user_ids))}) "
+            "GROUP BY m.user_id, m.client_id, c.source_id ORDER BY m.user_id, m.client_id",
+            user_ids
+        )
+        clients_by_user = {}    # user id -> [(client id, last meeting, cadence in days)]
+        for user_id, client_id, source_id, first, last, meeting_days in self.cursor.fetchall():
+            first, last = as_datetime(first), as_datetime(last)
+            average_interval = (last - first).days / max(1, meeting_days - 1)
+            cadence = min([7, 14, 21, 30 if not self.profile['weekday_hours'] else 28],
+                          key=lambda interval: abs(interval - average_interval))
+            clients_by_user.setdefault(user_id, []).append((client_id, last, cadence))
+            self.client_source_by_client[client_id] = source_id
+        
+        for user_id, clients in clients_by_user.items():
+            latest = max(last for _, last, _ in clients)
+            for client_id, last, cadence in clients:
+                # Clients that missed two sessions by their therapist's latest meeting have stopped coming
+                if last + datetime.timedelta(days=2 * cadence) < latest:
+                    continue
+                rng = self.rng_for('advance-meetings', client_id, last.isoformat())
+                meeting_date = last + datetime.timedelta(days=cadence)
+                while meeting_date <= until:
+                    if self._keeps_meeting(meeting_date, rng):
+                        hour = self._meeting_hour(meeting_date, rng)
+                        minute = rng.choice([0, 15, 30, 45])
+                        time_slot = datetime.datetime.combine(meeting_date.date(), datetime.time(hour, minute))
+                        self._create_meeting(user_id, client_id, time_slot, 1, MEETING_NOTES, MEETING_SUMMARIES, rng)
+                    meeting_date += datetime.timedelta(days=cadence)
+        
+        self.writer.flush('meetings')
+        meeting_count = self.writer.inserted_count('meetings') - meetings_before
+        logger.info(f"Appended {meeting_count} meetings")
+    
+    def advance_expenses(self, until):
+        """Continue each therapist's expenses from their latest expense up to `until`"""
+        logger.info("Appending expenses...")
+        expenses_before = self.writer.inserted_count('expenses')
+        
+        self.cursor.execute("SELECT user_id, MAX(expense_date) FROM expenses GROUP BY user_id")
+        for user_id, latest in self.cursor.fetchall():
+            latest = as_datetime(latest)
+            rng = self.rng_for('advance-expenses', user_id, latest.isoformat())
+            expense_date = latest + datetime.timedelta(days=rng.choice([1, 7, 14, 30, 30, 60, 90]))
+            while expense_date <= until:
+                self._create_expense(user_id, expense_date, rng)
+                expense_date += datetime.timedelta(days=rng.choice([1, 7, 14, 30, 30, 60, 90]))
+        
+        self.writer.flush('expenses')
+        expense_count = self.writer.inserted_count('expenses') - expenses_before
+        logger.info(f"Appended {expense_count} expenses")
+
+# Backslash escapes of the LOAD DATA text format, see BulkFileWriter._format
+DUMP_ESCAPES = {'t': '\t', 'n': '\n', 'r': '\r', '0': '\0'}
+
+# CONFIG entries that shape the dataset; --restore-snapshot refuses a snapshot generated with other values
+SNAPSHOT_CONFIG = [
+    'num_users', 'scale_factor', 'therapist_ratio', 'num_clients_per_user', 'num_meetings_per_client',
+    'num_personal_meetings_per_user', 'num_expenses_per_user', 'date_range_days', 'include_edge_cases',
+    'vectorized', 'distribution_profile', 'collision_rate'
+]
+
+# CONFIG entries a resumed run takes from its checkpoint, so it continues with the same dataset
+RESUMED_CONFIG = [
+    'num_users', 'scale_factor', 'therapist_ratio', 'num_clients_per_user', 'num_meetings_per_client',
+    'num_personal_meetings_per_user', 'num_expenses_per_user', 'date_range_days', 'include_edge_cases',
+    'vectorized', 'workers', 'chunk_size', 'sink', 'sqlite_path', 'distribution_profile', 'collision_rate',
+    'fast_load'
+]
+
+def snapshot_path():
+    """Directory of the snapshot for CONFIG's seed and scale factor"""
+    return os.path.join(CONFIG['snapshot_dir'], f"seed{CONFIG['seed']}_sf{CONFIG['scale_factor']:g}")
+
+def parse_dump_field(field):
+    """A value written by BulkFileWriter._format, as the text the database converts back to the column type"""
+    if '\\' not in field:
+        return field
+    if field == '\\N':
+        return None
+    return re.sub(r'\\(.)', lambda match: DUMP_ESCAPES.get(match.group(1), match.group(1)), field)
+
+def parse_dump_line(line):
+    """The fields of one dumped row; most lines have no escapes or NULLs and need no per-field parsing"""
+    fields = line[:-1].split('\t')
+    if '\\' not in line:
+        return fields
+    return [parse_dump_field(field) for field in fields]
+
+def as_datetime(value):
+    """A DATE/DATETIME column value as a datetime (SQLite returns ISO strings)"""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return value
+
+def orphaned_rows_query(table, column, parent, parent_column):
+    """SELECT counting the rows of table whose column matches no parent row"""
+    return (f"SELECT COUNT(*) FROM {table} child LEFT JOIN {parent} parent ON parent.{parent_column} = child.{column} "
+            f"WHERE child.{column} IS NOT NULL AND parent.{parent_column} IS NULL")
+
+def error_code(err):
+    """Database error code of a rejected row: the MySQL errno, the SQLite error name, or the exception type"""
+    return getattr(err, 'errno', None) or getattr(err, 'sqlite_errorname', None) or type(err).__name__
+
+def retry_transient(sink, connection, operation, description, retried=None, on_reconnect=None):
+    """Run operation() as one transaction, retrying it with exponential backoff after a transient error.
+    
+    Deadlocks, lock wait timeouts and lost connections (sink.retryable) roll the transaction back and
+    try again up to CONFIG['write_retries'] times, reconnecting first when the connection was lost.
+    Other errors and the last transient one are raised; retried counts the retries per error code.
+    on_reconnect() runs after a reconnect, before the retry.
+    """
+    attempts = max(CONFIG['write_retries'], 1)
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except sink.errors as err:
+            code = error_code(err)
+            if code not in sink.retryable or attempt == attempts:
+                raise
+            delay = CONFIG['retry_backoff'] * 2 ** (attempt - 1) * random.SystemRandom().uniform(0.5, 1.5)
+            logger.warning(f"{description} failed ({err}); retry {attempt}/{attempts - 1} in {delay:.1f}s")
+            if retried is not None:
+                retried[code] = retried.get(code, 0) + 1
+            if code in sink.lost_connection:
+                # The server rolled the open transaction back with the connection, unless the error hid
+                # a commit that went through; on_reconnect lets the retry find out which
+                time.sleep(delay)
+                sink.reconnect(connection)
+                if on_reconnect:
+                    on_reconnect()
+            else:
+                # A lock wait timeout only undoes the statement; release the batch's other locks before waiting
+                with contextlib.suppress(*sink.errors):
+                    connection.rollback()
+                time.sleep(delay)
+
+def create_sink(pool_size=None, local_infile_dir=None):
+    """Sink selected by CONFIG['sink']; pool_size overrides CONFIG['pool_size'] for MySQL, which may read
+    files for LOAD DATA LOCAL INFILE from local_infile_dir"""
+    if CONFIG['sink'] == 'sqlite':
+        return SQLiteSink(CONFIG['sqlite_path'])
+    return MySQLSink(pool_size=pool_size, local_infile_dir=local_infile_dir)
+
+def distribution_profile():
+    """The distribution profile selected by CONFIG['distribution_profile']"""
+    profile = CONFIG['distribution_profile']
+    if isinstance(profile, str):
+        return DISTRIBUTION_PROFILES[profile]
+    profile = dict(DISTRIBUTION_PROFILES['uniform'], **profile)
+    if profile['weekday_hours']:
+        # Weekdays become strings when a profile goes through the checkpoint's JSON
+        profile['weekday_hours'] = {int(weekday): weights for weekday, weights in profile['weekday_hours'].items()}
+    return profile
+
+def therapist_id_capacity():
+    """Most rows one therapist can produce per table, used to size the id blocks of workers"""
+    client_counts = distribution_profile()['client_counts']
+    max_clients = max(CONFIG['num_clients_per_user'], client_counts['max'] if client_counts else 0)
+    return {
+        'clients': max_clients,
+        'meetings': max_clients * CONFIG['num_meetings_per_client'] * 3,  # up to 3 a day
+        'personal_meetings': CONFIG['num_personal_meetings_per_user'],
+        'expenses': CONFIG['num_expenses_per_user'],
+        # Up to 3 installments per paid (personal) meeting
+        'payments': (max_clients * CONFIG['num_meetings_per_client'] * 3
+                     + CONFIG['num_personal_meetings_per_user']) * 3,
+    }
+
+def mean_client_count():
+    """Mean number of clients per therapist under the distribution profile, for the run's printed estimates"""
+    client_counts = distribution_profile()['client_counts']
+    if not client_counts:
+        return (15 + CONFIG['num_clients_per_user']) / 2
+    # min(max, min * Pareto(exponent - 1)): min plus the Pareto tail integrated up to max
+    alpha = client_counts['exponent'] - 1
+    low, high = client_counts['min'], client_counts['max']
+    if alpha == 1:
+        return low + low * math.log(high / low)
+    return low + low ** alpha * (high ** (1 - alpha) - low ** (1 - alpha)) / (1 - alpha)
+
+def next_session_date(date, recurrence_frequency):
+    """Date of the next session of a series, as MeetingService.calculateNextDate computes it"""
+    if recurrence_frequency == 'WEEKLY':
+        return date + datetime.timedelta(weeks=1)
+    if recurrence_frequency == 'BIWEEKLY':
+        return date + datetime.timedelta(weeks=2)
+    year, month = (date.year + 1, 1) if date.month == 12 else (date.year, date.month + 1)
+    return date.replace(year=year, month=month, day=min(date.day, calendar.monthrange(year, month)[1]))
+
+def split_installments(price, count, first_share):
+    """Split a price into count installments rounded to 10, the last one taking the remainder"""
+    first = round(price * first_share / 10) * 10
+    amounts = [first] + [round((price - first) / (count - 1) / 10) * 10] * (count - 2)
+    return [float(amount) for amount in amounts] + [round(price - sum(amounts), 2)]
+
+def scaled_user_counts():
+    """(therapists, admins) for the configured scale factor and therapist ratio"""
+    num_users = max(1, round(CONFIG['num_users'] * CONFIG['scale_factor']))
+    num_therapists = round(num_users * CONFIG['therapist_ratio'])
+    return num_therapists, num_users - num_therapists
+
+def _shard_result(worker, user_ids, writer, rows_before, started, write_before=0.0, metrics=None):
+    """Row counts and timing for one chunk of therapists; worker processes also pass their stage metrics"""
+    return {
+        'worker': worker,
+        'pid': os.getpid(),
+        'therapists': len(user_ids),
+        'rows': {table: count - rows_before.get(table, 0) for table, count in writer.inserted.items()
+                 if count - rows_before.get(table, 0)},
+        'failed': dict(writer.failed),
+        'failed_by_code': dict(writer.failed_by_code),
+        'retried_by_code': dict(writer.retried_by_code),
+        'files': getattr(writer, 'parts', {}),
+        'elapsed': time.time() - started,
+        'write_seconds': writer.write_seconds - write_before,
+        'stages': metrics.stages if metrics else {},
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+_worker_number = None  # set in worker processes by _init_worker
+
+def _init_worker(worker_numbers):
+    """Process-pool initializer: take the number the process's bulk-load part files are named after"""
+    global _worker_number
+    _worker_number = worker_numbers.get()
+
+def _generate_shard(worker, user_index, id_blocks, config):
+    """Process-pool entry point: generate clients, meetings, personal meetings, expenses and payments for a chunk"""
+    CONFIG.update(config)
+    started = time.time()
+    user_ids = list(user_index)
+    generator = TestDataGenerator(id_blocks=id_blocks, file_suffix=f"worker{_worker_number}")
+    try:
+        generator.connect()
+        generator.get_existing_data()
+        generator.user_ids = user_ids
+        generator.therapist_ids = list(user_ids)
+        generator.user_index = dict(user_index)
+        generator.generate_therapist_data()
+        return _shard_result(worker, user_ids, generator.writer, {}, started, metrics=generator.metrics)
+    finally:
+        generator.disconnect()
+
+def percentile(sorted_values, share):
+    """Nearest-rank percentile of an ascending list, e.g. share=0.95 for p95"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(share * len(sorted_values)) - 1))]
+
+def run_query_load(seconds):
+    """Replay the repository queries against the existing data for `seconds` and report their latencies"""
+    # One pooled connection per thread, plus the one parameters are read on
+    sink = create_sink(pool_size=CONFIG['query_concurrency'] + 1)
+    load = QueryLoad(CONFIG['query_concurrency'], seconds)
+    try:
+        sink.connect()
+        load.load_parameters(sink)
+        logger.info(f"Replaying {len(MEETING_QUERIES)} query shapes on {sink.describe()} with "
+                    f"{CONFIG['query_concurrency']} threads for {seconds:g}s (seed {CONFIG['seed']})")
+        started = time.perf_counter()
+        latencies = load.run(sink)
+    finally:
+        sink.close()
+    log_latency_report("Query load report", 'query', latencies, time.perf_counter() - started,
+                       {'concurrency': CONFIG['query_concurrency']})
+
+def run_http_load(seconds, stub=False):
+    """Drive the REST API as the generated therapists for `seconds` and report latencies per endpoint"""
+    sink = create_sink()
+    try:
+        sink.connect()
+        users = load_http_users(sink)
+    finally:
+        sink.close()
+    if not users:
+        raise RuntimeError("No enabled, approved therapists to sign in as; generate data first")
+    asyncio.run(_http_load(users, seconds, stub))
+
+async def _http_load(users, seconds, stub):
+    server = None
+    stub_connections = set()    # handler tasks, which end when the pool closes its connections
+    base_url = CONFIG['api_base_url']
+    if stub:
+        async def serve(reader, writer):
+            stub_connections.add(asyncio.current_task())
+            await _serve_stub_api(reader, writer)
+        server = await asyncio.start_server(serve, '127.0.0.1', 0)
+        base_url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    logger.info(f"Driving {base_url} with {CONFIG['http_users']} concurrent users ({len(users)} distinct therapists) "
+                f"over {CONFIG['http_pool_size']} connections for {seconds:g}s" + (" (stub server)" if stub else ""))
+    
+    pool = HttpConnectionPool(base_url, CONFIG['http_pool_size'])
+    load = HttpLoad(pool, users, seconds)
+    started = time.perf_counter()
+    try:
+        latencies = await load.run(CONFIG['http_users'])
+    finally:
+        await pool.close()
+        if server:
+            server.close()
+            await asyncio.gather(*stub_connections)
+            await server.wait_closed()
+    elapsed = time.perf_counter() - started
+    
+    failures = {f"{endpoint} {error}": count for (endpoint, error), count in sorted(load.failures.items(), key=str)}
+    log_latency_report("HTTP load report", 'endpoint', latencies, elapsed,
+                       {'base_url': base_url, 'users': CONFIG['http_users'], 'connections_opened': pool.opened,
+                        'logins': len(load.tokens), 'failures': failures})
+    logger.info(f"  {len([token for token in load.tokens.values() if token])}/{len(load.tokens)} sign-ins succeeded, "
+                f"{pool.opened} connections opened")
+    for failure, count in failures.items():
+        logger.info(f"  failed: {failure}: {count}")
+
+def load_http_users(sink):
+    """(username, client name prefixes) of the therapists that can sign in, in a seed-stable order"""
+    cursor = sink.cursor(buffered=True)
+    cursor.execute("SELECT u.id, u.username, c.full_name FROM users u LEFT JOIN clients c ON c.user_id = u.id "
+                   "WHERE u.role = 'USER' AND u.enabled = 1 AND u.approval_status = 'APPROVED'")
+    users = {}
+    for user_id, username, client_name in cursor.fetchall():
+        if not (username or '').strip():
+            continue
+        names = users.setdefault(user_id, (username, []))[1]
+        if client_name and client_name.strip():
+            names.append(client_name.strip()[:3])
+    cursor.close()
+    users = [users[user_id] for user_id in sorted(users)]
+    random.Random(f"{CONFIG['seed']}:http-users").shuffle(users)
+    return users
+
+async def _serve_stub_api(reader, writer):
+    """Minimal stand-in for the backend: JWTs for any sign-in, empty JSON for authorized GETs"""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path = request_line.decode('latin-1').split()[:2]
+            headers = await HttpConnectionPool._read_headers(reader)
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            
+            if method == 'POST' and path == '/api/auth/signin':
+                username = json.loads(body)['username']
+                status, payload = 200, {'token': f"stub-{username}", 'type': 'Bearer', 'username': username}
+            elif not headers.get('authorization', '').startswith('Bearer '):
+                status, payload = 401, {'message': 'Unauthorized'}
+            elif any(part in path for part in ('stats', 'summary', 'revenue')):
+                status, payload = 200, {}
+            else:
+                status, payload = 200, []
+            data = json.dumps(payload).encode('utf-8')
+            # Chunked like the backend's JSON responses
+            writer.write(f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n"
+                         f"Transfer-Encoding: chunked\r\n\r\n{len(data):x}\r\n".encode('latin-1')
+                         + data + b"\r\n0\r\n\r\n")
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+def log_latency_report(title, kind, latencies, elapsed, details=None):
+    """Log count, rate and latency percentiles per query or endpoint; write them as JSON if configured"""
+    shapes = dict(latencies, total=[value for values in latencies.values() for value in values])
+    report = {}
+    for name, values in shapes.items():
+        values = sorted(values)
+        report[name] = {'count': len(values), 'qps': len(values) / elapsed if elapsed else 0,
+                         **{f"p{share * 100:g}_ms": percentile(values, share) * 1000 for share in (0.5, 0.95, 0.99)},
+                         'max_ms': values[-1] * 1000 if values else 0.0}
+    
+    logger.info(f"{title}:")
+    logger.info(f"  {kind:<40}{'count':>8}{'qps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, row in report.items():
+        logger.info(f"  {name:<40}{row['count']:>8}{row['qps']:>9,.0f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                    f"{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}")
+    
+    if CONFIG['metrics_json']:
+        with open(CONFIG['metrics_json'], 'w', encoding='utf-8') as handle:
+            json.dump({'seed': CONFIG['seed'], 'elapsed': elapsed, **(details or {}), 'latencies': report},
+                      handle, indent=2)
+        logger.info(f"  metrics written to {CONFIG['metrics_json']}")
+
+def peak_rss_mb(children=False):
+    """Peak resident set size of this process (or of its largest finished child) in MB, None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)   # bytes on macOS, KB elsewhere
+
+def log_generation_report(worker_results, main_writer, metrics, elapsed):
+    """Log per-worker throughput, a per-stage table and total row counts; write it as JSON if configured"""
+    totals = dict(main_writer.inserted)
+    failed_by_code = dict(main_writer.failed_by_code)
+    retried_by_code = dict(main_writer.retried_by_code)
+    round_trips = main_writer.round_trips
+    workers = {}    # pid -> chunk results summed up
+    for result in worker_results:
+        worker = workers.setdefault(result['pid'], {'chunks': 0, 'therapists': 0, 'rows': 0,
+                                                    'elapsed': 0.0, 'write_seconds': 0.0, 'peak_rss_mb': None})
+        worker['chunks'] += 1
+        worker['therapists'] += result['therapists']
+        worker['rows'] += sum(result['rows'].values())
+        worker['elapsed'] += result['elapsed']
+        worker['write_seconds'] += result['write_seconds']
+        worker['peak_rss_mb'] = result['peak_rss_mb']
+        metrics.merge(result['stages'])
+        # Rows written in this process are already counted by the main writer
+        if result['pid'] != os.getpid():
+            for table, count in result['rows'].items():
+                totals[table] = totals.get(table, 0) + count
+            for code, count in result['failed_by_code'].items():
+                failed_by_code[code] = failed_by_code.get(code, 0) + count
+            for code, count in result['retried_by_code'].items():
+                retried_by_code[code] = retried_by_code.get(code, 0) + count
+            round_trips += sum(stage['round_trips'] for stage in result['stages'].values())
+    
+    logger.info("Generation report:")
+    for number, worker in enumerate(workers.values()):
+        rate = worker['rows'] / worker['elapsed'] if worker['elapsed'] else 0
+        logger.info(f"  worker {number}: {worker['chunks']} chunks, {worker['therapists']} therapists, "
+                    f"{worker['rows']} rows in {worker['elapsed']:.1f}s ({rate:,.0f} rows/s; generating "
+                    f"{worker['elapsed'] - worker['write_seconds']:.1f}s, writing {worker['write_seconds']:.1f}s)")
+    
+    # Stage times of parallel chunks add up across workers, so they can exceed the wall clock
+    logger.info(f"  {'stage':<24}{'rows':>10}{'time':>9}{'rows/s':>10}{'generating':>12}{'writing':>9}"
+                f"{'round trips':>13}{'failed':>8}{'peak MB':>9}")
+    stage_order = lambda item: (TABLE_LOAD_ORDER.index(item[0]) if item[0] in TABLE_LOAD_ORDER else
+                                len(TABLE_LOAD_ORDER) + POST_LOAD_STAGES.index(item[0]) if item[0] in POST_LOAD_STAGES else -1)
+    for name, stage in sorted(metrics.stages.items(), key=stage_order):
+        rate = stage['rows'] / stage['seconds'] if stage['seconds'] else 0
+        logger.info(f"  {name:<24}{stage['rows']:>10}{stage['seconds']:>8.1f}s{rate:>10,.0f}"
+                    f"{stage['seconds'] - stage['write_seconds']:>11.1f}s{stage['write_seconds']:>8.1f}s"
+                    f"{stage['round_trips']:>13}{stage['failed']:>8}{stage['peak_rss_mb']:>9.0f}")
+    
+    for table, count in totals.items():
+        logger.info(f"  {table}: {count} rows")
+    total_rows = sum(totals.values())
+    logger.info(f"  total: {total_rows} rows in {elapsed:.1f}s ({total_rows / elapsed if elapsed else 0:,.0f} rows/s), "
+                f"{round_trips} database round trips")
+    # Workers write concurrently, so only this process' own write time is comparable to the wall clock
+    logger.info(f"  writes in this process: {main_writer.write_seconds:.1f}s, "
+                f"generation and coordination: {elapsed - main_writer.write_seconds:.1f}s")
+    pipeline = None
+    background = sum(stage['background_write_seconds'] for stage in metrics.stages.values())
+    if background:
+        # Written inline, the stages would have taken their generating time plus the writers' busy time. An upper
+        # bound: writes that compete with generation for the GIL (in-process SQLite) take longer in threads
+        stage_seconds = sum(stage['seconds'] for stage in metrics.stages.values())
+        waited = sum(stage['write_seconds'] for stage in metrics.stages.values())
+        serial = stage_seconds - waited + background
+        pipeline = {'writer_threads': CONFIG['writer_threads'], 'background_write_seconds': background,
+                    'waited_seconds': waited, 'stage_seconds': stage_seconds, 'estimated_serial_seconds': serial,
+                    'estimated_speedup': serial / stage_seconds if stage_seconds else 0}
+        logger.info(f"  {CONFIG['writer_threads']} writer threads: {background:.1f}s writing while the generator "
+                    f"waited {waited:.1f}s for them; stages took {stage_seconds:.1f}s")
+        logger.info(f"  estimated, not measured: {serial:.1f}s written inline, a speedup of at most "
+                    f"{pipeline['estimated_speedup']:.2f}x (compare with a run without --writer-threads)")
+    if failed_by_code:
+        logger.info("  failed inserts by error code: " +
+                    ', '.join(f"{code}: {count}" for code, count in sorted(failed_by_code.items(), key=str)))
+    if retried_by_code:
+        logger.info("  batches retried after transient errors: " +
+                    ', '.join(f"{code}: {count}" for code, count in sorted(retried_by_code.items(), key=str)))
+    
+    peak_rss = {'main': peak_rss_mb(), 'workers': peak_rss_mb(children=True) if CONFIG['workers'] > 1 else None}
+    if peak_rss['main'] is not None:
+        logger.info(f"  peak RSS: {peak_rss['main']:.0f} MB" +
+                    (f", largest worker {peak_rss['workers']:.0f} MB" if peak_rss['workers'] else ""))
+    
+    if CONFIG['metrics_json']:
+        report = {
+            'seed': CONFIG['seed'],
+            'reference_now': CONFIG['reference_now'].isoformat(),
+            'scale_factor': CONFIG['scale_factor'],
+            'workers': CONFIG['workers'],
+            'sink': 'files' if CONFIG['output_dir'] else CONFIG['sink'],
+            'elapsed': elapsed,
+            'rows': total_rows,
+            'rows_per_second': total_rows / elapsed if elapsed else 0,
+            'round_trips': round_trips,
+            'main_write_seconds': main_writer.write_seconds,
+            'pipeline': pipeline,
+            'stages': metrics.stages,
+            'tables': totals,
+            'failed_by_code': {str(code): count for code, count in failed_by_code.items()},
+            'retried_by_code': {str(code): count for code, count in retried_by_code.items()},
+            'peak_rss_mb': peak_rss,
+            'worker_processes': list(workers.values())
+        }
+        with open(CONFIG['metrics_json'], 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        logger.info(f"  metrics written to {CONFIG['metrics_json']}")
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Generate production-like test data for the clinic management system")
+    parser.add_argument('--scale-factor', type=float, default=CONFIG['scale_factor'],
+                        help=f"multiplies the {CONFIG['num_users']} base users; per-user volumes stay the same "
+                             "(default: %(default)s)")
+    parser.add_argument('--therapist-ratio', type=float, default=CONFIG['therapist_ratio'],
+                        help="share of users that are therapists, the rest are admins (default: %(default)s)")
+    parser.add_argument('--workers', type=int, default=CONFIG['workers'],
+                        help="number of processes generating per-therapist data in parallel (default: %(default)s)")
+    parser.add_argument('--sink', choices=['mysql', 'sqlite'], default=CONFIG['sink'],
+                        help="database to write to: the MySQL server in DB_CONFIG, or an embedded SQLite database "
+                             "created from the Flyway schema (default: %(default)s)")
+    parser.add_argument('--sqlite-path', default=CONFIG['sqlite_path'],
+                        help="SQLite database file for --sink sqlite; ':memory:' keeps it in memory "
+                             "(default: %(default)s)")
+    parser.add_argument('--output-dir',
+                        help="write per-table TSV files and a LOAD DATA LOCAL INFILE script here instead of inserting rows")
+    parser.add_argument('--vectorized', action='store_true',
+                        help="generate meeting schedules as NumPy arrays, much faster for large datasets; "
+                             "same distributions, different rows than the default path (needs numpy)")
+    parser.add_argument('--distribution-profile', choices=list(DISTRIBUTION_PROFILES),
+                        default=CONFIG['distribution_profile'] if isinstance(CONFIG['distribution_profile'], str) else None,
+                        help="how client counts, monthly volume and meeting times are distributed: 'production' "
+                             "adds Zipf-like client counts, seasonal volume and weekday/hour hotspots "
+                             "(default: %(default)s)")
+    parser.add_argument('--collision-rate', type=float, default=CONFIG['collision_rate'],
+                        help="check every meeting and personal meeting against its therapist's schedule, moving it "
+                             "to a free slot except for this share of deliberate double bookings (0 for none); "
+                             "without it, overlaps are not checked")
+    parser.add_argument('--fast-load', action='store_true',
+                        help="drop the secondary indexes and turn foreign key checks off while loading, "
+                             "then rebuild the indexes (timed separately) and check every foreign key for orphans")
+    parser.add_argument('--writer-threads', type=int, default=CONFIG['writer_threads'],
+                        help="threads per process writing full batches over pooled connections while the next rows "
+                             "are generated; 0 writes inline. Without --fast-load, a batch that continues recurring "
+                             "series waits for the batches with their first sessions (default: %(default)s)")
+    parser.add_argument('--pool-size', type=int, default=CONFIG['pool_size'],
+                        help="MySQL connections per process in the shared pool (default: %(default)s)")
+    parser.add_argument('--write-retries', type=int, default=CONFIG['write_retries'],
+                        help="attempts at a batch hit by a deadlock, lock wait timeout or lost connection, with "
+                             "exponential backoff between them (default: %(default)s)")
+    parser.add_argument('--chunk-size', type=int, default=CONFIG['chunk_size'],
+                        help="therapists per chunk; progress is checkpointed after every chunk (default: %(default)s)")
+    parser.add_argument('--checkpoint', default=CONFIG['checkpoint_file'],
+                        help="progress file written after every stage and chunk, removed when the run completes "
+                             "(default: %(default)s)")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue the run recorded in the checkpoint file with its seed and settings, "
+                             "deleting the rows of the chunk that was interrupted")
+    parser.add_argument('--advance-days', type=int,
+                        help="instead of generating a history, move --reference-now (required) forward this many "
+                             "days: append the activity of those days to the existing data and complete the meetings "
+                             "now past")
+    parser.add_argument('--reset', action='store_true',
+                        help="instead of generating data, delete every generated row (children first), keeping the "
+                             "reference tables and the seeded admin user")
+    parser.add_argument('--snapshot', action='store_true',
+                        help="after generating, dump the generated tables to compressed per-table files in the "
+                             "snapshot directory, keyed by seed and scale factor")
+    parser.add_argument('--restore-snapshot', action='store_true',
+                        help="instead of generating data, reset the database and load the snapshot taken with the "
+                             "same --seed and --scale-factor")
+    parser.add_argument('--snapshot-dir', default=CONFIG['snapshot_dir'],
+                        help="directory snapshots are written to and restored from (default: %(default)s)")
+    parser.add_argument('--query-load', type=float, metavar='SECONDS',
+                        help="instead of generating data, replay MeetingRepository's queries against the existing "
+                             "data for this many seconds and report QPS and latency percentiles per query")
+    parser.add_argument('--concurrency', type=int, default=CONFIG['query_concurrency'],
+                        help="threads replaying queries with --query-load, one connection each (default: %(default)s)")
+    parser.add_argument('--http-load', type=float, metavar='SECONDS',
+                        help="instead of generating data, sign in as generated therapists and call the REST API "
+                             "for this many seconds, reporting p50/p95/p99 latency per endpoint")
+    parser.add_argument('--base-url', default=CONFIG['api_base_url'],
+                        help="backend --http-load talks to (default: %(default)s)")
+    parser.add_argument('--http-users', type=int, default=CONFIG['http_users'],
+                        help="concurrent therapists with --http-load (default: %(default)s)")
+    parser.add_argument('--http-connections', type=int, default=CONFIG['http_pool_size'],
+                        help="keep-alive connections shared by the --http-load users (default: %(default)s)")
+    parser.add_argument('--http-stub', action='store_true',
+                        help="run --http-load against a local stub server instead of --base-url, "
+                             "to check the driver without a backend")
+    parser.add_argument('--metrics-json',
+                        help="also write the stage timings, round trips, failures and peak RSS to this JSON file")
+    parser.add_argument('--seed', type=int, default=CONFIG['seed'],
+                        help="base RNG seed; the same seed and reference time always produce the same data")
+    parser.add_argument('--reference-now', type=datetime.datetime.fromisoformat, default=CONFIG['reference_now'],
+                        help="ISO timestamp used as 'now' for all generated dates (default: today at midnight)")
+    return parser.parse_args()
 
 def main():
     """Main function"""
+    args = parse_args()
+    CONFIG['scale_factor'] = args.scale_factor
+    CONFIG['therapist_ratio'] = args.therapist_ratio
+    CONFIG['workers'] = max(1, args.workers)
+    CONFIG['output_dir'] = args.output_dir
+    CONFIG['vectorized'] = args.vectorized
+    if CONFIG['vectorized'] and np is None:
+        raise SystemExit("--vectorized needs numpy (pip install numpy)")
+    CONFIG['sink'] = args.sink
+    CONFIG['sqlite_path'] = args.sqlite_path
+    CONFIG['chunk_size'] = max(1, args.chunk_size)
+    if args.distribution_profile:
+        CONFIG['distribution_profile'] = args.distribution_profile
+    CONFIG['collision_rate'] = args.collision_rate
+    CONFIG['pool_size'] = max(1, args.pool_size)
+    CONFIG['fast_load'] = args.fast_load
+    CONFIG['writer_threads'] = max(0, args.writer_threads)
+    CONFIG['write_retries'] = max(1, args.write_retries)
+    CONFIG['snapshot_dir'] = args.snapshot_dir
+    CONFIG['checkpoint_file'] = args.checkpoint
+    CONFIG['seed'] = args.seed
+    CONFIG['reference_now'] = args.reference_now
+    CONFIG['metrics_json'] = args.metrics_json
+    CONFIG['query_concurrency'] = max(1, args.concurrency)
+    CONFIG['api_base_url'] = args.base_url
+    CONFIG['http_users'] = max(1, args.http_users)
+    CONFIG['http_pool_size'] = max(1, args.http_connections)
+    
+    # Bulk-load files are not checkpointed; database runs are, and --resume takes over their settings
+    checkpoint = None
+    if CONFIG['output_dir']:
+        if args.resume:
+            raise SystemExit("--resume is not supported with --output-dir; regenerate the files instead")
+        if args.snapshot:
+            raise SystemExit("--snapshot dumps the database; load the --output-dir files before taking one")
+    else:
+        checkpoint = Checkpoint(CONFIG['checkpoint_file'])
+        if args.resume:
+            if not checkpoint.exists():
+                raise SystemExit(f"No checkpoint to resume at {CONFIG['checkpoint_file']}")
+            state = checkpoint.load()
+            CONFIG.update(state['config'])
+            CONFIG['seed'] = state['seed']
+            CONFIG['reference_now'] = datetime.datetime.fromisoformat(state['reference_now'])
+    
+    if CONFIG['sink'] == 'sqlite' and CONFIG['sqlite_path'] == ':memory:' and CONFIG['workers'] > 1:
+        raise SystemExit("--workers needs a SQLite database file; worker processes cannot share ':memory:'")
+    if CONFIG['sink'] == 'sqlite' and CONFIG['sqlite_path'] == ':memory:' and CONFIG['writer_threads']:
+        raise SystemExit("--writer-threads needs a SQLite database file; writer threads cannot share ':memory:'")
+    
+    if args.http_load is not None:
+        if CONFIG['output_dir'] or args.resume or args.advance_days is not None or args.query_load is not None:
+            raise SystemExit("--http-load reads its users from the existing database; it cannot be combined with "
+                             "--output-dir, --resume, --advance-days or --query-load")
+        if CONFIG['seed'] is None:
+            CONFIG['seed'] = random.SystemRandom().randrange(2 ** 32)
+        if CONFIG['reference_now'] is None:
+            CONFIG['reference_now'] = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        print("Clinic Management System - HTTP Load")
+        print("=" * 60)
+        print(f"Calling {'a local stub server' if args.http_stub else CONFIG['api_base_url']} as "
+              f"{CONFIG['http_users']} concurrent therapists for {args.http_load:g}s")
+        print("=" * 60)
+        run_http_load(args.http_load, stub=args.http_stub)
+        return
+    
+    if args.query_load is not None:
+        if CONFIG['output_dir'] or args.resume or args.advance_days is not None:
+            raise SystemExit("--query-load reads the existing database; it cannot be combined with "
+                             "--output-dir, --resume or --advance-days")
+        if CONFIG['sink'] == 'sqlite' and CONFIG['sqlite_path'] == ':memory:':
+            raise SystemExit("--query-load needs a SQLite database file with generated data, not ':memory:'")
+        if CONFIG['seed'] is None:
+            CONFIG['seed'] = random.SystemRandom().randrange(2 ** 32)
+        print("Clinic Management System - Query Load")
+        print("=" * 60)
+        print(f"Replaying MeetingRepository queries with {CONFIG['query_concurrency']} threads for {args.query_load:g}s")
+        print("=" * 60)
+        run_query_load(args.query_load)
+        return
+    
+    if args.reset or args.restore_snapshot:
+        if CONFIG['output_dir'] or args.resume or args.advance_days is not None or args.snapshot:
+            raise SystemExit("--reset and --restore-snapshot replace the database contents; they cannot be combined "
+                             "with --output-dir, --resume, --advance-days or --snapshot")
+        if args.restore_snapshot and CONFIG['seed'] is None:
+            raise SystemExit("--restore-snapshot needs the --seed (and --scale-factor) the snapshot was taken with")
+        if checkpoint.exists():
+            logger.info(f"Removing {checkpoint.path}; the run it records is gone with the reset")
+            checkpoint.remove()
+        if args.reset:
+            TestDataGenerator().reset()
+            return
+        print("Clinic Management System - Snapshot Restore")
+        print("=" * 60)
+        print(f"Restoring the dataset of seed {CONFIG['seed']}, scale factor {CONFIG['scale_factor']:g} "
+              f"from {snapshot_path()}")
+        print("=" * 60)
+        # Read before the generator defaults the reference time to today
+        reference_now = CONFIG['reference_now']
+        TestDataGenerator().restore_snapshot(reference_now)
+        return
+    
+    if args.advance_days is not None:
+        if CONFIG['output_dir'] or args.resume:
+            raise SystemExit("--advance-days updates the database directly; it cannot be combined with "
+                             "--output-dir or --resume")
+        if CONFIG['reference_now'] is None:
+            # Today would move the data forward by the days since it was generated on top of --advance-days
+            raise SystemExit("--advance-days needs the --reference-now the data was generated or last advanced "
+                             "to; the run that did it logged the value")
+        print("Clinic Management System - Time Advance")
+        print("=" * 60)
+        print(f"Appending {args.advance_days} days of meetings, expenses and payments to the existing data")
+        print("=" * 60)
+        TestDataGenerator().advance(args.advance_days)
+        return
+    
+    num_therapists, num_admins = scaled_user_counts()
+    
     print("Clinic Management System - Production Data Generator")
     print("=" * 60)
     print("This will create a production-like environment with:")
-    print(f"- {CONFIG['num_users']} users (45 therapists + 5 admins)")
-    print(f"- ~{CONFIG['num_users'] * CONFIG['num_clients_per_user']} clients (25 per therapist)")
-    print(f"- ~{CONFIG['num_users'] * CONFIG['num_clients_per_user'] * CONFIG['num_meetings_per_client']} meetings (30 per client)")
-    print(f"- ~{CONFIG['num_users'] * CONFIG['num_personal_meetings_per_user']} personal meetings (15 per therapist)")
-    print(f"- ~{CONFIG['num_users'] * CONFIG['num_expenses_per_user']} expenses (50 per therapist)")
+    print(f"- {num_therapists + num_admins} users ({num_therapists} therapists + {num_admins} admins, scale factor {CONFIG['scale_factor']:g})")
+    client_counts = distribution_profile()['client_counts']
+    max_clients = client_counts['max'] if client_counts else CONFIG['num_clients_per_user']
+    print(f"- ~{round(num_therapists * mean_client_count())} clients (15 to {max_clients} per therapist)")
+    # Meetings and expenses stop at the end of the date range, so only their draws are known up front
+    print(f"- 8 to {CONFIG['num_meetings_per_client']} meetings scheduled per client, within the date range")
+    print(f"- ~{round(num_therapists * (8 + CONFIG['num_personal_meetings_per_user']) / 2)} personal meetings (8 to {CONFIG['num_personal_meetings_per_user']} per therapist)")
+    print(f"- Up to {CONFIG['num_expenses_per_user']} expenses per therapist, within the date range")
+    print(f"- Payments for every paid meeting and personal meeting")
     print(f"- Calendar integrations for ~30% of users")
     print(f"- {CONFIG['date_range_days']} days of historical data")
+    if CONFIG['workers'] > 1:
+        print(f"- Generated by {CONFIG['workers']} parallel workers")
     print("=" * 60)
     
     generator = TestDataGenerator()
-    generator.run()
+    generator.run(checkpoint)
+    if args.snapshot:
+        TestDataGenerator().save_snapshot(generator.first_ids)
     
     print("\n🎉 Production data generation completed!")
     print("=" * 60)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Clinic Management System - Test Data Generator Tests
+Behavior checks for generate_test_data.py that need no MySQL server or backend.
+
+To run them:
+source test_data_env/bin/activate && python3 -m unittest test_generate_test_data
+"""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import generate_test_data
+from generate_test_data import CONFIG, SEEDED_USERNAMES, TABLE_LOAD_ORDER, Checkpoint, HttpConnectionPool, HttpLoad
+
+# Not imported by name, or pytest would try to collect it as a test class
+Generator = generate_test_data.TestDataGenerator
+
+logging.getLogger(generate_test_data.__name__).setLevel(logging.WARNING)
+logging.getLogger('asyncio').setLevel(logging.WARNING)
+
+class HttpConnectionPoolTest(unittest.IsolatedAsyncioTestCase):
+    """The keep-alive client of --http-load against the --http-stub server and hand-written responses"""
+
+    async def serve(self, handler):
+        """Pool connected to a local server running handler(reader, writer) per connection"""
+        server = await asyncio.start_server(handler, '127.0.0.1', 0)
+        self.addAsyncCleanup(server.wait_closed)
+        self.addCleanup(server.close)
+        pool = HttpConnectionPool(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}", 2)
+        self.addAsyncCleanup(pool.close)
+        return pool
+
+    async def test_stub_sign_in_decodes_chunked_json(self):
+        pool = await self.serve(generate_test_data._serve_stub_api)
+        status, response = await pool.request('POST', '/api/auth/signin', {'username': 'sarahcohen0'})
+        self.assertEqual(status, 200)
+        self.assertEqual(response['token'], 'stub-sarahcohen0')
+
+    async def test_sequential_requests_reuse_one_connection(self):
+        pool = await self.serve(generate_test_data._serve_stub_api)
+        for _ in range(5):
+            status, response = await pool.request('GET', '/api/meetings', token='stub-user')
+            self.assertEqual((status, response), (200, []))
+        self.assertEqual(pool.opened, 1)
+
+    async def test_error_status_is_returned_and_counted(self):
+        pool = await self.serve(generate_test_data._serve_stub_api)
+        status, response = await pool.request('GET', '/api/meetings')
+        self.assertEqual((status, response), (401, {'message': 'Unauthorized'}))
+
+        load = HttpLoad(pool, [], 0)
+        await load.call('GET', '/api/clients', '/api/clients')
+        self.assertEqual(load.failures, {('GET /api/clients', 401): 1})
+        # The connection survives an error response
+        self.assertEqual(pool.opened, 1)
+
+    async def test_multiple_chunks_and_trailers(self):
+        async def handler(reader, writer):
+            await reader.readuntil(b'\r\n\r\n')
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nTransfer-Encoding: chunked\r\n\r\n"
+                         b"4\r\n[1, \r\n5;ext=1\r\n2, 3]\r\n0\r\nX-Trailer: done\r\n\r\n")
+            await writer.drain()
+            writer.close()
+
+        pool = await self.serve(handler)
+        self.assertEqual(await pool.request('GET', '/api/meetings'), (200, [1, 2, 3]))
+
+    async def test_idle_connection_closed_by_the_server_is_replaced(self):
+        async def handler(reader, writer):
+            # Answers one request with Content-Length, then drops the kept-alive connection
+            await reader.readuntil(b'\r\n\r\n')
+            data = json.dumps({'ok': True}).encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         + f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+            await writer.drain()
+            writer.close()
+
+        pool = await self.serve(handler)
+        self.assertEqual(await pool.request('GET', '/api/meetings'), (200, {'ok': True}))
+        await asyncio.sleep(0.05)
+        self.assertEqual(await pool.request('GET', '/api/meetings'), (200, {'ok': True}))
+        self.assertEqual(pool.opened, 2)
+
+# Columns the generator leaves to their CURRENT_TIMESTAMP default
+UNWRITTEN_COLUMNS = {'users': ['updated_at']}
+# Table a payment's session_id points into, by session_type
+SESSION_TABLES = {'MEETING': 'meetings', 'PERSONAL_MEETING': 'personal_meetings', 'EXPENSE': 'expenses'}
+
+class LostCommitConnection:
+    """SQLite connection whose first commit goes through but reports the connection as lost"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.lost = False
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def commit(self):
+        self.connection.commit()
+        if not self.lost:
+            self.lost = True
+            err = sqlite3.OperationalError("Lost connection to server during query")
+            err.sqlite_errorname = 'LOST'
+            raise err
+
+
+class BatchWriterTest(unittest.TestCase):
+    """A batch retried after a lost connection keeps the rows its lost commit stored"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.sink = generate_test_data.SQLiteSink(os.path.join(directory.name, 'writer.sqlite3'))
+        self.sink.connect()
+        self.addCleanup(self.sink.close)
+        self.sink.retryable = self.sink.retryable | {'LOST'}
+        self.sink.lost_connection = {'LOST'}
+        patcher = mock.patch.dict(CONFIG, {'retry_backoff': 0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write(self, categories):
+        """Write categories as one batch through a connection that loses the reply to its first commit"""
+        connection = LostCommitConnection(self.sink.connection)
+        writer = generate_test_data.BatchWriter(self.sink, len(categories), connection)
+        stored = []
+        for category_id, name in categories:
+            writer.add('expense_categories', ('id', 'name'), (category_id, name),
+                       on_insert=lambda name=name: stored.append(name))
+        writer.flush()
+        return writer, stored
+
+    def test_committed_batch_is_not_written_again(self):
+        writer, stored = self.write([(901, 'Catering'), (902, 'Printing'), (903, 'Postage')])
+        self.assertEqual(stored, ['Catering', 'Printing', 'Postage'])
+        self.assertEqual((writer.inserted, writer.failed), ({'expense_categories': 3}, {}))
+
+    def test_committed_rows_of_a_row_by_row_batch_are_not_written_again(self):
+        writer, stored = self.write([(901, 'Catering'), (901, 'Printing'), (903, 'Postage')])
+        self.assertEqual(stored, ['Catering', 'Postage'])
+        self.assertEqual((writer.inserted, writer.failed), ({'expense_categories': 2}, {'expense_categories': 1}))
+        rows = self.sink.connection.execute("SELECT id, name FROM expense_categories WHERE id > 900").fetchall()
+        self.assertEqual(rows, [(901, 'Catering'), (903, 'Postage')])
+
+
+class GeneratedDatasetTest(unittest.TestCase):
+    """Small SQLite runs compared table by table: same seed, same rows, however the run was split up"""
+
+    def setUp(self):
+        saved = dict(CONFIG)
+        self.addCleanup(lambda: (CONFIG.clear(), CONFIG.update(saved)))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        CONFIG.update({'sink': 'sqlite', 'seed': 1, 'reference_now': datetime.datetime(2025, 1, 1),
+                       'scale_factor': 0.2, 'chunk_size': 2, 'batch_size': 50,
+                       'checkpoint_file': os.path.join(self.directory, 'checkpoint.json'),
+                       'snapshot_dir': os.path.join(self.directory, 'snapshots')})
+
+    def database(self, name):
+        """Path of a SQLite file in the test's directory, made the run's database"""
+        CONFIG['sqlite_path'] = os.path.join(self.directory, f"{name}.sqlite3")
+        return CONFIG['sqlite_path']
+
+    def generate(self, name, **settings):
+        """Generate a dataset into a new database with settings on top of the test's CONFIG"""
+        path = self.database(name)
+        CONFIG.update(settings)
+        Generator().run(Checkpoint(CONFIG['checkpoint_file']))
+        return path
+
+    def interrupt(self, name, **settings):
+        """Start a run that is killed halfway through its second chunk, without any cleanup"""
+        generate_chunk = Generator.generate_therapist_chunk
+        chunks = []
+
+        def killed(generator, therapist_ids):
+            chunks.append(therapist_ids)
+            if len(chunks) == 1:
+                return generate_chunk(generator, therapist_ids)
+            # Half of the chunk reaches the database, then the process dies (the error handler never runs)
+            generate_chunk(generator, therapist_ids[:1])
+            generator.writer.flush()
+            raise KeyboardInterrupt
+
+        with mock.patch.object(Generator, 'generate_therapist_chunk', killed):
+            with self.assertRaises(KeyboardInterrupt):
+                self.generate(name, **settings)
+        return CONFIG['sqlite_path']
+
+    def resume(self):
+        """Continue the interrupted run the way --resume does"""
+        checkpoint = Checkpoint(CONFIG['checkpoint_file'])
+        state = checkpoint.load()
+        CONFIG.update(state['config'])
+        Generator().run(checkpoint)
+        self.assertFalse(checkpoint.exists())
+
+    def digests(self, path):
+        """MD5 of every generated table's rows in id order, without the seeded rows and the database's clock.
+
+        Ids are renumbered 1, 2, ... per table (and wherever rows point at them): parallel
+        workers reserve id blocks, so the README only promises the same rows, not the same ids.
+        """
+        digests = {}
+        numbers = {}    # table -> {id: position in id order}
+        with sqlite3.connect(path) as connection:
+            for table in TABLE_LOAD_ORDER:
+                columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+                references = {column: referenced for referenced, column in
+                              (row[2:4] for row in connection.execute(f"PRAGMA foreign_key_list({table})"))
+                              if referenced in numbers or referenced == table}
+                rows = connection.execute(f"SELECT * FROM {table} ORDER BY id").fetchall()
+                numbers[table] = {row[columns.index('id')]: number for number, row in enumerate(rows, 1)}
+                if table == 'users':
+                    rows = [row for row in rows if row[columns.index('username')] not in SEEDED_USERNAMES]
+                renumbered = []
+                for row in rows:
+                    values = dict(zip(columns, row))
+                    for column in UNWRITTEN_COLUMNS.get(table, ()):
+                        del values[column]
+                    for column, referenced in references.items():
+                        values[column] = numbers[referenced].get(values[column], values[column])
+                    if table == 'payments':
+                        referenced = SESSION_TABLES[values['session_type']]
+                        values['session_id'] = numbers[referenced][values['session_id']]
+                        # Refunds name the refunded payment's id in their notes
+                        values['notes'] = re.sub(r'#(\d+)', lambda match: f"#{numbers[table][int(match[1])]}",
+                                                 values['notes'] or '')
+                    values['id'] = numbers[table][values['id']]
+                    renumbered.append(tuple(values.values()))
+                digests[table] = hashlib.md5(repr(renumbered).encode()).hexdigest()
+        return digests
+
+    def indexes(self, path):
+        """Names of the indexes in the database"""
+        with sqlite3.connect(path) as connection:
+            return {name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+    def test_workers_generate_the_same_rows(self):
+        expected = self.digests(self.generate('inline'))
+        self.assertEqual(self.digests(self.generate('workers', workers=2)), expected)
+
+    def test_writer_threads_write_the_same_rows(self):
+        expected = self.digests(self.generate('inline'))
+        self.assertEqual(self.digests(self.generate('writer_threads', writer_threads=2)), expected)
+
+    def test_resumed_run_matches_an_uninterrupted_run(self):
+        expected = self.digests(self.generate('uninterrupted'))
+        path = self.interrupt('interrupted')
+        self.assertNotEqual(self.digests(path), expected)
+        self.resume()
+        self.assertEqual(self.digests(path), expected)
+
+    def test_fast_load_restores_the_indexes(self):
+        expected = self.indexes(self.generate('normal'))
+        rows = self.digests(CONFIG['sqlite_path'])
+        self.assertEqual(self.indexes(self.generate('fast', fast_load=True)), expected)
+        self.assertEqual(self.digests(CONFIG['sqlite_path']), rows)
+
+    def test_resumed_fast_load_restores_the_indexes(self):
+        expected = self.indexes(self.generate('normal'))
+        path = self.interrupt('interrupted', fast_load=True)
+        self.assertLess(self.indexes(path), expected)
+        # --resume takes fast_load over from the checkpoint
+        CONFIG['fast_load'] = False
+        self.resume()
+        self.assertTrue(CONFIG['fast_load'])
+        self.assertEqual(self.indexes(path), expected)
+
+    def test_snapshot_restores_the_same_rows(self):
+        generator = Generator()
+        path = self.database('generated')
+        generator.run()
+        Generator().save_snapshot(generator.first_ids)
+
+        self.database('restored')
+        Generator().restore_snapshot(CONFIG['reference_now'])
+        self.assertEqual(self.digests(CONFIG['sqlite_path']), self.digests(path))
+
+    def test_snapshot_of_other_settings_is_refused(self):
+        generator = Generator()
+        self.database('generated')
+        generator.run()
+        Generator().save_snapshot(generator.first_ids)
+
+        self.database('restored')
+        CONFIG['include_edge_cases'] = not CONFIG['include_edge_cases']
+        with self.assertRaisesRegex(RuntimeError, 'include_edge_cases'):
+            Generator().restore_snapshot()
+        CONFIG['include_edge_cases'] = not CONFIG['include_edge_cases']
+        with self.assertRaisesRegex(RuntimeError, 'reference now'):
+            Generator().restore_snapshot(datetime.datetime(2025, 2, 1))
+
+    def test_snapshot_expense_categories_must_keep_their_ids(self):
+        generator = Generator()
+        self.database('generated')
+        generator.run()
+        Generator().save_snapshot(generator.first_ids)
+
+        # A category the snapshot does not know takes the id the generator gave its first created category
+        sink = generate_test_data.SQLiteSink(self.database('restored'))
+        sink.connect().execute("INSERT INTO expense_categories (name) VALUES ('Catering')")
+        sink.connection.commit()
+        sink.close()
+        with self.assertRaisesRegex(RuntimeError, 'Expense categories'):
+            Generator().restore_snapshot()
+
+if __name__ == "__main__":
+    unittest.main()